@@ -0,0 +1,114 @@
+/**
+ * CSVパーサーのスループット計測
+ * 従来の split("\n") + utils_parseCSVLine と utils_parseCsv（ストリーミングトークナイザー）を比較する
+ * 実行: node bench/csv_parser.bench.js [行数]
+ */
+
+const fs = require("fs");
+const path = require("path");
+const vm = require("vm");
+
+const SRC_DIR = path.join(__dirname, "..", "src");
+const ROW_COUNT = Number(process.argv[2]) || 50000;
+const HEADER_ROWS = 8;
+
+function loadSources(files) {
+  const context = vm.createContext({ console: console });
+  files.forEach(file => {
+    vm.runInContext(fs.readFileSync(path.join(SRC_DIR, file), "utf8"), context, { filename: file });
+  });
+  return context;
+}
+
+function buildAmazonCsv(rowCount) {
+  const lines = [];
+  for (let i = 0; i < HEADER_ROWS - 1; i++) {
+    lines.push(`"レポートの説明 ${i + 1}"`);
+  }
+  lines.push("日付/時間,決済番号,トランザクションの種類,注文番号,SKU,説明,数量,Amazon 出品サービス,フルフィルメント,市町村,都道府県,郵便番号,税金徴収型,商品売上,商品の売上税,配送料,合計");
+
+  for (let i = 0; i < rowCount; i++) {
+    const description = i % 7 === 0 ? `"商品名 ""限定"", カラー${i % 5}"` : `商品名${i}`;
+    lines.push([
+      `"2024/01/${String(i % 28 + 1).padStart(2, "0")} 12:34:56 JST"`,
+      "12345678901",
+      "注文",
+      `"503-${String(i).padStart(7, "0")}-1234567"`,
+      `SKU-${i % 3000}`,
+      description,
+      "1",
+      "Amazon.co.jp",
+      "Amazon",
+      "渋谷区",
+      "東京都",
+      "150-0001",
+      "",
+      `"${(i % 90 + 10) * 100}"`,
+      "0",
+      "0",
+      i % 13 === 0 ? `" ${(i % 90 + 10) * 90} "` : `"${(i % 90 + 10) * 90}"`
+    ].join(","));
+    // 前後に空白のある行（従来の line.trim() と同じく引用符外の空白だけを除く）
+    if (i % 11 === 0) {
+      lines[lines.length - 1] = "  " + lines[lines.length - 1] + " \t";
+    }
+  }
+
+  return lines.join("\r\n") + "\r\n";
+}
+
+function parseLegacy(context, csvContent) {
+  const lines = csvContent.split("\n").slice(HEADER_ROWS);
+  const rows = [];
+  for (let i = 0; i < lines.length; i++) {
+    const line = lines[i].trim();
+    if (line) {
+      rows.push(context.utils_parseCSVLine(line));
+    }
+  }
+  return rows;
+}
+
+function measure(label, fn, bytes) {
+  fn(); // ウォームアップ
+  const runs = 5;
+  const started = process.hrtime.bigint();
+  let result;
+  for (let i = 0; i < runs; i++) {
+    result = fn();
+  }
+  const ms = Number(process.hrtime.bigint() - started) / 1e6 / runs;
+  const mbPerSec = bytes / 1024 / 1024 / (ms / 1000);
+  console.log(`${label.padEnd(28)} ${ms.toFixed(1).padStart(8)} ms  ${mbPerSec.toFixed(1).padStart(7)} MB/s  ${result.length} rows`);
+  return result;
+}
+
+function main() {
+  const context = loadSources(["utils/utils_CommonUtils.js", "utils/utils_CsvStream.js"]);
+  const csvContent = buildAmazonCsv(ROW_COUNT);
+  const bytes = Buffer.byteLength(csvContent, "utf8");
+  console.log(`rows=${ROW_COUNT} size=${(bytes / 1024 / 1024).toFixed(2)} MB`);
+
+  const legacy = measure("split + utils_parseCSVLine", () => parseLegacy(context, csvContent), bytes);
+  const streamed = measure("utils_parseCsv", () => context.utils_parseCsv(csvContent, { skipRows: HEADER_ROWS }), bytes);
+
+  // 1MBごとのチャンク投入でも同じ結果になることを確認する
+  const chunked = measure("utils_feedCsvChunk (1MB)", () => {
+    const tokenizer = context.utils_createCsvTokenizer({ skipRows: HEADER_ROWS });
+    const rows = [];
+    const onRow = row => rows.push(row);
+    for (let offset = 0; offset < csvContent.length; offset += 1000000) {
+      context.utils_feedCsvChunk(tokenizer, csvContent.slice(offset, offset + 1000000), onRow);
+    }
+    context.utils_endCsvTokenizer(tokenizer, onRow);
+    return rows;
+  }, bytes);
+
+  const expected = JSON.stringify(legacy);
+  if (JSON.stringify(Array.from(streamed)) !== expected || JSON.stringify(chunked) !== expected) {
+    console.error("解析結果が従来のパーサーと一致しません");
+    process.exitCode = 1;
+  }
+}
+
+main();
@@ -0,0 +1,262 @@
+/**
+ * Finances API 増分同期（amazon_FinancesSync.js）の動作確認
+ * 疑似 Finances API に対して、明細単位の重複判定・ページの区切りに依存しないキー・記帳の遅れたイベントの再取得・
+ * 古い形式のキーのストアの取り直し・同時実行の防止を確認する
+ * 実行: node bench/finances_sync.check.js
+ */
+
+const assert = require("assert");
+const { createEmulator } = require("./gas_emulator");
+
+const TARGET_MONTH = "202405";
+const STORE_NAME = "_fin_" + TARGET_MONTH;
+const PAGE_SIZE = 2;
+const FILES = [
+  "amazon/amazon_FinancesSync.js",
+  "amazon/amazon_SalesReport.js",
+  "utils/utils_SpApiHelper.js",
+  "utils/utils_SpApiScheduler.js"
+];
+
+function money(amount) {
+  return { CurrencyCode: "JPY", CurrencyAmount: amount };
+}
+
+function shipmentItem(orderItemId, sku, principal) {
+  return {
+    OrderItemId: orderItemId,
+    SellerSKU: sku,
+    QuantityShipped: 1,
+    ItemChargeList: [{ ChargeType: "Principal", ChargeAmount: money(principal) }],
+    ItemFeeList: [{ FeeType: "Commission", FeeAmount: money(-principal / 10) }]
+  };
+}
+
+/**
+ * 疑似 Finances API（PostedAfter / PostedBefore で絞り込み、PAGE_SIZE 件ずつ NextToken で返す）
+ * visibleAt より前の時刻には返さない（記帳の反映の遅れ）
+ */
+function createFinancesServer(emulator) {
+  const server = { events: [], requests: 0 };
+
+  emulator.setFetchHandler(request => {
+    server.requests++;
+    const query = {};
+    (request.url.split("?")[1] || "").split("&").forEach(pair => {
+      const [key, value] = pair.split("=");
+      query[key] = decodeURIComponent(value);
+    });
+
+    let filter = query;
+    let offset = 0;
+    if (query.NextToken) {
+      const token = JSON.parse(query.NextToken);
+      filter = token.filter;
+      offset = token.offset;
+    }
+
+    const after = new Date(filter.PostedAfter).getTime();
+    const before = new Date(filter.PostedBefore).getTime();
+    const matched = server.events.filter(entry => {
+      const posted = new Date(entry.PostedDate).getTime();
+      return posted >= after && posted <= before && entry.visibleAt <= emulator.now();
+    });
+
+    const page = matched.slice(offset, offset + PAGE_SIZE);
+    const financialEvents = { ShipmentEventList: [], ServiceFeeEventList: [], AdjustmentEventList: [] };
+    page.forEach(entry => financialEvents[entry.list].push(entry.event));
+
+    const payload = { FinancialEvents: financialEvents };
+    if (offset + PAGE_SIZE < matched.length) {
+      payload.NextToken = JSON.stringify({ filter: filter, offset: offset + PAGE_SIZE });
+    }
+    return { code: 200, body: { payload: payload } };
+  });
+
+  // サービス料金イベントには記帳日時がないため、取得範囲の判定用の日時だけを持たせる
+  server.add = (list, postedDate, event, visibleAt) => {
+    if (list !== "ServiceFeeEventList") {
+      event.PostedDate = postedDate;
+    }
+    server.events.push({ list: list, PostedDate: postedDate, event: event, visibleAt: visibleAt || 0 });
+  };
+
+  return server;
+}
+
+function setup() {
+  const emulator = createEmulator({ startTime: Date.UTC(2024, 5, 10) });
+  emulator.loadProject(FILES);
+  emulator.context.PropertiesService.getScriptProperties().setProperty("SP_API_ENDPOINT", "https://sellingpartnerapi-fe.amazon.com");
+  const server = createFinancesServer(emulator);
+  return { emulator, server };
+}
+
+function sync(emulator) {
+  return emulator.execute(context => context.amazon_syncFinancialEvents(TARGET_MONTH, "token", {}));
+}
+
+function storeKeys(emulator) {
+  const sheet = emulator.spreadsheet.getSheetByName(STORE_NAME);
+  return sheet.getLastRow() === 0 ? [] : sheet.getRange(1, 1, sheet.getLastRow(), 1).getValues().map(row => String(row[0]));
+}
+
+/**
+ * 注文・記帳日時・SKU・種類が同じでも別の明細であれば、それぞれ保存されること
+ */
+function addCollidingEvents(server) {
+  server.add("ShipmentEventList", "2024-05-03T01:00:00Z", {
+    AmazonOrderId: "503-0000001",
+    ShipmentItemList: [
+      shipmentItem("item-1", "SKU-A", 1000),
+      shipmentItem("item-2", "SKU-A", 1000)
+    ]
+  });
+  // 明細IDのない同一内容の明細は出現順で区別する
+  server.add("ShipmentEventList", "2024-05-04T01:00:00Z", {
+    AmazonOrderId: "503-0000002",
+    ShipmentItemList: [shipmentItem(undefined, "SKU-B", 500), shipmentItem(undefined, "SKU-B", 500)]
+  });
+  server.add("ServiceFeeEventList", "2024-05-05T01:00:00Z", {
+    AmazonOrderId: "503-0000001",
+    SellerSKU: "SKU-A",
+    FeeReason: "FBAInboundTransportationFee",
+    FeeList: [{ FeeType: "FBAInboundTransportationFee", FeeAmount: money(-120) }]
+  });
+  server.add("ServiceFeeEventList", "2024-05-05T02:00:00Z", {
+    AmazonOrderId: "503-0000001",
+    SellerSKU: "SKU-A",
+    FeeReason: "FBAStorageFee",
+    FeeList: [{ FeeType: "FBAStorageFee", FeeAmount: money(-80) }]
+  });
+  server.add("AdjustmentEventList", "2024-05-06T01:00:00Z", {
+    AdjustmentType: "WAREHOUSE_DAMAGE",
+    AdjustmentItemList: [
+      { SellerSKU: "SKU-C", Quantity: "1", PerUnitAmount: money(300), TotalAmount: money(300) },
+      { SellerSKU: "SKU-C", Quantity: "2", PerUnitAmount: money(300), TotalAmount: money(600) }
+    ]
+  });
+  return 8;
+}
+
+function checkItemLevelKeys() {
+  const { emulator, server } = setup();
+  const expected = addCollidingEvents(server);
+
+  const result = sync(emulator);
+  assert.ok(result.complete);
+  assert.strictEqual(result.added, expected);
+  assert.strictEqual(new Set(storeKeys(emulator)).size, expected);
+
+  // 完了済みの月を再実行しても重複して追加しない
+  const again = sync(emulator);
+  assert.strictEqual(again.added, 0);
+  assert.strictEqual(storeKeys(emulator).length, expected);
+
+  console.log(`明細単位の重複判定: ${expected}明細をすべて保存、再実行で追加 0件`);
+}
+
+/**
+ * 注文・記帳日時が同じイベントの同一内容の明細が別々のページに分かれても、すべて保存されること
+ * 取り直しでページの区切りが変わっても、同じ明細は同じキーになり重複して追加しないこと
+ */
+function checkSplitAcrossPages() {
+  const { emulator, server } = setup();
+  server.add("ShipmentEventList", "2024-05-07T01:00:00Z", {
+    AmazonOrderId: "503-0000010",
+    ShipmentItemList: [shipmentItem("item-10", "SKU-E", 400)]
+  });
+  // 1ページ目の2件目と2ページ目に、同じ注文・記帳日時・同一内容の明細を持つイベントを置く
+  server.add("ShipmentEventList", "2024-05-08T01:00:00Z", {
+    AmazonOrderId: "503-0000011",
+    ShipmentItemList: [shipmentItem(undefined, "SKU-F", 900)]
+  });
+  server.add("ShipmentEventList", "2024-05-08T01:00:00Z", {
+    AmazonOrderId: "503-0000011",
+    ShipmentItemList: [shipmentItem(undefined, "SKU-F", 900), shipmentItem(undefined, "SKU-F", 900)]
+  });
+
+  const result = sync(emulator);
+  assert.strictEqual(result.added, 4);
+  assert.strictEqual(new Set(storeKeys(emulator)).size, 4);
+
+  // 取り直しの範囲に遅れて反映されたイベントを先頭に加え、2つのイベントが同じページになるようにする
+  const cursor = JSON.parse(emulator.context.PropertiesService.getScriptProperties().getProperty("FINANCES_SYNC_" + TARGET_MONTH)).cursor;
+  const latePosted = new Date(new Date(cursor).getTime() - 12 * 60 * 60 * 1000).toISOString();
+  server.add("ShipmentEventList", latePosted, {
+    AmazonOrderId: "503-0000012",
+    ShipmentItemList: [shipmentItem("item-12", "SKU-G", 300)]
+  }, emulator.now());
+  server.events.unshift(server.events.pop());
+
+  const again = sync(emulator);
+  assert.strictEqual(again.added, 1);
+  assert.strictEqual(storeKeys(emulator).length, 5);
+  console.log("ページの区切り: 別ページに分かれた同一内容の明細をすべて保存、区切りが変わった取り直しで重複なし");
+}
+
+/**
+ * カーソルより前の記帳日時で遅れて反映されたイベントを、次の同期で取得すること
+ */
+function checkLatePostedEvents() {
+  const { emulator, server } = setup();
+  const expected = addCollidingEvents(server);
+  sync(emulator);
+
+  const cursor = JSON.parse(emulator.context.PropertiesService.getScriptProperties().getProperty("FINANCES_SYNC_" + TARGET_MONTH)).cursor;
+  const latePosted = new Date(new Date(cursor).getTime() - 6 * 60 * 60 * 1000).toISOString();
+  server.add("ShipmentEventList", latePosted, {
+    AmazonOrderId: "503-0000003",
+    ShipmentItemList: [shipmentItem("item-9", "SKU-D", 700)]
+  }, emulator.now());
+
+  const result = sync(emulator);
+  assert.strictEqual(result.added, 1);
+  assert.strictEqual(storeKeys(emulator).length, expected + 1);
+  console.log("記帳の遅れたイベント: カーソルの6時間前の記帳を次の同期で取得");
+}
+
+/**
+ * 古い形式のキーのストアは月初から取り直すこと
+ */
+function checkLegacyStore() {
+  const { emulator, server } = setup();
+  const expected = addCollidingEvents(server);
+
+  const sheet = emulator.spreadsheet.insertSheet(STORE_NAME);
+  sheet.load(1, 1, [["503-0000001|2024/05/03 10:00:00|SKU-A|Order", "旧形式の行"]]);
+  emulator.context.PropertiesService.getScriptProperties().setProperty("FINANCES_SYNC_" + TARGET_MONTH,
+    JSON.stringify({ nextToken: null, cursor: "2024-05-31T00:00:00.000Z", passStart: null, complete: true }));
+
+  const result = sync(emulator);
+  assert.strictEqual(result.added, expected);
+  assert.strictEqual(storeKeys(emulator).length, expected);
+  assert.ok(storeKeys(emulator).every(key => key.indexOf("v3|") === 0));
+  console.log("古い形式のキーのストア: 月初から取り直し");
+}
+
+/**
+ * 別の処理がロックを保持している場合は同期しないこと
+ */
+function checkLock() {
+  const { emulator, server } = setup();
+  addCollidingEvents(server);
+  emulator.setLockHeld(true);
+
+  assert.throws(() => emulator.execute(context => context.amazon_generateReport(TARGET_MONTH)), /別の処理を実行中です/);
+
+  // 実行の終了時にロックは解放されるため、もう一度保持した状態にする
+  emulator.setLockHeld(true);
+  emulator.context.PropertiesService.getScriptProperties().setProperty("FINANCES_SYNC_ACTIVE_MONTH", TARGET_MONTH);
+  emulator.execute(context => context.amazon_resumeFinancesSync());
+  assert.strictEqual(server.requests, 0);
+  assert.strictEqual(emulator.context.ScriptApp.getProjectTriggers().length, 1);
+  console.log("同時実行: メニューからの実行はエラー、トリガーからの再開は延期");
+}
+
+checkItemLevelKeys();
+checkSplitAcrossPages();
+checkLatePostedEvents();
+checkLegacyStore();
+checkLock();
+console.log("OK");
@@ -0,0 +1,1094 @@
+/**
+ * Apps Script サービスのエミュレーター（ベンチマーク・動作確認用）
+ * SpreadsheetApp・UrlFetchApp・Utilities・PropertiesService・CacheService・LockService・ScriptApp・HtmlService を
+ * Node 上で再現し、src/ 配下の .js を GAS と同じく1つのグローバルスコープに読み込む
+ * サービス呼び出しごとに回数・読み書きしたセル数・疑似レイテンシを記録する
+ * Date.now() は疑似レイテンシの累計で進むため、実行時間の上限による中断と時間主導トリガーでの再開も再現できる
+ *
+ * 使い方:
+ *   const { createEmulator } = require("./gas_emulator");
+ *   const emulator = createEmulator();
+ *   const sheet = emulator.spreadsheet.insertSheet("商品管理");
+ *   emulator.loadProject();
+ *   emulator.resetCosts();
+ *   emulator.execute(context => context.amazon_processData());
+ *   emulator.runPendingTriggers();   // 中断したジョブの再開トリガーを順に実行する
+ *   console.log(emulator.costs, emulator.executions);
+ */
+
+const fs = require("fs");
+const path = require("path");
+const vm = require("vm");
+
+const SRC_DIR = path.join(__dirname, "..", "src");
+
+// 1回の呼び出しの疑似レイテンシ（ミリ秒）= base + セル数 * perCell
+// Apps Script の一般的な実測値に合わせた概算で、絶対値ではなく変更前後の比較に使う
+const COST_MODEL = {
+  read: { base: 40, perCell: 0.002 },       // getValues / getFormulas など
+  write: { base: 80, perCell: 0.004 },      // setValues / clearContent など
+  structure: { base: 150, perCell: 0 },     // deleteRows / insertSheet など
+  metadata: { base: 2, perCell: 0 },        // getLastRow / getSheetByName など
+  utility: { base: 0.1, perCell: 0 },       // Utilities.formatDate など（サーバー往復なし）
+  properties: { base: 15, perCell: 0 },
+  cache: { base: 10, perCell: 0 },
+  lock: { base: 20, perCell: 0 },
+  trigger: { base: 50, perCell: 0 },        // ScriptApp.newTrigger・getProjectTriggers・deleteTrigger
+  urlFetch: { base: 300, perCell: 0 },      // fetchAll は1バッチで1回分
+  sleep: { base: 0, perCell: 1 },           // Utilities.sleep（perCell に待機ミリ秒を渡す）
+  ui: { base: 0, perCell: 0 },
+  log: { base: 0, perCell: 0 }
+};
+
+const DEFAULT_NUMBER_FORMAT = "0.###############";
+const DEFAULT_BACKGROUND = "#ffffff";
+
+// =============================================================================
+// 呼び出しコストの記録
+// =============================================================================
+
+function createCostRecorder(model) {
+  const costs = {
+    calls: 0,
+    reads: 0,
+    writes: 0,
+    cellsRead: 0,
+    cellsWritten: 0,
+    latencyMs: 0,
+    byMethod: {}
+  };
+
+  // 疑似時計（resetCosts ではリセットしない）
+  const clock = { elapsedMs: 0 };
+
+  function record(kind, method, cells) {
+    const cost = model[kind];
+    const latency = cost.base + (cells || 0) * cost.perCell;
+    clock.elapsedMs += latency;
+    const entry = costs.byMethod[method] || (costs.byMethod[method] = { calls: 0, cells: 0, latencyMs: 0 });
+
+    entry.calls++;
+    entry.cells += cells || 0;
+    entry.latencyMs += latency;
+    costs.latencyMs += latency;
+
+    if (kind !== "log") {
+      costs.calls++;
+    }
+    if (kind === "read") {
+      costs.reads++;
+      costs.cellsRead += cells || 0;
+    } else if (kind === "write") {
+      costs.writes++;
+      costs.cellsWritten += cells || 0;
+    }
+  }
+
+  function reset() {
+    costs.calls = 0;
+    costs.reads = 0;
+    costs.writes = 0;
+    costs.cellsRead = 0;
+    costs.cellsWritten = 0;
+    costs.latencyMs = 0;
+    costs.byMethod = {};
+  }
+
+  return { costs, clock, record, reset };
+}
+
+// =============================================================================
+// A1表記
+// =============================================================================
+
+function columnToIndex(letters) {
+  let column = 0;
+  for (let i = 0; i < letters.length; i++) {
+    column = column * 26 + (letters.charCodeAt(i) - 64);
+  }
+  return column;
+}
+
+function indexToColumn(column) {
+  let letters = "";
+  while (column > 0) {
+    const remainder = (column - 1) % 26;
+    letters = String.fromCharCode(65 + remainder) + letters;
+    column = Math.floor((column - 1) / 26);
+  }
+  return letters;
+}
+
+// "A1" / "A1:B2" / "A:B" / "3:5" を { row, column, numRows, numColumns } に変換する
+function parseA1(notation, sheet) {
+  const parts = notation.toUpperCase().split(":");
+  const parse = part => {
+    const match = part.match(/^([A-Z]*)(\d*)$/);
+    if (!match) {
+      throw new Error("A1表記を解釈できません: " + notation);
+    }
+    return { column: match[1] ? columnToIndex(match[1]) : null, row: match[2] ? Number(match[2]) : null };
+  };
+
+  const start = parse(parts[0]);
+  const end = parts.length > 1 ? parse(parts[1]) : start;
+  const row = start.row || 1;
+  const column = start.column || 1;
+  const lastRow = end.row || sheet.getMaxRows();
+  const lastColumn = end.column || sheet.getMaxColumns();
+
+  return { row: row, column: column, numRows: lastRow - row + 1, numColumns: lastColumn - column + 1 };
+}
+
+// =============================================================================
+// シート
+// =============================================================================
+
+/**
+ * 値・数式・表示形式・背景色を行ごとの配列で保持する
+ * 数式は読み込み時に、単一セル参照（=B12）と HYPERLINK の表示文字列だけを評価する
+ */
+class EmulatedSheet {
+  constructor(spreadsheet, name, id) {
+    this.spreadsheet = spreadsheet;
+    this.name = name;
+    this.id = id;
+    this.hidden = false;
+    this.values = [];
+    this.formulas = [];
+    this.numberFormats = [];
+    this.backgrounds = [];
+    this.maxRows = 1000;
+    this.maxColumns = 26;
+  }
+
+  // ---- エミュレーター用（コストを記録しない） ----
+
+  /**
+   * 2次元配列をそのまま書き込む（データ準備用）
+   */
+  load(row, column, data) {
+    data.forEach((rowData, i) => {
+      rowData.forEach((value, j) => {
+        this.writeCell_(row + i, column + j, value);
+      });
+    });
+    return this;
+  }
+
+  /**
+   * 現在のデータ範囲を2次元配列で取得する（結果確認用、数式は数式のまま）
+   */
+  dump() {
+    const rows = [];
+    for (let r = 1; r <= this.lastRow_(); r++) {
+      const row = [];
+      for (let c = 1; c <= this.lastColumn_(); c++) {
+        row.push(this.cell_(this.formulas, r, c, "") || this.cell_(this.values, r, c, ""));
+      }
+      rows.push(row);
+    }
+    return rows;
+  }
+
+  // ---- Sheet API ----
+
+  getName() { this.record_("metadata", "Sheet.getName"); return this.name; }
+  getSheetName() { return this.getName(); }
+  getSheetId() { this.record_("metadata", "Sheet.getSheetId"); return this.id; }
+  getParent() { return this.spreadsheet; }
+  getLastRow() { this.record_("metadata", "Sheet.getLastRow"); return this.lastRow_(); }
+  getLastColumn() { this.record_("metadata", "Sheet.getLastColumn"); return this.lastColumn_(); }
+  getMaxRows() { return Math.max(this.maxRows, this.lastRow_()); }
+  getMaxColumns() { return Math.max(this.maxColumns, this.lastColumn_()); }
+  isSheetHidden() { return this.hidden; }
+
+  getRange(rowOrA1, column, numRows, numColumns) {
+    this.record_("metadata", "Sheet.getRange");
+    if (typeof rowOrA1 === "string") {
+      const a1 = parseA1(rowOrA1, this);
+      return new EmulatedRange(this, a1.row, a1.column, a1.numRows, a1.numColumns);
+    }
+    return new EmulatedRange(this, rowOrA1, column, numRows || 1, numColumns || 1);
+  }
+
+  getDataRange() {
+    return this.getRange(1, 1, Math.max(1, this.lastRow_()), Math.max(1, this.lastColumn_()));
+  }
+
+  appendRow(rowContents) {
+    const row = this.lastRow_() + 1;
+    rowContents.forEach((value, j) => this.writeCell_(row, j + 1, value));
+    this.record_("write", "Sheet.appendRow", rowContents.length);
+    return this;
+  }
+
+  deleteRow(rowPosition) {
+    return this.deleteRowsInternal_(rowPosition, 1, "Sheet.deleteRow");
+  }
+
+  deleteRows(rowPosition, howMany) {
+    return this.deleteRowsInternal_(rowPosition, howMany, "Sheet.deleteRows");
+  }
+
+  insertRowsAfter(afterPosition, howMany) {
+    this.record_("structure", "Sheet.insertRowsAfter");
+    [this.values, this.formulas, this.numberFormats, this.backgrounds].forEach(layer => {
+      if (layer.length > afterPosition) {
+        layer.splice(afterPosition, 0, ...new Array(howMany));
+      }
+    });
+    this.maxRows += howMany;
+    return this;
+  }
+
+  clear() {
+    this.record_("write", "Sheet.clear", this.lastRow_() * this.lastColumn_());
+    this.values = [];
+    this.formulas = [];
+    this.numberFormats = [];
+    this.backgrounds = [];
+    return this;
+  }
+
+  clearContents() {
+    this.record_("write", "Sheet.clearContents", this.lastRow_() * this.lastColumn_());
+    this.values = [];
+    this.formulas = [];
+    return this;
+  }
+
+  hideSheet() { this.record_("structure", "Sheet.hideSheet"); this.hidden = true; return this; }
+  showSheet() { this.record_("structure", "Sheet.showSheet"); this.hidden = false; return this; }
+  activate() { this.record_("metadata", "Sheet.activate"); this.spreadsheet.activeSheet = this; return this; }
+  getActiveRange() {
+    const range = this.spreadsheet.activeRange;
+    return range && range.sheet === this ? range : null;
+  }
+
+  // ---- 内部処理 ----
+
+  record_(kind, method, cells) {
+    this.spreadsheet.recorder.record(kind, method, cells);
+  }
+
+  cell_(layer, row, column, defaultValue) {
+    const rowData = layer[row - 1];
+    if (!rowData) {
+      return defaultValue;
+    }
+    const value = rowData[column - 1];
+    return value === undefined ? defaultValue : value;
+  }
+
+  setCell_(layer, row, column, value) {
+    let rowData = layer[row - 1];
+    if (!rowData) {
+      rowData = layer[row - 1] = [];
+    }
+    rowData[column - 1] = value;
+  }
+
+  writeCell_(row, column, value) {
+    if (typeof value === "string" && value.charAt(0) === "=") {
+      this.setCell_(this.formulas, row, column, value);
+      this.setCell_(this.values, row, column, "");
+    } else {
+      if (this.cell_(this.formulas, row, column, "")) {
+        this.setCell_(this.formulas, row, column, "");
+      }
+      this.setCell_(this.values, row, column, value === null || value === undefined ? "" : value);
+    }
+    this.contentChanged_ = true;
+  }
+
+  readValue_(row, column, depth) {
+    const formula = this.cell_(this.formulas, row, column, "");
+    if (!formula) {
+      return this.cell_(this.values, row, column, "");
+    }
+    return this.evaluate_(formula, depth || 0);
+  }
+
+  evaluate_(formula, depth) {
+    const reference = formula.match(/^=\$?([A-Z]+)\$?(\d+)$/);
+    if (reference && depth < 10) {
+      return this.readValue_(Number(reference[2]), columnToIndex(reference[1]), depth + 1);
+    }
+
+    const hyperlink = formula.match(/^=HYPERLINK\(".*?",\s*"(.*)"\)$/i);
+    if (hyperlink) {
+      return hyperlink[1];
+    }
+
+    return "";
+  }
+
+  rowHasContent_(index) {
+    const values = this.values[index];
+    const formulas = this.formulas[index];
+    const filled = cells => cells && cells.some(value => value !== "" && value !== undefined && value !== null);
+    return filled(values) || filled(formulas);
+  }
+
+  lastRow_() {
+    for (let i = Math.max(this.values.length, this.formulas.length) - 1; i >= 0; i--) {
+      if (this.rowHasContent_(i)) {
+        return i + 1;
+      }
+    }
+    return 0;
+  }
+
+  lastColumn_() {
+    if (!this.contentChanged_ && this.cachedLastColumn_ !== undefined) {
+      return this.cachedLastColumn_;
+    }
+
+    let lastColumn = 0;
+    [this.values, this.formulas].forEach(layer => {
+      layer.forEach(rowData => {
+        if (!rowData) {
+          return;
+        }
+        for (let j = rowData.length - 1; j >= lastColumn; j--) {
+          const value = rowData[j];
+          if (value !== "" && value !== undefined && value !== null) {
+            lastColumn = j + 1;
+            break;
+          }
+        }
+      });
+    });
+
+    this.contentChanged_ = false;
+    this.cachedLastColumn_ = lastColumn;
+    return lastColumn;
+  }
+
+  deleteRowsInternal_(rowPosition, howMany, method) {
+    this.record_("structure", method);
+    [this.values, this.formulas, this.numberFormats, this.backgrounds].forEach(layer => {
+      layer.splice(rowPosition - 1, howMany);
+    });
+    this.maxRows = Math.max(1, this.maxRows - howMany);
+    this.contentChanged_ = true;
+    return this;
+  }
+}
+
+// =============================================================================
+// 範囲
+// =============================================================================
+
+class EmulatedRange {
+  constructor(sheet, row, column, numRows, numColumns) {
+    if (row < 1 || column < 1 || numRows < 1 || numColumns < 1) {
+      throw new Error(`範囲の座標または大きさが無効です (${row}, ${column}, ${numRows}, ${numColumns})`);
+    }
+    this.sheet = sheet;
+    this.row = row;
+    this.column = column;
+    this.numRows = numRows;
+    this.numColumns = numColumns;
+  }
+
+  getRow() { return this.row; }
+  getColumn() { return this.column; }
+  getLastRow() { return this.row + this.numRows - 1; }
+  getLastColumn() { return this.column + this.numColumns - 1; }
+  getNumRows() { return this.numRows; }
+  getNumColumns() { return this.numColumns; }
+  getSheet() { return this.sheet; }
+  getA1Notation() {
+    const start = indexToColumn(this.column) + this.row;
+    if (this.numRows === 1 && this.numColumns === 1) {
+      return start;
+    }
+    return start + ":" + indexToColumn(this.getLastColumn()) + this.getLastRow();
+  }
+
+  // ---- 読み込み ----
+
+  getValues() {
+    return this.read_("Range.getValues", (r, c) => this.sheet.readValue_(r, c));
+  }
+
+  getValue() {
+    return this.read_("Range.getValue", (r, c) => this.sheet.readValue_(r, c), true)[0][0];
+  }
+
+  getDisplayValues() {
+    return this.read_("Range.getDisplayValues", (r, c) => String(this.sheet.readValue_(r, c)));
+  }
+
+  getFormulas() {
+    return this.read_("Range.getFormulas", (r, c) => this.sheet.cell_(this.sheet.formulas, r, c, ""));
+  }
+
+  getFormula() {
+    return this.read_("Range.getFormula", (r, c) => this.sheet.cell_(this.sheet.formulas, r, c, ""), true)[0][0];
+  }
+
+  getNumberFormats() {
+    return this.read_("Range.getNumberFormats", (r, c) => this.sheet.cell_(this.sheet.numberFormats, r, c, DEFAULT_NUMBER_FORMAT));
+  }
+
+  getBackgrounds() {
+    return this.read_("Range.getBackgrounds", (r, c) => this.sheet.cell_(this.sheet.backgrounds, r, c, DEFAULT_BACKGROUND));
+  }
+
+  // ---- 書き込み ----
+
+  setValues(values) {
+    this.checkDimensions_(values, "setValues");
+    return this.write_("Range.setValues", (r, c, i, j) => this.sheet.writeCell_(r, c, values[i][j]));
+  }
+
+  setValue(value) {
+    return this.write_("Range.setValue", (r, c) => this.sheet.writeCell_(r, c, value));
+  }
+
+  setFormula(formula) {
+    return this.write_("Range.setFormula", (r, c) => this.sheet.writeCell_(r, c, formula));
+  }
+
+  setFormulas(formulas) {
+    this.checkDimensions_(formulas, "setFormulas");
+    return this.write_("Range.setFormulas", (r, c, i, j) => this.sheet.writeCell_(r, c, formulas[i][j]));
+  }
+
+  setNumberFormats(formats) {
+    this.checkDimensions_(formats, "setNumberFormats");
+    return this.write_("Range.setNumberFormats", (r, c, i, j) => this.sheet.setCell_(this.sheet.numberFormats, r, c, formats[i][j]));
+  }
+
+  setNumberFormat(format) {
+    return this.write_("Range.setNumberFormat", (r, c) => this.sheet.setCell_(this.sheet.numberFormats, r, c, format));
+  }
+
+  setBackgrounds(colors) {
+    this.checkDimensions_(colors, "setBackgrounds");
+    return this.write_("Range.setBackgrounds", (r, c, i, j) => this.sheet.setCell_(this.sheet.backgrounds, r, c, colors[i][j]));
+  }
+
+  setBackground(color) {
+    return this.write_("Range.setBackground", (r, c) => this.sheet.setCell_(this.sheet.backgrounds, r, c, color || DEFAULT_BACKGROUND));
+  }
+
+  clearContent() {
+    return this.write_("Range.clearContent", (r, c) => this.sheet.writeCell_(r, c, ""));
+  }
+
+  clear() {
+    return this.write_("Range.clear", (r, c) => {
+      this.sheet.writeCell_(r, c, "");
+      this.sheet.setCell_(this.sheet.numberFormats, r, c, undefined);
+      this.sheet.setCell_(this.sheet.backgrounds, r, c, undefined);
+    });
+  }
+
+  activate() {
+    this.sheet.spreadsheet.activeSheet = this.sheet;
+    this.sheet.spreadsheet.activeRange = this;
+    return this;
+  }
+
+  // ---- 内部処理 ----
+
+  read_(method, getter, single) {
+    const numRows = single ? 1 : this.numRows;
+    const numColumns = single ? 1 : this.numColumns;
+    const result = new Array(numRows);
+
+    for (let i = 0; i < numRows; i++) {
+      const rowData = new Array(numColumns);
+      for (let j = 0; j < numColumns; j++) {
+        rowData[j] = getter(this.row + i, this.column + j);
+      }
+      result[i] = rowData;
+    }
+
+    this.sheet.record_("read", method, numRows * numColumns);
+    return result;
+  }
+
+  write_(method, setter) {
+    for (let i = 0; i < this.numRows; i++) {
+      for (let j = 0; j < this.numColumns; j++) {
+        setter(this.row + i, this.column + j, i, j);
+      }
+    }
+
+    this.sheet.record_("write", method, this.numRows * this.numColumns);
+    return this;
+  }
+
+  checkDimensions_(data, method) {
+    const columns = data.length > 0 ? data[0].length : 0;
+    if (data.length !== this.numRows || columns !== this.numColumns) {
+      throw new Error(`${method}: データの行数・列数 (${data.length} x ${columns}) が範囲 (${this.numRows} x ${this.numColumns}) と一致しません`);
+    }
+  }
+}
+
+// =============================================================================
+// スプレッドシート・UI
+// =============================================================================
+
+class EmulatedSpreadsheet {
+  constructor(recorder) {
+    this.recorder = recorder;
+    this.sheets = [];
+    this.activeSheet = null;
+    this.activeRange = null;
+    this.nextSheetId = 1;
+  }
+
+  getId() { return "emulated-spreadsheet"; }
+  getName() { return "エミュレーター"; }
+  getSheets() { this.recorder.record("metadata", "Spreadsheet.getSheets"); return this.sheets.slice(); }
+
+  getSheetByName(name) {
+    this.recorder.record("metadata", "Spreadsheet.getSheetByName");
+    return this.sheets.find(sheet => sheet.name === name) || null;
+  }
+
+  insertSheet(name) {
+    this.recorder.record("structure", "Spreadsheet.insertSheet");
+    name = name || "シート" + this.nextSheetId;
+    if (this.sheets.some(sheet => sheet.name === name)) {
+      throw new Error(`「${name}」という名前のシートは既にあります`);
+    }
+    const sheet = new EmulatedSheet(this, name, this.nextSheetId++);
+    this.sheets.push(sheet);
+    this.activeSheet = sheet;
+    return sheet;
+  }
+
+  deleteSheet(sheet) {
+    this.recorder.record("structure", "Spreadsheet.deleteSheet");
+    this.sheets = this.sheets.filter(s => s !== sheet);
+    if (this.activeSheet === sheet) {
+      this.activeSheet = this.sheets[0] || null;
+    }
+  }
+
+  getActiveSheet() { return this.activeSheet || this.sheets[0] || null; }
+  setActiveSheet(sheet) { this.activeSheet = sheet; return sheet; }
+  getActiveRange() { return this.activeRange; }
+  getActiveRangeList() {
+    const range = this.activeRange;
+    return range ? { getRanges: () => [range] } : null;
+  }
+  getRange(a1) {
+    const [sheetName, notation] = a1.split("!");
+    return this.getSheetByName(sheetName.replace(/^'|'$/g, "")).getRange(notation);
+  }
+}
+
+function createUi(recorder, state) {
+  const Button = { OK: "OK", CANCEL: "CANCEL", YES: "YES", NO: "NO", CLOSE: "CLOSE" };
+  const ButtonSet = { OK: "OK", OK_CANCEL: "OK_CANCEL", YES_NO: "YES_NO", YES_NO_CANCEL: "YES_NO_CANCEL" };
+
+  const menu = () => {
+    const builder = {
+      addItem: () => builder,
+      addSeparator: () => builder,
+      addSubMenu: () => builder,
+      addToUi: () => {}
+    };
+    return builder;
+  };
+
+  return {
+    Button: Button,
+    ButtonSet: ButtonSet,
+    alert: (titleOrPrompt, prompt, buttons) => {
+      recorder.record("ui", "Ui.alert");
+      const message = prompt === undefined ? titleOrPrompt : titleOrPrompt + ": " + prompt;
+      state.alerts.push(message);
+      if (state.responses.length > 0) {
+        return state.responses.shift();
+      }
+      return buttons === ButtonSet.YES_NO || buttons === ButtonSet.YES_NO_CANCEL ? Button.YES : Button.OK;
+    },
+    prompt: () => ({ getSelectedButton: () => Button.OK, getResponseText: () => state.responses.shift() || "" }),
+    createMenu: menu,
+    createAddonMenu: menu,
+    showModalDialog: () => recorder.record("ui", "Ui.showModalDialog"),
+    showModelessDialog: () => recorder.record("ui", "Ui.showModelessDialog"),
+    showSidebar: () => recorder.record("ui", "Ui.showSidebar")
+  };
+}
+
+// =============================================================================
+// PropertiesService・CacheService・UrlFetchApp・Utilities
+// =============================================================================
+
+function createPropertyStore(recorder, scope) {
+  const store = new Map();
+  const method = name => `${scope}.${name}`;
+
+  return {
+    getProperty: key => {
+      recorder.record("properties", method("getProperty"));
+      return store.has(key) ? store.get(key) : null;
+    },
+    setProperty: (key, value) => {
+      recorder.record("properties", method("setProperty"));
+      store.set(key, String(value));
+    },
+    deleteProperty: key => {
+      recorder.record("properties", method("deleteProperty"));
+      store.delete(key);
+    },
+    getProperties: () => {
+      recorder.record("properties", method("getProperties"));
+      return Object.fromEntries(store);
+    },
+    setProperties: (properties, deleteAllOthers) => {
+      recorder.record("properties", method("setProperties"));
+      if (deleteAllOthers) {
+        store.clear();
+      }
+      Object.keys(properties).forEach(key => store.set(key, String(properties[key])));
+    },
+    deleteAllProperties: () => {
+      recorder.record("properties", method("deleteAllProperties"));
+      store.clear();
+    },
+    getKeys: () => {
+      recorder.record("properties", method("getKeys"));
+      return Array.from(store.keys());
+    }
+  };
+}
+
+function createCache(recorder, now) {
+  const store = new Map();
+  const alive = key => {
+    const entry = store.get(key);
+    if (entry && entry.expiresAt <= now()) {
+      store.delete(key);
+      return null;
+    }
+    return entry || null;
+  };
+
+  return {
+    get: key => {
+      recorder.record("cache", "Cache.get");
+      const entry = alive(key);
+      return entry ? entry.value : null;
+    },
+    getAll: keys => {
+      recorder.record("cache", "Cache.getAll");
+      const result = {};
+      keys.forEach(key => {
+        const entry = alive(key);
+        if (entry) {
+          result[key] = entry.value;
+        }
+      });
+      return result;
+    },
+    put: (key, value, expirationInSeconds) => {
+      recorder.record("cache", "Cache.put");
+      const ttl = Math.min(21600, expirationInSeconds || 600);
+      store.set(key, { value: String(value), expiresAt: now() + ttl * 1000 });
+    },
+    putAll: (values, expirationInSeconds) => {
+      recorder.record("cache", "Cache.putAll");
+      const ttl = Math.min(21600, expirationInSeconds || 600);
+      Object.keys(values).forEach(key => store.set(key, { value: String(values[key]), expiresAt: now() + ttl * 1000 }));
+    },
+    remove: key => {
+      recorder.record("cache", "Cache.remove");
+      store.delete(key);
+    },
+    removeAll: keys => {
+      recorder.record("cache", "Cache.removeAll");
+      keys.forEach(key => store.delete(key));
+    }
+  };
+}
+
+/**
+ * fetch ハンドラーの戻り値 { code, body, headers } を HTTPResponse の形にする
+ */
+function toHttpResponse(result) {
+  result = result || { code: 404, body: "" };
+  const body = typeof result.body === "string" ? result.body : JSON.stringify(result.body || "");
+  const headers = result.headers || {};
+  return {
+    getResponseCode: () => result.code || 200,
+    getContentText: () => body,
+    getHeaders: () => headers,
+    getAllHeaders: () => headers,
+    getBlob: () => ({ getDataAsString: () => body, getBytes: () => Buffer.from(body) })
+  };
+}
+
+function createUrlFetchApp(recorder, state) {
+  const handle = (url, params) => {
+    const request = Object.assign({ method: "get" }, params, { url: url });
+    return toHttpResponse(state.fetchHandler(request));
+  };
+
+  return {
+    fetch: (url, params) => {
+      recorder.record("urlFetch", "UrlFetchApp.fetch");
+      const response = handle(url, params);
+      if (response.getResponseCode() >= 400 && !(params && params.muteHttpExceptions)) {
+        throw new Error(`Request failed for ${url} returned code ${response.getResponseCode()}`);
+      }
+      return response;
+    },
+    fetchAll: requests => {
+      recorder.record("urlFetch", "UrlFetchApp.fetchAll");
+      return requests.map(request => handle(request.url, request));
+    }
+  };
+}
+
+const TIME_ZONE_OFFSETS = { "Asia/Tokyo": 9, "JST": 9, "UTC": 0, "GMT": 0, "Etc/GMT": 0 };
+
+/**
+ * Utilities.formatDate の主要なパターン（yyyy MM dd HH mm ss SSS）に対応する
+ */
+function formatDate(date, timeZone, pattern) {
+  const offset = TIME_ZONE_OFFSETS[timeZone] !== undefined ? TIME_ZONE_OFFSETS[timeZone] : 0;
+  const shifted = new Date(date.getTime() + offset * 3600 * 1000);
+  const pad = (value, length) => String(value).padStart(length, "0");
+  const tokens = {
+    yyyy: () => String(shifted.getUTCFullYear()),
+    yy: () => pad(shifted.getUTCFullYear() % 100, 2),
+    MM: () => pad(shifted.getUTCMonth() + 1, 2),
+    M: () => String(shifted.getUTCMonth() + 1),
+    dd: () => pad(shifted.getUTCDate(), 2),
+    d: () => String(shifted.getUTCDate()),
+    HH: () => pad(shifted.getUTCHours(), 2),
+    H: () => String(shifted.getUTCHours()),
+    mm: () => pad(shifted.getUTCMinutes(), 2),
+    ss: () => pad(shifted.getUTCSeconds(), 2),
+    SSS: () => pad(shifted.getUTCMilliseconds(), 3),
+    XXX: () => (offset >= 0 ? "+" : "-") + pad(Math.abs(offset), 2) + ":00",
+    Z: () => (offset >= 0 ? "+" : "-") + pad(Math.abs(offset), 2) + "00"
+  };
+
+  return pattern.replace(/'([^']*)'|yyyy|yy|MM|M|dd|d|HH|H|mm|ss|SSS|XXX|Z/g, (token, literal) => {
+    return literal !== undefined ? literal : tokens[token]();
+  });
+}
+
+function createUtilities(recorder) {
+  return {
+    formatDate: (date, timeZone, pattern) => {
+      recorder.record("utility", "Utilities.formatDate");
+      return formatDate(date, timeZone, pattern);
+    },
+    sleep: milliseconds => {
+      // 実際には待機せず、待機時間を疑似レイテンシとして記録する
+      recorder.record("sleep", "Utilities.sleep", milliseconds);
+    },
+    newBlob: (data, contentType, name) => {
+      const text = typeof data === "string" ? data : Buffer.from(data).toString();
+      return {
+        getDataAsString: () => text,
+        getBytes: () => Buffer.from(text),
+        getContentType: () => contentType,
+        getName: () => name,
+        setName: newName => { name = newName; }
+      };
+    },
+    getUuid: () => require("crypto").randomUUID(),
+    base64Encode: data => Buffer.from(data).toString("base64"),
+    base64Decode: data => Array.from(Buffer.from(data, "base64")),
+    Charset: { UTF_8: "UTF-8" },
+    DigestAlgorithm: { MD5: "md5", SHA_1: "sha1", SHA_256: "sha256" },
+    computeDigest: (algorithm, value) => Array.from(require("crypto").createHash(algorithm).update(value).digest())
+      .map(byte => (byte > 127 ? byte - 256 : byte))
+  };
+}
+
+// =============================================================================
+// LockService・ScriptApp・HtmlService
+// =============================================================================
+
+/**
+ * スクリプトロック（Node 上では1実行ずつしか動かないため、保持中かどうかだけを管理する）
+ * 他の実行がロックを保持している状態は emulator.setLockHeld(true) で再現する
+ */
+function createLockService(recorder, state) {
+  const lock = {
+    tryLock: timeoutInMillis => {
+      recorder.record("lock", "Lock.tryLock");
+      if (state.lockHeld) {
+        recorder.record("sleep", "Lock.tryLock(wait)", timeoutInMillis || 0);
+        return false;
+      }
+      state.lockHeld = true;
+      return true;
+    },
+    waitLock: timeoutInMillis => {
+      if (!lock.tryLock(timeoutInMillis)) {
+        throw new Error("Lock timeout: another process was holding the lock for too long.");
+      }
+    },
+    releaseLock: () => {
+      recorder.record("lock", "Lock.releaseLock");
+      state.lockHeld = false;
+    },
+    hasLock: () => state.lockHeld
+  };
+
+  return {
+    getScriptLock: () => lock,
+    getDocumentLock: () => lock,
+    getUserLock: () => lock
+  };
+}
+
+/**
+ * 時間主導トリガー（after のみ）。登録されたトリガーは emulator.runPendingTriggers() で実行する
+ */
+function createScriptApp(recorder, state, now) {
+  const toTrigger = entry => ({
+    getHandlerFunction: () => entry.handler,
+    getUniqueId: () => String(entry.id),
+    getEventType: () => "CLOCK",
+    getTriggerSource: () => "CLOCK"
+  });
+
+  return {
+    newTrigger: handler => {
+      const options = { delayMs: 0 };
+      const builder = {
+        timeBased: () => builder,
+        after: durationMillis => { options.delayMs = durationMillis; return builder; },
+        create: () => {
+          recorder.record("trigger", "ScriptApp.newTrigger");
+          const entry = { id: state.nextTriggerId++, handler: handler, runAt: now() + options.delayMs };
+          state.triggers.push(entry);
+          return toTrigger(entry);
+        }
+      };
+      return builder;
+    },
+    getProjectTriggers: () => {
+      recorder.record("trigger", "ScriptApp.getProjectTriggers");
+      return state.triggers.map(toTrigger);
+    },
+    deleteTrigger: trigger => {
+      recorder.record("trigger", "ScriptApp.deleteTrigger");
+      const index = state.triggers.findIndex(entry => String(entry.id) === trigger.getUniqueId());
+      if (index !== -1) {
+        state.triggers.splice(index, 1);
+      }
+    },
+    getScriptTimeZone: () => "Asia/Tokyo"
+  };
+}
+
+function createHtmlService(recorder) {
+  const output = content => {
+    const html = {
+      getContent: () => content,
+      setTitle: () => html,
+      setWidth: () => html,
+      setHeight: () => html,
+      setSandboxMode: () => html,
+      append: text => { content += text; return html; }
+    };
+    return html;
+  };
+
+  return {
+    createHtmlOutput: content => {
+      recorder.record("ui", "HtmlService.createHtmlOutput");
+      return output(content || "");
+    },
+    createHtmlOutputFromFile: filename => {
+      recorder.record("ui", "HtmlService.createHtmlOutputFromFile");
+      return output(fs.readFileSync(path.join(SRC_DIR, filename + ".html"), "utf8"));
+    },
+    SandboxMode: { IFRAME: "IFRAME" }
+  };
+}
+
+// =============================================================================
+// エミュレーター本体
+// =============================================================================
+
+/**
+ * エミュレーターを作成する
+ * @param {Object} options - { costModel, fetchHandler(request) => { code, body, headers }, verbose, startTime }
+ * @returns {Object} { context, spreadsheet, costs, logs, alerts, executions, ui, loadProject, execute, runPendingTriggers,
+ *   resetCosts, setFetchHandler, queueUiResponse, setLockHeld, now, evaluate }
+ */
+function createEmulator(options) {
+  options = options || {};
+  const recorder = createCostRecorder(options.costModel || COST_MODEL);
+  const state = {
+    alerts: [],
+    responses: [],
+    logs: [],
+    executions: [],
+    triggers: [],
+    nextTriggerId: 1,
+    lockHeld: false,
+    waitedMs: 0,
+    files: undefined,
+    fetchHandler: options.fetchHandler || (() => ({ code: 404, body: "" }))
+  };
+  // 疑似時計: 開始時刻 + 疑似レイテンシの累計 + トリガー待ちの時間
+  const startTime = options.startTime || Date.now();
+  const now = () => startTime + recorder.clock.elapsedMs + state.waitedMs;
+  const spreadsheet = new EmulatedSpreadsheet(recorder);
+  const ui = createUi(recorder, state);
+
+  const log = (level, method) => (...args) => {
+    recorder.record("log", method);
+    state.logs.push(args.map(String).join(" "));
+    if (options.verbose) {
+      console[level](...args);
+    }
+  };
+
+  const userProperties = createPropertyStore(recorder, "UserProperties");
+  const scriptProperties = createPropertyStore(recorder, "ScriptProperties");
+  const documentProperties = createPropertyStore(recorder, "DocumentProperties");
+  const scriptCache = createCache(recorder, now);
+  const services = {
+    UrlFetchApp: createUrlFetchApp(recorder, state),
+    Utilities: createUtilities(recorder),
+    PropertiesService: {
+      getScriptProperties: () => scriptProperties,
+      getUserProperties: () => userProperties,
+      getDocumentProperties: () => documentProperties
+    },
+    CacheService: {
+      getScriptCache: () => scriptCache,
+      getUserCache: () => scriptCache,
+      getDocumentCache: () => scriptCache
+    },
+    LockService: createLockService(recorder, state),
+    ScriptApp: createScriptApp(recorder, state, now),
+    HtmlService: createHtmlService(recorder)
+  };
+
+  // 実行ごとに新しいグローバルスコープを作る（トリガーからの実行では UI を使えない）
+  const createContext = withUi => {
+    const getUi = () => {
+      if (!withUi) {
+        throw new Error("Cannot call SpreadsheetApp.getUi() from this context.");
+      }
+      return ui;
+    };
+    const context = vm.createContext(Object.assign({
+      console: { log: log("log", "console.log"), info: log("info", "console.log"), warn: log("warn", "console.warn"), error: log("error", "console.error") },
+      Logger: { log: log("log", "Logger.log") },
+      SpreadsheetApp: {
+        getActiveSpreadsheet: () => spreadsheet,
+        getActive: () => spreadsheet,
+        getActiveSheet: () => spreadsheet.getActiveSheet(),
+        getUi: getUi,
+        flush: () => recorder.record("metadata", "SpreadsheetApp.flush")
+      }
+    }, services));
+    vm.runInContext("Date", context).now = now;
+    return context;
+  };
+
+  const context = createContext(true);
+
+  // 1回の実行を記録する（終了時にロックを解放する）
+  const execute = (handler, fn) => {
+    const started = now();
+    try {
+      return fn();
+    } finally {
+      state.lockHeld = false;
+      state.executions.push({ handler: handler, simulatedMs: now() - started });
+    }
+  };
+
+  return {
+    context: context,
+    spreadsheet: spreadsheet,
+    costs: recorder.costs,
+    logs: state.logs,
+    alerts: state.alerts,
+    executions: state.executions,
+    ui: ui,
+    loadProject: files => {
+      state.files = files;
+      return loadProject(context, files);
+    },
+    execute: fn => execute("(menu)", () => fn(context)),
+    runPendingTriggers: runOptions => {
+      const maxExecutions = (runOptions && runOptions.maxExecutions) || 1000;
+      let count = 0;
+      while (state.triggers.length > 0 && count < maxExecutions) {
+        state.triggers.sort((a, b) => a.runAt - b.runAt);
+        const entry = state.triggers.shift();
+        state.waitedMs += Math.max(0, entry.runAt - now());
+
+        const triggerContext = loadProject(createContext(false), state.files);
+        execute(entry.handler, () => triggerContext[entry.handler]());
+        count++;
+      }
+      return count;
+    },
+    resetCosts: () => {
+      recorder.reset();
+      state.logs.length = 0;
+      state.alerts.length = 0;
+      state.executions.length = 0;
+    },
+    setFetchHandler: handler => { state.fetchHandler = handler; },
+    queueUiResponse: response => { state.responses.push(response); },
+    setLockHeld: held => { state.lockHeld = held; },
+    now: now,
+    evaluate: expression => vm.runInContext(expression, context)
+  };
+}
+
+/**
+ * src/ 配下の .js を GAS と同じく1つのグローバルスコープに読み込む
+ * 読み込み順は clasp の push 順（パスのアルファベット順）に合わせる
+ * @param {Object} context - vm コンテキスト
+ * @param {string[]} files - 読み込むファイル（src/ からの相対パス、省略時はすべて）
+ */
+function loadProject(context, files) {
+  files = files || listSourceFiles(SRC_DIR).map(file => path.relative(SRC_DIR, file));
+
+  files.forEach(file => {
+    const code = fs.readFileSync(path.join(SRC_DIR, file), "utf8");
+    vm.runInContext(code, context, { filename: file });
+  });
+
+  return context;
+}
+
+function listSourceFiles(dir) {
+  return fs.readdirSync(dir, { withFileTypes: true })
+    .flatMap(entry => {
+      const fullPath = path.join(dir, entry.name);
+      if (entry.isDirectory()) {
+        return listSourceFiles(fullPath);
+      }
+      return entry.name.endsWith(".js") ? [fullPath] : [];
+    })
+    .sort();
+}
+
+module.exports = {
+  COST_MODEL,
+  createEmulator,
+  loadProject,
+  formatDate,
+  columnToIndex,
+  indexToColumn
+};
@@ -0,0 +1,335 @@
+/**
+ * 売上処理パイプラインのベンチマーク（Apps Script エミュレーター使用）
+ * 合成データのシート（既定 1k / 10k / 50k 行）で各パイプラインを実行し、
+ * サービス呼び出し回数・読み書きセル数・疑似レイテンシ・実行時間・メモリを表示する
+ * 実行時間の上限で中断したジョブは、再開トリガーがなくなるまで続けて実行し、実行回数と1回あたりの最長時間も表示する
+ *
+ * 実行: node --expose-gc bench/pipelines.bench.js [行数,...] [パイプライン名,...] [--detail]
+ *   例: node --expose-gc bench/pipelines.bench.js 1000,10000 amazon_processData --detail
+ * --detail を付けると、メソッドごとの呼び出し回数と疑似レイテンシも表示する
+ */
+
+const { createEmulator } = require("./gas_emulator");
+
+const args = process.argv.slice(2).filter(arg => !arg.startsWith("--"));
+const SIZES = args[0] ? args[0].split(",").map(Number) : [1000, 10000, 50000];
+const SELECTED = args[1] ? args[1].split(",") : null;
+const DETAIL = process.argv.includes("--detail");
+
+const SALE_DATE = "2025-01-15T10:00:00+09:00";
+
+// =============================================================================
+// 合成データ
+// =============================================================================
+
+// 再現性のある疑似乱数（パイプライン間で同じデータを使う）
+function createRandom(seed) {
+  let state = seed;
+  return () => {
+    state = (state * 16807) % 2147483647;
+    return (state - 1) / 2147483646;
+  };
+}
+
+function skuOf(index) {
+  return "SKU-" + String(index).padStart(6, "0");
+}
+
+/**
+ * 商品管理シート（1〜2行目ヘッダー、3行目からデータ、AF列まで）
+ * SKUは4行ずつ同じ値にし、約1割を売却済み（AF列 true）にする
+ */
+function buildProductSheet(spreadsheet, rows, random) {
+  const sheet = spreadsheet.insertSheet("商品管理");
+  const data = [];
+
+  for (let i = 0; i < rows; i++) {
+    const row = new Array(32).fill("");
+    row[2] = "商品 " + i;                        // C列
+    row[4] = "商品名 " + i;                       // E列
+    row[5] = "B0" + String(i).padStart(8, "0");   // F列 ASIN
+    row[7] = 1000 + (i % 50) * 100;               // H列 価格
+    row[24] = skuOf(Math.floor(i / 4));           // Y列 SKU
+    row[25] = true;                               // Z列 受領
+    row[26] = random() < 0.8;                     // AA列 販売中
+    row[31] = random() < 0.1;                     // AF列 売却廃却
+    data.push(row);
+  }
+
+  sheet.load(1, 1, [["商品管理"], new Array(32).fill("").map((_, j) => "列" + (j + 1))]);
+  sheet.load(3, 1, data);
+  return sheet;
+}
+
+/**
+ * Amazon売上シート（3行目からデータ、AG列まで、A列は空白＝未処理）
+ * 注文 70%・配送サービス 10%・返金 5%・調整 5%・振込み等 10%
+ */
+function buildAmazonSheet(spreadsheet, rows, productRows, random) {
+  const sheet = spreadsheet.insertSheet("Amazon売上");
+  const skuCount = Math.max(1, Math.floor(productRows / 4));
+  const orders = [];
+  const data = [];
+
+  for (let i = 0; i < rows; i++) {
+    const row = new Array(33).fill("");
+    const roll = random();
+    row[5] = SALE_DATE;
+
+    if (roll < 0.7 || orders.length === 0) {
+      const orderNumber = "250-" + String(i).padStart(7, "0");
+      orders.push(orderNumber);
+      row[7] = "注文";
+      row[8] = orderNumber;
+      row[9] = skuOf(Math.floor(random() * skuCount));
+      row[10] = "商品";
+      row[11] = random() < 0.1 ? 2 : 1;
+      row[18] = 1980;
+      row[19] = 180;
+      row[32] = 1500;
+    } else if (roll < 0.8) {
+      row[7] = "配送サービス";
+      row[8] = orders[Math.floor(random() * orders.length)];
+      row[32] = -350;
+    } else if (roll < 0.85) {
+      row[7] = "返金";
+      row[8] = orders[Math.floor(random() * orders.length)];
+      row[32] = -1500;
+    } else if (roll < 0.9) {
+      row[7] = "調整";
+      row[9] = skuOf(Math.floor(random() * skuCount));
+      row[10] = "在庫の紛失";
+      row[11] = 1;
+      row[32] = 1200;
+    } else {
+      row[7] = random() < 0.5 ? "振込み" : "FBA 在庫関連の手数料";
+      row[32] = -100;
+    }
+
+    data.push(row);
+  }
+
+  sheet.load(1, 1, [["Amazon売上"], ["ヘッダー"]]);
+  sheet.load(3, 1, data);
+  return sheet;
+}
+
+/**
+ * メルカリ売上シート（3行目からデータ、O列まで）
+ * 約2%をキャンセル行とし、既存行と同じG列の値を持たせる
+ */
+function buildMercariSheet(spreadsheet, rows, productRows, random) {
+  const sheet = spreadsheet.insertSheet("メルカリ売上");
+  const skuCount = Math.max(1, Math.floor(productRows / 4));
+  const data = [];
+
+  for (let i = 0; i < rows; i++) {
+    const row = new Array(15).fill("");
+    const cancelled = i > 0 && random() < 0.02;
+    row[5] = skuOf(Math.floor(random() * skuCount));                                   // F列
+    row[6] = cancelled ? data[Math.floor(random() * i)][6] : "m" + String(i).padStart(9, "0"); // G列
+    row[8] = cancelled ? "キャンセル" : "取引完了";                                       // I列
+    row[14] = "1個";                                                                     // O列
+    data.push(row);
+  }
+
+  sheet.load(1, 1, [["メルカリ売上"], ["ヘッダー"]]);
+  sheet.load(3, 1, data);
+  return sheet;
+}
+
+/**
+ * 商品管理へのコピー元シート（3行目からデータ、A列チェック 20%）
+ */
+function buildCopySourceSheet(spreadsheet, rows, random) {
+  const sheet = spreadsheet.insertSheet("利益確認");
+  const data = [];
+
+  for (let i = 0; i < rows; i++) {
+    const row = new Array(25).fill("");
+    row[0] = random() < 0.2;
+    row[1] = random() < 0.1 ? 2 : 1;
+    for (let j = 2; j < 15; j++) {
+      row[j] = "値" + i + "-" + j;
+    }
+    row[24] = skuOf(i);
+    data.push(row);
+  }
+
+  sheet.load(1, 1, [["利益確認"], ["ヘッダー"]]);
+  sheet.load(3, 1, data);
+  return sheet;
+}
+
+/**
+ * 年末FBA在庫シート（2行目からデータ、W列まで）
+ */
+function buildFbaInventorySheet(spreadsheet, productRows, random) {
+  const sheet = spreadsheet.insertSheet("年末FBA在庫");
+  const skuCount = Math.max(1, Math.floor(productRows / 4));
+  const data = [];
+
+  for (let i = 0; i < skuCount; i++) {
+    const row = new Array(23).fill("");
+    row[3] = skuOf(i);                          // D列 SKU
+    row[18] = Math.floor(random() * 5);         // S列 在庫数
+    data.push(row);
+  }
+
+  sheet.load(1, 1, [new Array(23).fill("").map((_, j) => "列" + (j + 1))]);
+  sheet.load(2, 1, data);
+  return sheet;
+}
+
+// =============================================================================
+// パイプライン
+// =============================================================================
+
+// setup: データ準備（コストに含めない） / run: 計測対象
+const PIPELINES = {
+  amazon_processData: {
+    setup: (emulator, rows, random) => {
+      buildProductSheet(emulator.spreadsheet, rows, random);
+      buildAmazonSheet(emulator.spreadsheet, rows, rows, random);
+    },
+    run: context => context.amazon_processData()
+  },
+
+  amazon_transferToProductSheet: {
+    setup: (emulator, rows, random) => {
+      buildProductSheet(emulator.spreadsheet, rows, random);
+      buildAmazonSheet(emulator.spreadsheet, rows, rows, random);
+      // 転記先の行番号（B列）を埋めるため、先にデータ処理を実行する
+      emulator.context.amazon_processData();
+      emulator.runPendingTriggers();
+    },
+    run: context => context.amazon_transferToProductSheet()
+  },
+
+  mercari_processData: {
+    setup: (emulator, rows, random) => {
+      buildProductSheet(emulator.spreadsheet, rows, random);
+      buildMercariSheet(emulator.spreadsheet, rows, rows, random);
+    },
+    run: context => context.mercari_processData()
+  },
+
+  tools_copyCheckedRowsToProductManagement: {
+    setup: (emulator, rows, random) => {
+      buildProductSheet(emulator.spreadsheet, rows, random);
+      buildCopySourceSheet(emulator.spreadsheet, rows, random).activate();
+    },
+    run: (context, emulator) => {
+      context.tools_copyCheckedRowsToProductManagement();
+      return emulator.alerts[emulator.alerts.length - 1];
+    }
+  },
+
+  adjustingEntries_adjustFbaInventory: {
+    setup: (emulator, rows, random) => {
+      buildProductSheet(emulator.spreadsheet, rows, random);
+      buildFbaInventorySheet(emulator.spreadsheet, rows, random);
+    },
+    run: (context, emulator) => {
+      context.adjustingEntries_adjustFbaInventory();
+      return emulator.alerts[emulator.alerts.length - 1];
+    }
+  }
+};
+
+// =============================================================================
+// 計測・表示
+// =============================================================================
+
+function measure(name, rows) {
+  const pipeline = PIPELINES[name];
+  const emulator = createEmulator();
+  emulator.loadProject();
+  pipeline.setup(emulator, rows, createRandom(rows));
+  emulator.resetCosts();
+
+  if (global.gc) {
+    global.gc();
+  }
+  const heapBefore = process.memoryUsage().heapUsed;
+  const started = process.hrtime.bigint();
+
+  let result = emulator.execute(context => pipeline.run(context, emulator));
+  if (emulator.runPendingTriggers() > 0) {
+    // 再開後に完了したジョブは、進行状況に残った完了メッセージを結果とする
+    result = emulator.evaluate("core_getJobProgress()")[0].message;
+  }
+
+  const wallMs = Number(process.hrtime.bigint() - started) / 1e6;
+  const heapDelta = process.memoryUsage().heapUsed - heapBefore;
+
+  return {
+    name: name,
+    rows: rows,
+    wallMs: wallMs,
+    heapMb: heapDelta / 1024 / 1024,
+    costs: emulator.costs,
+    logs: emulator.logs.length,
+    executions: emulator.executions.length,
+    longestExecutionMs: Math.max(...emulator.executions.map(execution => execution.simulatedMs)),
+    result: String(result || "").split("\n")[0]
+  };
+}
+
+function formatNumber(value, digits) {
+  return value.toLocaleString("en-US", { minimumFractionDigits: digits || 0, maximumFractionDigits: digits || 0 });
+}
+
+function printRow(measurement) {
+  const c = measurement.costs;
+  const columns = [
+    measurement.name.padEnd(42),
+    formatNumber(measurement.rows).padStart(7),
+    formatNumber(c.calls).padStart(8),
+    formatNumber(c.reads).padStart(6),
+    formatNumber(c.writes).padStart(7),
+    formatNumber(c.cellsRead).padStart(11),
+    formatNumber(c.cellsWritten).padStart(9),
+    formatNumber(c.latencyMs / 1000, 1).padStart(10),
+    formatNumber(measurement.executions).padStart(5),
+    formatNumber(measurement.longestExecutionMs / 1000, 1).padStart(9),
+    formatNumber(measurement.wallMs, 0).padStart(8),
+    formatNumber(measurement.heapMb, 1).padStart(8),
+    formatNumber(measurement.logs).padStart(8),
+    "  " + measurement.result
+  ];
+  console.log(columns.join(" "));
+
+  if (DETAIL) {
+    Object.keys(c.byMethod)
+      .sort((a, b) => c.byMethod[b].latencyMs - c.byMethod[a].latencyMs)
+      .forEach(method => {
+        const entry = c.byMethod[method];
+        console.log(`    ${method.padEnd(36)} calls=${formatNumber(entry.calls)} cells=${formatNumber(entry.cells)} simulated=${formatNumber(entry.latencyMs / 1000, 1)}s`);
+      });
+  }
+}
+
+function main() {
+  const names = SELECTED || Object.keys(PIPELINES);
+  names.forEach(name => {
+    if (!PIPELINES[name]) {
+      throw new Error("未定義のパイプラインです: " + name + "（" + Object.keys(PIPELINES).join(", ") + "）");
+    }
+  });
+
+  if (!global.gc) {
+    console.log("(--expose-gc を付けると heapΔ が安定します)");
+  }
+  console.log([
+    "pipeline".padEnd(42), "rows".padStart(7), "calls".padStart(8), "reads".padStart(6), "writes".padStart(7),
+    "cells read".padStart(11), "written".padStart(9), "sim (s)".padStart(10), "execs".padStart(5), "max (s)".padStart(9), "wall ms".padStart(8),
+    "heapΔ MB".padStart(8), "logs".padStart(8), "  result"
+  ].join(" "));
+
+  names.forEach(name => {
+    SIZES.forEach(rows => printRow(measure(name, rows)));
+  });
+}
+
+main();
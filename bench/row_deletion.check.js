@@ -0,0 +1,138 @@
+/**
+ * 行削除プランナー（utils_RowDeletion.js）の動作確認
+ * ランダムなシートと削除行で、範囲ごとの deleteRows の結果が1行ずつ deleteRow した場合と一致することと、
+ * シート操作の回数が範囲数と同じになることを確認する
+ * 実行: node bench/row_deletion.check.js [ランダムケース数]
+ */
+
+const assert = require("assert");
+const { createEmulator } = require("./gas_emulator");
+
+const CASE_COUNT = Number(process.argv[2]) || 300;
+const FILES = ["utils/utils_RowDeletion.js"];
+
+// 再現可能な疑似乱数（mulberry32）
+function createRandom(seed) {
+  return () => {
+    seed = (seed + 0x6D2B79F5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+function callsOf(emulator, method) {
+  const entry = emulator.costs.byMethod[method];
+  return entry ? entry.calls : 0;
+}
+
+/**
+ * ランダムなシートの内容を作る
+ * options.formulas: 数式を含める, options.textLike: 数値として解釈され得る文字列を含める
+ */
+function buildSheetData(random, rows, columns, options) {
+  const values = [];
+  const formats = [];
+  const backgrounds = [];
+  for (let r = 0; r < rows; r++) {
+    const row = [];
+    const formatRow = [];
+    const backgroundRow = [];
+    for (let c = 0; c < columns; c++) {
+      const kind = random();
+      if (kind < 0.35) row.push(Math.floor(random() * 10000));
+      else if (kind < 0.6) row.push("商品" + Math.floor(random() * 100));
+      else if (kind < 0.7) row.push(new Date(Date.UTC(2024, 0, 1 + Math.floor(random() * 365))));
+      else if (options.formulas && kind < 0.75) row.push("=A" + (1 + Math.floor(random() * rows)));
+      else if (options.textLike && kind < 0.8) row.push("00" + Math.floor(random() * 100));
+      else row.push("");
+      formatRow.push(random() < 0.2 ? "#,##0" : random() < 0.1 ? "yyyy/mm/dd" : null);
+      backgroundRow.push(random() < 0.1 ? "#fff2cc" : null);
+    }
+    values.push(row);
+    formats.push(formatRow);
+    backgrounds.push(backgroundRow);
+  }
+  return { values, formats, backgrounds };
+}
+
+function createSheet(data) {
+  const emulator = createEmulator();
+  emulator.loadProject(FILES);
+  const sheet = emulator.spreadsheet.insertSheet("対象");
+  sheet.load(1, 1, data.values);
+  data.formats.forEach((row, r) => row.forEach((format, c) => {
+    if (format) sheet.getRange(r + 1, c + 1).setNumberFormat(format);
+  }));
+  data.backgrounds.forEach((row, r) => row.forEach((color, c) => {
+    if (color) sheet.getRange(r + 1, c + 1).setBackground(color);
+  }));
+  emulator.resetCosts();
+  return { emulator, sheet };
+}
+
+// 値（数式は数式のまま）・表示形式・背景色・行数
+function snapshot(sheet) {
+  const range = sheet.getRange(1, 1, sheet.getMaxRows(), Math.max(1, sheet.getMaxColumns()));
+  return {
+    values: sheet.dump(),
+    numberFormats: range.getNumberFormats(),
+    backgrounds: range.getBackgrounds(),
+    maxRows: sheet.getMaxRows()
+  };
+}
+
+function checkRandomSheets(caseCount) {
+  const random = createRandom(7);
+  const totals = { legacy: 0, planned: 0 };
+
+  for (let n = 0; n < caseCount; n++) {
+    const rows = 1 + Math.floor(random() * 120);
+    const columns = 1 + Math.floor(random() * 12);
+    const options = { formulas: random() < 0.25, textLike: random() < 0.25 };
+    const data = buildSheetData(random, rows, columns, options);
+
+    // 連続する範囲と離れた行を混ぜ、データ範囲外の行も含める
+    const rowsToDelete = [];
+    const density = random();
+    for (let row = 1; row <= rows + 5; row++) {
+      if (random() < density * 0.5) {
+        const length = 1 + Math.floor(random() * 4);
+        for (let k = 0; k < length; k++) rowsToDelete.push(row + k);
+        row += length;
+      }
+    }
+
+    const legacy = createSheet(data);
+    Array.from(new Set(rowsToDelete)).sort((a, b) => b - a).forEach(row => legacy.sheet.deleteRow(row));
+    totals.legacy += legacy.emulator.costs.calls;
+
+    const target = createSheet(data);
+    const stats = target.emulator.context.utils_deleteRowsPlanned(target.sheet, rowsToDelete);
+    totals.planned += target.emulator.costs.calls;
+
+    assert.strictEqual(target.emulator.costs.reads, 0, `ケース ${n + 1} でシートを読み取りました`);
+    assert.strictEqual(stats.apiCalls, stats.runs);
+    assert.deepStrictEqual(snapshot(target.sheet), snapshot(legacy.sheet), `ケース ${n + 1} で結果が一致しません`);
+  }
+
+  console.log(`ランダム ${caseCount}シート: 1行ずつの削除と一致`);
+  console.log(`シートAPI呼び出し: 1行ずつ ${totals.legacy}回 / 範囲ごと ${totals.planned}回`);
+}
+
+/**
+ * 連続する行は1回の deleteRows にまとめること
+ */
+function checkRuns() {
+  const { emulator, sheet } = createSheet(buildSheetData(createRandom(1), 40, 3, {}));
+  const rows = [30, 2, 3, 4, 10, 31, 32, 3];
+  const stats = emulator.context.utils_deleteRowsPlanned(sheet, rows);
+  assert.strictEqual(stats.rows, 7);
+  assert.strictEqual(stats.runs, 3);
+  assert.strictEqual(callsOf(emulator, "Sheet.deleteRows"), 3);
+  console.log(`連続する行: ${stats.rows}行を${stats.runs}回の deleteRows で削除`);
+}
+
+checkRuns();
+checkRandomSheets(CASE_COUNT);
+console.log("OK");
@@ -0,0 +1,219 @@
+/**
+ * SP-API商品登録のスケジューラー比較（疑似時計・疑似API）
+ * トークンバケットでスロットリングする疑似SP-APIに対して、
+ * 従来の逐次処理（行ごとにチェック→登録→価格設定＋1秒待機）と spapi_executeRegistration を比較する
+ * 実行: node bench/spapi_scheduler.bench.js [行数] [サーバー側レートの倍率]
+ * 倍率を1未満にすると、クライアントの既定レートより厳しい制限で429と再送の動作を確認できる
+ * "scheduled+cache" は1回目の実行で保存した商品タイプのキャッシュ（PropertiesService）を使う2回目の実行
+ */
+
+const fs = require("fs");
+const path = require("path");
+const vm = require("vm");
+
+const SRC_DIR = path.join(__dirname, "..", "src");
+const ROW_COUNT = Number(process.argv[2]) || 200;
+const SERVER_RATE_SCALE = Number(process.argv[3]) || 1;
+const LATENCY_MS = 300;          // 1リクエスト（fetchAllは1バッチ）あたりの応答時間
+const EXISTING_SKU_RATIO = 0.1;  // 登録済みSKUの割合
+
+// 疑似SP-API側のレート制限（x-amzn-RateLimit-Limit として返す）
+const SERVER_LIMITS = {
+  getListingsItem: { rate: 5, burst: 10 },
+  putListingsItem: { rate: 5, burst: 10 },
+  patchListingsItem: { rate: 5, burst: 10 },
+  getCatalogItem: { rate: 2, burst: 2 }
+};
+
+function createFakeServer(clock) {
+  const limits = {};
+  Object.keys(SERVER_LIMITS).forEach(operation => {
+    limits[operation] = {
+      rate: SERVER_LIMITS[operation].rate * SERVER_RATE_SCALE,
+      burst: Math.max(1, Math.floor(SERVER_LIMITS[operation].burst * SERVER_RATE_SCALE))
+    };
+  });
+  const buckets = {};
+  const stats = { requests: 0, throttled: 0 };
+
+  function operationOf(request) {
+    const method = (request.method || "get").toLowerCase();
+    if (request.url.indexOf("/catalog/") !== -1) return "getCatalogItem";
+    return method + "ListingsItem";
+  }
+
+  function take(operation) {
+    const limit = limits[operation];
+    let bucket = buckets[operation];
+    if (!bucket) {
+      bucket = buckets[operation] = { tokens: limit.burst, updatedAt: clock.now };
+    }
+    bucket.tokens = Math.min(limit.burst, bucket.tokens + (clock.now - bucket.updatedAt) / 1000 * limit.rate);
+    bucket.updatedAt = clock.now;
+    if (bucket.tokens < 1) return false;
+    bucket.tokens -= 1;
+    return true;
+  }
+
+  function respond(request) {
+    const operation = operationOf(request);
+    const headers = { "x-amzn-RateLimit-Limit": String(limits[operation].rate) };
+    stats.requests++;
+
+    if (!take(operation)) {
+      stats.throttled++;
+      return fakeResponse(429, JSON.stringify({ errors: [{ code: "QuotaExceeded" }] }), headers);
+    }
+
+    if (operation === "getListingsItem") {
+      const sku = decodeURIComponent(request.url.split("/").pop().split("?")[0]);
+      const exists = Number(sku.split("-")[1]) % Math.round(1 / EXISTING_SKU_RATIO) === 0;
+      return fakeResponse(exists ? 200 : 404, "{}", headers);
+    }
+    if (operation === "getCatalogItem") {
+      return fakeResponse(200, JSON.stringify({ productTypes: [{ marketplaceId: "A1VC38T7YXB528", productType: "PRODUCT" }] }), headers);
+    }
+    return fakeResponse(200, JSON.stringify({ status: "ACCEPTED" }), headers);
+  }
+
+  return {
+    stats: stats,
+    fetch: (url, request) => {
+      clock.now += LATENCY_MS;
+      return respond(Object.assign({ url: url }, request));
+    },
+    fetchAll: requests => {
+      // fetchAll は並列送信のため、バッチ全体で1回分の応答時間とする
+      clock.now += LATENCY_MS;
+      return requests.map(respond);
+    }
+  };
+}
+
+function fakeResponse(code, body, headers) {
+  return {
+    getResponseCode: () => code,
+    getContentText: () => body,
+    getHeaders: () => headers
+  };
+}
+
+// 実行をまたいで残る PropertiesService の疑似ストア（CacheService は実行ごとに空にする）
+function createFakeStores() {
+  const store = {};
+  const properties = {
+    getProperty: key => (key in store ? store[key] : null),
+    setProperty: (key, value) => { store[key] = value; },
+    deleteProperty: key => { delete store[key]; }
+  };
+  const cache = {
+    get: () => null,
+    put: () => {},
+    remove: () => {}
+  };
+  return {
+    PropertiesService: { getScriptProperties: () => properties },
+    CacheService: { getScriptCache: () => cache }
+  };
+}
+
+function loadSources(clock, server, stores) {
+  const noop = () => {};
+  const range = { setValue: noop, setBackground: noop };
+  const context = vm.createContext({
+    console: { log: noop, error: noop },
+    Logger: { log: noop },
+    UrlFetchApp: { fetch: server.fetch, fetchAll: server.fetchAll },
+    Utilities: { sleep: ms => { clock.now += ms; } },
+    PropertiesService: stores.PropertiesService,
+    CacheService: stores.CacheService,
+    Date: { now: () => clock.now },
+    Math: Math,
+    JSON: JSON,
+    Map: Map
+  });
+  ["core/core_config.js", "utils/utils_Fingerprint.js", "utils/utils_SpApiCache.js", "utils/utils_SpApiHelper.js", "utils/utils_SpApiScheduler.js", "sp-api/spapi_registerProducts.js"].forEach(file => {
+    vm.runInContext(fs.readFileSync(path.join(SRC_DIR, file), "utf8"), context, { filename: file });
+  });
+  context.sheet = { getRange: () => range };
+  return context;
+}
+
+function buildRows(count) {
+  const rows = [];
+  for (let i = 0; i < count; i++) {
+    rows.push({
+      rowNumber: i + 3,
+      asin: "B0" + String(i).padStart(8, "0"),
+      sku: "SKU-" + i,
+      price: 1980,
+      breakEvenPrice: 1500,
+      duplicateValue: ""
+    });
+  }
+  return rows;
+}
+
+const SCRIPT_CONFIG = {
+  SP_API_ENDPOINT: "https://sellingpartnerapi-fe.amazon.com",
+  SELLER_ID: "SELLER",
+  MARKETPLACE_ID: "A1VC38T7YXB528",
+  AUTOMATED_PRICING_RULE_ID: ""
+};
+
+// 変更前の spapi_executeRegistration と同じ逐次処理
+function runSequential(context, rows) {
+  const results = [];
+  rows.forEach(row => {
+    try {
+      if (context.spapi_checkSkuExists("token", row.sku, SCRIPT_CONFIG)) {
+        results.push("スキップ");
+        return;
+      }
+    } catch (e) {
+      // 変更前と同じく登録へ進む
+    }
+    try {
+      const response = context.spapi_putListing("token", row.sku, row.asin, row.price, SCRIPT_CONFIG);
+      results.push("成功");
+      try {
+        context.spapi_patchPricingSettings("token", row.sku, Math.ceil(row.breakEvenPrice * 0.9), response.productType, SCRIPT_CONFIG);
+      } catch (e) {
+        // 価格設定エラーは登録結果に影響しない
+      }
+    } catch (e) {
+      results.push("エラー");
+    }
+    context.Utilities.sleep(1000);
+  });
+  return results;
+}
+
+function runScheduled(context, rows) {
+  const analysisResult = { skippedRows: [] };
+  return context.spapi_executeRegistration(context.sheet, "token", SCRIPT_CONFIG, rows, analysisResult)
+    .map(result => result.status);
+}
+
+function report(label, clock, server, statuses) {
+  const counts = {};
+  statuses.forEach(status => { counts[status] = (counts[status] || 0) + 1; });
+  console.log(`${label.padEnd(16)} ${(clock.now / 1000).toFixed(1).padStart(8)} s (simulated)  requests=${server.stats.requests} 429=${server.stats.throttled}  ${JSON.stringify(counts)}`);
+}
+
+function main() {
+  const rows = buildRows(ROW_COUNT);
+  console.log(`rows=${ROW_COUNT} latency=${LATENCY_MS}ms server-rate-scale=${SERVER_RATE_SCALE}`);
+
+  const stores = createFakeStores();
+
+  [["sequential", runSequential, createFakeStores()], ["scheduled", runScheduled, stores], ["scheduled+cache", runScheduled, stores]].forEach(([label, run, runStores]) => {
+    const clock = { now: 0 };
+    const server = createFakeServer(clock);
+    const context = loadSources(clock, server, runStores);
+    const statuses = run(context, rows);
+    report(label, clock, server, statuses);
+  });
+}
+
+main();
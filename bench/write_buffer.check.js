@@ -0,0 +1,248 @@
+/**
+ * 書き込みバッファ（utils_WriteBuffer.js）の動作確認
+ * エミュレーターのシートで、バッファ経由の反映結果がセル単位の書き込みと一致することと、
+ * Range の読み書き呼び出し回数を確認する
+ * 実行: node bench/write_buffer.check.js [ランダムケース数]
+ */
+
+const assert = require("assert");
+const { createEmulator } = require("./gas_emulator");
+
+const CASE_COUNT = Number(process.argv[2]) || 300;
+const FILES = ["utils/utils_WriteBuffer.js"];
+
+// 再現可能な疑似乱数（mulberry32）
+function createRandom(seed) {
+  return () => {
+    seed = (seed + 0x6D2B79F5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+function setup() {
+  const emulator = createEmulator();
+  emulator.loadProject(FILES);
+  return emulator;
+}
+
+function callsOf(emulator, method) {
+  const entry = emulator.costs.byMethod[method];
+  return entry ? entry.calls : 0;
+}
+
+// 既定の表示形式・背景色は未設定と区別せずに比較する（呼び出し回数の計測後に使う）
+function snapshot(sheet) {
+  const range = sheet.getRange(1, 1, sheet.getMaxRows(), sheet.getMaxColumns());
+  return {
+    values: sheet.dump(),
+    numberFormats: range.getNumberFormats(),
+    backgrounds: range.getBackgrounds()
+  };
+}
+
+/**
+ * 既存データ（数値・文字列・数式・空白）を持つシートを作る
+ */
+function fillSheet(sheet, rows, columns, random) {
+  const data = [];
+  for (let r = 0; r < rows; r++) {
+    const row = [];
+    for (let c = 0; c < columns; c++) {
+      const kind = random();
+      if (kind < 0.3) row.push(Math.floor(random() * 1000));
+      else if (kind < 0.5) row.push("商品" + r);
+      else if (kind < 0.6) row.push("=A" + (r + 1));
+      else if (kind < 0.65) row.push("00" + r);
+      else row.push("");
+    }
+    data.push(row);
+  }
+  sheet.load(1, 1, data);
+}
+
+/**
+ * 予約した操作をセル単位で直接反映する（期待値）
+ */
+function applyDirectly(sheet, operations) {
+  operations.forEach(op => {
+    const range = sheet.getRange(op.row, op.column);
+    if (op.layer === "values") range.setValue(op.value);
+    else if (op.layer === "numberFormats") range.setNumberFormat(op.value);
+    else range.setBackground(op.value);
+  });
+}
+
+function applyBuffered(context, sheet, operations, options) {
+  const buffer = context.utils_createWriteBuffer(sheet, options);
+  operations.forEach(op => {
+    if (op.layer === "values") context.utils_bufferSetValue(buffer, op.row, op.column, op.value);
+    else if (op.layer === "numberFormats") context.utils_bufferSetNumberFormat(buffer, op.row, op.column, op.value);
+    else context.utils_bufferSetBackground(buffer, op.row, op.column, 1, op.value);
+  });
+  return buffer;
+}
+
+// -----------------------------------------------------------------------------
+// 商品管理シートへの転記と同じ書き込み（AB・AC・AD・AF列と AB列の表示形式、AE列は書き込まない）
+// -----------------------------------------------------------------------------
+function checkTransferPattern() {
+  const emulator = setup();
+  const random = createRandom(1);
+  const sheet = emulator.spreadsheet.insertSheet("商品管理");
+  fillSheet(sheet, 500, 35, random);
+
+  const productRows = [];
+  for (let row = 2; row <= 500; row += 3) {
+    productRows.push(row);
+  }
+
+  const operations = [];
+  productRows.forEach(row => {
+    operations.push({ layer: "values", row: row, column: 28, value: new Date(2024, 0, row % 28 + 1) });
+    operations.push({ layer: "numberFormats", row: row, column: 28, value: "yyyy/mm/dd" });
+    operations.push({ layer: "values", row: row, column: 29, value: row * 10 });
+    operations.push({ layer: "values", row: row, column: 30, value: row * 9 });
+    operations.push({ layer: "values", row: row, column: 32, value: true });
+  });
+
+  // AE列（31）は既存の数値・数式のみにして補完できるようにする
+  productRows.forEach(row => sheet.load(row, 31, [[row % 2 === 0 ? row : "=AC" + row]]));
+
+  const expected = setup();
+  const expectedSheet = expected.spreadsheet.insertSheet("商品管理");
+  expectedSheet.load(1, 1, sheet.dump());
+  expectedSheet.numberFormats = JSON.parse(JSON.stringify(sheet.numberFormats));
+  applyDirectly(expectedSheet, operations);
+
+  const buffer = applyBuffered(emulator.context, sheet, operations, { fillColumns: [28, 29, 30, 31, 32] });
+  const legacyBlocks = 2 * productRows.length + productRows.length; // AB:AD・AF・AB列の表示形式
+  emulator.resetCosts();
+  emulator.context.utils_flushWriteBuffer(buffer);
+
+  const writes = emulator.costs.writes;
+  const reads = emulator.costs.reads;
+  assert.strictEqual(callsOf(emulator, "Range.setValues"), productRows.length);
+  assert.strictEqual(callsOf(emulator, "Range.setNumberFormats"), 1); // 間の行の表示形式を補完して AB列を1回で反映
+  assert.strictEqual(reads, 3); // 値の隙間（AE列）を補完するための getFormulas・getValues と、表示形式の getNumberFormats
+  assert.deepStrictEqual(snapshot(sheet), snapshot(expectedSheet));
+
+  console.log(`転記パターン: ${productRows.length}行 → 書き込み ${writes}回・読み取り ${reads}回（隙間を補完しない場合 ${legacyBlocks}回）`);
+}
+
+// -----------------------------------------------------------------------------
+// fillColumns を指定しない場合は隙間を読み取らず、書き込むセルだけの矩形で反映する
+// -----------------------------------------------------------------------------
+function checkNoFillByDefault() {
+  const emulator = setup();
+  const sheet = emulator.spreadsheet.insertSheet("商品管理");
+  const data = [];
+  for (let row = 1; row <= 20; row++) {
+    data.push(["", "=ARRAYFORMULA(A1:A20)", ""]);
+  }
+  sheet.load(1, 1, data);
+
+  const buffer = emulator.context.utils_createWriteBuffer(sheet);
+  for (let row = 1; row <= 20; row++) {
+    emulator.context.utils_bufferSetValue(buffer, row, 1, row);
+    emulator.context.utils_bufferSetValue(buffer, row, 3, row * 2);
+  }
+  emulator.resetCosts();
+  emulator.context.utils_flushWriteBuffer(buffer);
+
+  assert.strictEqual(emulator.costs.reads, 0);
+  assert.strictEqual(callsOf(emulator, "Range.setValues"), 2);
+  assert.strictEqual(sheet.dump()[0][1], "=ARRAYFORMULA(A1:A20)");
+  console.log("fillColumns の指定なし: 隙間を読み取らず A列・C列を別々に書き込み");
+}
+
+// -----------------------------------------------------------------------------
+// 書き戻すと値が変わり得る文字列が隙間にある場合は補完しない
+// -----------------------------------------------------------------------------
+function checkGuardedGap() {
+  const emulator = setup();
+  const sheet = emulator.spreadsheet.insertSheet("Amazon売上");
+  const data = [];
+  for (let row = 1; row <= 20; row++) {
+    data.push(["", row, row === 10 ? "0012" : "注文", "", ""]);
+  }
+  sheet.load(1, 1, data);
+
+  const buffer = emulator.context.utils_createWriteBuffer(sheet, { fillColumns: [1, 2, 3, 4, 5] });
+  for (let row = 1; row <= 20; row++) {
+    emulator.context.utils_bufferSetValue(buffer, row, 1, "転記済み");
+    emulator.context.utils_bufferSetValue(buffer, row, 5, "2024/01/01");
+  }
+  emulator.resetCosts();
+  emulator.context.utils_flushWriteBuffer(buffer);
+
+  assert.strictEqual(callsOf(emulator, "Range.setValues"), 2);
+  assert.strictEqual(sheet.getRange(10, 3).getValue(), "0012");
+  console.log("隙間に \"0012\" がある場合: A列・E列を別々に書き込み（補完しない）");
+}
+
+// -----------------------------------------------------------------------------
+// ランダムな操作でセル単位の書き込みと結果が一致し、書き込み回数が補完しない場合以下であること
+// -----------------------------------------------------------------------------
+function checkRandomCases(caseCount) {
+  const random = createRandom(42);
+  let bufferedCalls = 0;
+  let legacyCalls = 0;
+  let directCalls = 0;
+
+  for (let n = 0; n < caseCount; n++) {
+    const rows = 5 + Math.floor(random() * 60);
+    const columns = 3 + Math.floor(random() * 20);
+    const seed = Math.floor(random() * 1e9);
+
+    const emulator = setup();
+    const sheet = emulator.spreadsheet.insertSheet("対象");
+    fillSheet(sheet, rows, columns, createRandom(seed));
+
+    const expected = setup();
+    const expectedSheet = expected.spreadsheet.insertSheet("対象");
+    fillSheet(expectedSheet, rows, columns, createRandom(seed));
+
+    const operations = [];
+    const count = 1 + Math.floor(random() * rows * 2);
+    for (let i = 0; i < count; i++) {
+      const layerRoll = random();
+      operations.push({
+        layer: layerRoll < 0.7 ? "values" : layerRoll < 0.9 ? "numberFormats" : "backgrounds",
+        row: 1 + Math.floor(random() * (rows + 5)),
+        column: 1 + Math.floor(random() * (columns + 3)),
+        value: layerRoll < 0.7 ? (random() < 0.5 ? Math.floor(random() * 100) : "値" + i) : layerRoll < 0.9 ? "0.00" : "#ff0000"
+      });
+    }
+
+    // 補完してよい列は、すべて・なし・一部のいずれか
+    const fillRoll = random();
+    const fillColumns = [];
+    for (let column = 1; column <= columns + 3; column++) {
+      if (fillRoll < 0.4 || (fillRoll >= 0.6 && random() < 0.5)) fillColumns.push(column);
+    }
+
+    applyDirectly(expectedSheet, operations);
+    const buffer = applyBuffered(emulator.context, sheet, operations, { fillColumns: fillColumns });
+
+    Object.keys(buffer.layers).forEach(name => {
+      legacyCalls += emulator.context.utils_buildWriteBlocks_(buffer.layers[name]).length;
+    });
+    emulator.resetCosts();
+    emulator.context.utils_flushWriteBuffer(buffer);
+
+    bufferedCalls += emulator.costs.reads + emulator.costs.writes;
+    assert.deepStrictEqual(snapshot(sheet), snapshot(expectedSheet), `ケース ${n + 1} で反映結果が一致しません`);
+    directCalls += operations.length;
+  }
+
+  assert.ok(bufferedCalls <= legacyCalls, `補完後の呼び出し回数 ${bufferedCalls} が補完しない場合 ${legacyCalls} を超えています`);
+  console.log(`ランダム ${caseCount}ケース: 結果一致、読み書き ${bufferedCalls}回（補完しない場合 ${legacyCalls}回、セル単位 ${directCalls}回）`);
+}
+
+checkTransferPattern();
+checkNoFillByDefault();
+checkGuardedGap();
+checkRandomCases(CASE_COUNT);
+console.log("OK");
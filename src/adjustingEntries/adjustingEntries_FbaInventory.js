@@ -51,18 +51,92 @@ function adjustingEntries_adjustFbaInventory() {
     return;
   }
 
+  // SKUが多い場合は途中で中断し、続きを時間主導トリガーで再開する
+  var result = core_runJob(adjustingEntries_createFbaInventoryJob_(fbaData));
+
+  ui.alert(result.complete ? "完了" : "中断", result.message, ui.ButtonSet.OK);
+}
+
+/**
+ * FBA在庫調整のジョブ定義（状態: 次に処理する年末FBA在庫シートの行・件数）
+ * @param {Object[]} fbaData - 処理対象（省略時は開始時に読み込む）
+ */
+function adjustingEntries_createFbaInventoryJob_(fbaData) {
+  return {
+    name: "adjustingEntries_adjustFbaInventory",
+    title: "FBA在庫調整",
+    factory: "adjustingEntries_createFbaInventoryJob_",
+    start: function() {
+      var data = fbaData || adjustingEntries_getFbaInventoryData(adjustingEntries_getSheet_(ADJUSTING_ENTRIES_CONFIG.FBA_SHEET_NAME));
+      if (data.length === 0) {
+        return "処理対象のデータがありません。";
+      }
+      return {
+        nextRow: ADJUSTING_ENTRIES_CONFIG.FBA_DATA_START_ROW,
+        successCount: 0,
+        errorCount: 0,
+        skipCount: 0,
+        done: 0,
+        total: data.length
+      };
+    },
+    open: adjustingEntries_openFbaInventory_,
+    runChunk: adjustingEntries_runFbaInventoryChunk_,
+    finish: function(state) {
+      return "FBA在庫調整が完了しました。\n\n" +
+        "処理SKU数: " + state.total + "件\n" +
+        "成功: " + state.successCount + "件\n" +
+        "エラー: " + state.errorCount + "件\n" +
+        "スキップ: " + state.skipCount + "件";
+    }
+  };
+}
+
+function adjustingEntries_openFbaInventory_(state) {
+  var fbaSheet = adjustingEntries_getSheet_(ADJUSTING_ENTRIES_CONFIG.FBA_SHEET_NAME);
+  var productSheet = adjustingEntries_getSheet_(ADJUSTING_ENTRIES_CONFIG.PRODUCT_SHEET_NAME);
   var productData = adjustingEntries_getProductData(productSheet);
-  var result = adjustingEntries_processAllSkus(fbaSheet, productSheet, fbaData, productData);
-
-  ui.alert(
-    "完了",
-    "FBA在庫調整が完了しました。\n\n" +
-    "処理SKU数: " + result.totalCount + "件\n" +
-    "成功: " + result.successCount + "件\n" +
-    "エラー: " + result.errorCount + "件\n" +
-    "スキップ: " + result.skipCount + "件",
-    ui.ButtonSet.OK
-  );
+
+  // 処理済み（V列 OK）は読み込み時に除かれるため、前回の実行で NG になった行だけを行番号で除く
+  var fbaData = adjustingEntries_getFbaInventoryData(fbaSheet).filter(function(fbaItem) {
+    return fbaItem.rowIndex >= state.nextRow;
+  });
+
+  return {
+    fbaSheet: fbaSheet,
+    productSheet: productSheet,
+    fbaData: fbaData,
+    position: 0,
+    productData: productData,
+    productIndex: utils_buildProductIndex(productData, ADJUSTING_ENTRIES_CONFIG.PRODUCT_DATA_START_ROW)
+  };
+}
+
+function adjustingEntries_runFbaInventoryChunk_(state, context, chunkRows) {
+  var chunk = context.fbaData.slice(context.position, context.position + chunkRows);
+
+  // シートが編集されて残りが減った場合はここで終える
+  if (chunk.length === 0) {
+    state.done = state.total;
+    return;
+  }
+
+  var result = adjustingEntries_processAllSkus(context.fbaSheet, context.productSheet, chunk, context.productData, context.productIndex);
+
+  state.successCount += result.successCount;
+  state.errorCount += result.errorCount;
+  state.skipCount += result.skipCount;
+  state.nextRow = chunk[chunk.length - 1].rowIndex + 1;
+  state.done = Math.min(state.total, state.done + chunk.length);
+  context.position += chunk.length;
+}
+
+function adjustingEntries_getSheet_(sheetName) {
+  var sheet = SpreadsheetApp.getActiveSpreadsheet().getSheetByName(sheetName);
+  if (!sheet) {
+    throw new Error("「" + sheetName + "」シートが見つかりません。");
+  }
+  return sheet;
 }
 
 function adjustingEntries_getFbaInventoryData(fbaSheet) {
@@ -114,7 +188,7 @@ function adjustingEntries_getProductData(productSheet) {
   return dataRange.getValues();
 }
 
-function adjustingEntries_processAllSkus(fbaSheet, productSheet, fbaData, productData) {
+function adjustingEntries_processAllSkus(fbaSheet, productSheet, fbaData, productData, productIndex) {
   var result = {
     totalCount: fbaData.length,
     successCount: 0,
@@ -122,27 +196,34 @@ function adjustingEntries_processAllSkus(fbaSheet, productSheet, fbaData, produc
     skipCount: 0
   };
 
+  // 書き込みはバッファに蓄積し、全SKUの処理後に一括で反映
+  var fbaBuffer = utils_createWriteBuffer(fbaSheet);
+  var productBuffer = utils_createWriteBuffer(productSheet);
+  var fbaLastCol = fbaSheet.getLastColumn();
+
   for (var i = 0; i < fbaData.length; i++) {
     var fbaItem = fbaData[i];
-    var processResult = adjustingEntries_processSingleSku(productSheet, productData, fbaItem);
+    var processResult = adjustingEntries_processSingleSku(productBuffer, productData, productIndex, fbaItem);
 
     if (processResult.status === "OK") {
       result.successCount++;
-      adjustingEntries_markAsProcessed(fbaSheet, fbaItem.rowIndex, "OK", processResult.message);
+      adjustingEntries_markAsProcessed(fbaBuffer, fbaItem.rowIndex, "OK", processResult.message, fbaLastCol);
     } else if (processResult.status === "SKIP") {
       result.skipCount++;
-      adjustingEntries_markAsProcessed(fbaSheet, fbaItem.rowIndex, "OK", "調整不要");
+      adjustingEntries_markAsProcessed(fbaBuffer, fbaItem.rowIndex, "OK", "調整不要", fbaLastCol);
     } else {
       result.errorCount++;
-      adjustingEntries_markAsProcessed(fbaSheet, fbaItem.rowIndex, "NG", processResult.error);
+      adjustingEntries_markAsProcessed(fbaBuffer, fbaItem.rowIndex, "NG", processResult.error, fbaLastCol);
     }
   }
 
+  utils_flushWriteBuffers([productBuffer, fbaBuffer]);
+
   return result;
 }
 
-function adjustingEntries_processSingleSku(productSheet, productData, fbaItem) {
-  var matchingRows = adjustingEntries_findRowsBySku(productData, fbaItem.sku);
+function adjustingEntries_processSingleSku(productBuffer, productData, productIndex, fbaItem) {
+  var matchingRows = adjustingEntries_findRowsBySku(productIndex, fbaItem.sku);
 
   if (matchingRows.length === 0) {
     return { status: "ERROR", error: "商品管理シートにSKUが見つかりません" };
@@ -156,7 +237,7 @@ function adjustingEntries_processSingleSku(productSheet, productData, fbaItem) {
     return { status: "SKIP", error: "" };
   }
 
-  var adjustResult = adjustingEntries_adjustAfColumn(productSheet, afStatus.rows, targetFalseCount, currentFalseCount);
+  var adjustResult = adjustingEntries_adjustAfColumn(productBuffer, afStatus.rows, targetFalseCount, currentFalseCount);
 
   if (adjustResult.success) {
     return { status: "OK", message: adjustResult.message };
@@ -165,18 +246,12 @@ function adjustingEntries_processSingleSku(productSheet, productData, fbaItem) {
   }
 }
 
-function adjustingEntries_findRowsBySku(productData, sku) {
-  var matchingRows = [];
-  var skuColIndex = ADJUSTING_ENTRIES_CONFIG.PRODUCT_SKU_COL - 1;
-
-  for (var i = 0; i < productData.length; i++) {
-    var rowSku = productData[i][skuColIndex];
-    if (rowSku && String(rowSku).trim() === sku) {
-      matchingRows.push(i + ADJUSTING_ENTRIES_CONFIG.PRODUCT_DATA_START_ROW);
-    }
+function adjustingEntries_findRowsBySku(productIndex, sku) {
+  // 従来どおり商品管理シート側だけを trim して比較する（前後に空白のあるSKUは一致しない）
+  if (utils_normalizeSearchKey(sku) !== sku) {
+    return [];
   }
-
-  return matchingRows;
+  return utils_getProductRowsByKey(productIndex, sku);
 }
 
 function adjustingEntries_countAfColumnStatus(productData, rows) {
@@ -210,7 +285,7 @@ function adjustingEntries_countAfColumnStatus(productData, rows) {
   };
 }
 
-function adjustingEntries_adjustAfColumn(productSheet, rowDetails, targetFalseCount, currentFalseCount) {
+function adjustingEntries_adjustAfColumn(productBuffer, rowDetails, targetFalseCount, currentFalseCount) {
   var afCol = ADJUSTING_ENTRIES_CONFIG.PRODUCT_AF_COL;
   var adjustedCount = 0;
   var adjustmentType = "";
@@ -220,7 +295,7 @@ function adjustingEntries_adjustAfColumn(productSheet, rowDetails, targetFalseCo
     var falseRows = rowDetails.filter(function(r) { return !r.isSold; });
 
     for (var i = 0; i < toMakeTrue && i < falseRows.length; i++) {
-      productSheet.getRange(falseRows[i].row, afCol).setValue(true);
+      utils_bufferSetValue(productBuffer, falseRows[i].row, afCol, true);
       adjustedCount++;
     }
     adjustmentType = "Trueに変更: " + adjustedCount + "件";
@@ -230,7 +305,7 @@ function adjustingEntries_adjustAfColumn(productSheet, rowDetails, targetFalseCo
     trueRows.reverse();
 
     for (var j = 0; j < toMakeFalse && j < trueRows.length; j++) {
-      productSheet.getRange(trueRows[j].row, afCol).setValue(false);
+      utils_bufferSetValue(productBuffer, trueRows[j].row, afCol, false);
       adjustedCount++;
     }
     adjustmentType = "Falseに変更: " + adjustedCount + "件";
@@ -239,16 +314,11 @@ function adjustingEntries_adjustAfColumn(productSheet, rowDetails, targetFalseCo
   return { success: true, error: "", message: adjustmentType };
 }
 
-function adjustingEntries_markAsProcessed(fbaSheet, rowIndex, status, errorMessage) {
-  var resultCell = fbaSheet.getRange(rowIndex, ADJUSTING_ENTRIES_CONFIG.FBA_RESULT_COL);
-  var errorCell = fbaSheet.getRange(rowIndex, ADJUSTING_ENTRIES_CONFIG.FBA_ERROR_COL);
-
-  resultCell.setValue(status);
-  errorCell.setValue(errorMessage);
+function adjustingEntries_markAsProcessed(fbaBuffer, rowIndex, status, errorMessage, lastCol) {
+  utils_bufferSetValue(fbaBuffer, rowIndex, ADJUSTING_ENTRIES_CONFIG.FBA_RESULT_COL, status);
+  utils_bufferSetValue(fbaBuffer, rowIndex, ADJUSTING_ENTRIES_CONFIG.FBA_ERROR_COL, errorMessage);
 
   if (status === "OK") {
-    var lastCol = fbaSheet.getLastColumn();
-    var rowRange = fbaSheet.getRange(rowIndex, 1, 1, lastCol);
-    rowRange.setBackground(ADJUSTING_ENTRIES_CONFIG.GRAY_COLOR);
+    utils_bufferSetBackground(fbaBuffer, rowIndex, 1, lastCol, ADJUSTING_ENTRIES_CONFIG.GRAY_COLOR);
   }
 }
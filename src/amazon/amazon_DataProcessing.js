@@ -5,55 +5,9 @@
 
 function amazon_processData() {
   try {
-    const spreadsheet = SpreadsheetApp.getActiveSpreadsheet();
-    const amazonSalesSheet = spreadsheet.getSheetByName("Amazon売上");
-    
-    if (!amazonSalesSheet) {
-      throw new Error("Amazon売上シートが見つかりません。");
-    }
-    
-    const productSheet = spreadsheet.getSheetByName("商品管理");
-    if (!productSheet) {
-      throw new Error("商品管理シートが見つかりません。");
-    }
-    
-    const lastRow = amazonSalesSheet.getLastRow();
-    if (lastRow < 3) {
-      throw new Error("処理対象のデータがありません。");
-    }
-    
-    // Amazon売上シートの全データを一括取得
-    const amazonData = amazonSalesSheet.getRange(3, 1, lastRow - 2, amazonSalesSheet.getLastColumn()).getValues();
-    
-    // 商品管理シートの全データを一括取得
-    const productLastRow = productSheet.getLastRow();
-    const productData = productLastRow < 2 ? [] : productSheet.getRange(3, 1, productLastRow - 2, productSheet.getLastColumn()).getValues();
-    
-    // 使用済みの商品管理シート行番号を管理
-    const usedProductRows = new Set();
-    
-    // A列の空白の最初の行を効率的に取得
-    const aColumn = amazonData.map(row => row[0]); // A列のデータのみ抽出
-    const startIndex = aColumn.findIndex(value => value === "" || value === null);
-    
-    // 空白行が見つからない場合は処理終了
-    if (startIndex === -1) {
-      console.log("A列に空白行が見つかりませんでした");
-      return "処理対象の空白行がありませんでした。";
-    }
-    
-    // 空白行から処理開始
-    const result = amazon_processRows(amazonData, productData, startIndex, usedProductRows);
-    const updates = result.updates;
-    const processedCount = result.processedCount;
-    
-    // 結果を一括書き込み
-    if (updates.length > 0) {
-      amazon_batchUpdateSheet(amazonSalesSheet, updates);
-    }
-    
-    console.log(`${processedCount}行のデータを処理しました。`);
-    return `${processedCount}行のデータを処理しました。`;
+    // 行数が多い場合は途中で中断し、続きを時間主導トリガーで再開する
+    const result = core_runJob(amazon_createProcessDataJob_());
+    return result.message;
     
   } catch (error) {
     console.error("processData error:", error);
@@ -61,11 +15,112 @@ function amazon_processData() {
   }
 }
 
-function amazon_processRows(amazonData, productData, startIndex, usedProductRows) {
+/**
+ * データ処理のジョブ定義（状態: 次の行・処理件数・使用済みの商品管理シート行番号）
+ */
+function amazon_createProcessDataJob_() {
+  return {
+    name: "amazon_processData",
+    title: "Amazon売上 データ処理",
+    factory: "amazon_createProcessDataJob_",
+    start: amazon_startProcessData_,
+    open: amazon_openProcessData_,
+    runChunk: amazon_runProcessDataChunk_,
+    finish: state => {
+      console.log(`${state.processedCount}行のデータを処理しました。`);
+      return `${state.processedCount}行のデータを処理しました。`;
+    }
+  };
+}
+
+function amazon_startProcessData_() {
+  const amazonSalesSheet = amazon_getProcessDataSheets_().amazonSalesSheet;
+  
+  const lastRow = amazonSalesSheet.getLastRow();
+  if (lastRow < 3) {
+    throw new Error("処理対象のデータがありません。");
+  }
+  
+  // A列の空白の最初の行を効率的に取得
+  const aColumn = amazonSalesSheet.getRange(3, 1, lastRow - 2, 1).getValues().map(row => row[0]);
+  const startIndex = aColumn.findIndex(value => value === "" || value === null);
+  
+  // 空白行が見つからない場合は処理終了
+  if (startIndex === -1) {
+    console.log("A列に空白行が見つかりませんでした");
+    return "処理対象の空白行がありませんでした。";
+  }
+  
+  return {
+    startIndex: startIndex,
+    nextIndex: startIndex,
+    endIndex: aColumn.length,
+    processedCount: 0,
+    usedProductRows: "",
+    done: 0,
+    total: aColumn.length - startIndex
+  };
+}
+
+function amazon_openProcessData_(state) {
+  const sheets = amazon_getProcessDataSheets_();
+  const amazonSalesSheet = sheets.amazonSalesSheet;
+  const productSheet = sheets.productSheet;
+  
+  // Amazon売上シートの全データを一括取得
+  const amazonData = amazonSalesSheet.getRange(3, 1, state.endIndex, amazonSalesSheet.getLastColumn()).getValues();
+  
+  // 商品管理シートの全データを一括取得
+  const productLastRow = productSheet.getLastRow();
+  const productData = productLastRow < 2 ? [] : productSheet.getRange(3, 1, productLastRow - 2, productSheet.getLastColumn()).getValues();
+  
+  return {
+    amazonSalesSheet: amazonSalesSheet,
+    amazonData: amazonData,
+    // SKU・注文番号の検索インデックスを実行ごとに一度だけ作成
+    productIndex: utils_buildProductIndex(productData, 3),
+    orderIndex: utils_buildOrderNumberIndex(amazonData, 3, 8),
+    // 使用済みの商品管理シート行番号を管理（前回の実行分を引き継ぐ）
+    usedProductRows: core_decodeRowSet(state.usedProductRows)
+  };
+}
+
+function amazon_runProcessDataChunk_(state, context, chunkRows) {
+  const endIndex = Math.min(state.nextIndex + chunkRows, state.endIndex);
+  const result = amazon_processRows(context.amazonData, context.productIndex, context.orderIndex, state.nextIndex, context.usedProductRows, endIndex);
+  
+  // チャンクごとに結果を一括書き込み
+  if (result.updates.length > 0) {
+    amazon_batchUpdateSheet(context.amazonSalesSheet, result.updates);
+  }
+  
+  state.processedCount += result.processedCount;
+  state.nextIndex = endIndex;
+  state.usedProductRows = core_encodeRowSet(context.usedProductRows);
+  state.done = endIndex - state.startIndex;
+}
+
+function amazon_getProcessDataSheets_() {
+  const spreadsheet = SpreadsheetApp.getActiveSpreadsheet();
+  const amazonSalesSheet = spreadsheet.getSheetByName("Amazon売上");
+  
+  if (!amazonSalesSheet) {
+    throw new Error("Amazon売上シートが見つかりません。");
+  }
+  
+  const productSheet = spreadsheet.getSheetByName("商品管理");
+  if (!productSheet) {
+    throw new Error("商品管理シートが見つかりません。");
+  }
+  
+  return { amazonSalesSheet, productSheet };
+}
+
+function amazon_processRows(amazonData, productIndex, orderIndex, startIndex, usedProductRows, endIndex = amazonData.length) {
   const updates = [];
   let processedCount = 0;
   
-  for (let i = startIndex; i < amazonData.length; i++) {
+  for (let i = startIndex; i < endIndex; i++) {
     const row = i + 3; // 実際の行番号（3行目から開始）
     const aValue = amazonData[i][0]; // A列の値
     
@@ -74,7 +129,7 @@ function amazon_processRows(amazonData, productData, startIndex, usedProductRows
       continue;
     }
     
-    const result = amazon_processDataRow(amazonData[i], productData, row, usedProductRows, amazonData);
+    const result = amazon_processDataRow(amazonData[i], productIndex, row, usedProductRows, orderIndex);
     if (!result) {
       continue;
     }
@@ -93,7 +148,7 @@ function amazon_processRows(amazonData, productData, startIndex, usedProductRows
   return { updates, processedCount };
 }
 
-function amazon_processDataRow(rowData, productData, row, usedProductRows, amazonData) {
+function amazon_processDataRow(rowData, productIndex, row, usedProductRows, orderIndex) {
   try {
     const transactionType = rowData[7]; // H列（0ベースなので7）
     const productName = rowData[10]; // K列
@@ -119,18 +174,18 @@ function amazon_processDataRow(rowData, productData, row, usedProductRows, amazo
         
       case "配送サービス":
         const orderNumberFromI = rowData[8]; // I列の注文番号（0ベースなので8）
-        return amazon_processDeliveryService(row, orderNumberFromI, today, amazonData);
+        return amazon_processDeliveryService(row, orderNumberFromI, today, orderIndex);
         
       case "調整":
-        return amazon_processAdjustment(productData, row, productName, sku, today, usedProductRows);
+        return amazon_processAdjustment(productIndex, row, productName, sku, today, usedProductRows);
         
       case "返金":
         const refundOrderNumber = rowData[8]; // I列の注文番号（0ベースなので8）
-        return amazon_processRefund(row, refundOrderNumber, today, amazonData);
+        return amazon_processRefund(row, refundOrderNumber, today, orderIndex);
         
       case "注文":
         const quantity = parseInt(rowData[11]) || 1; // L列の数量（デフォルト1）
-        return amazon_processSKUSearchWithQuantity(productData, row, sku, today, usedProductRows, quantity);
+        return amazon_processSKUSearchWithQuantity(productIndex, row, sku, today, usedProductRows, quantity);
         
       default:
         console.log(`不明なトランザクション種類: ${transactionType}`);
@@ -148,7 +203,7 @@ function amazon_processDataRow(rowData, productData, row, usedProductRows, amazo
   }
 }
 
-function amazon_processAdjustment(productData, row, productName, sku, today, usedProductRows) {
+function amazon_processAdjustment(productIndex, row, productName, sku, today, usedProductRows) {
   // FBA在庫返金の場合は転記対象外
   if (productName && productName.includes("FBA在庫の返金 - 購入者による返品:")) {
     return {
@@ -165,7 +220,7 @@ function amazon_processAdjustment(productData, row, productName, sku, today, use
     return null;
   }
   
-  const foundRow = amazon_searchSKUInArray(productData, sku, usedProductRows);
+  const foundRow = amazon_searchSKUInArray(productIndex, sku, usedProductRows);
   if (!foundRow) {
     console.log(`行 ${row}: SKU ${sku} が見つかりませんでした、スキップします`);
     return null;
@@ -179,14 +234,14 @@ function amazon_processAdjustment(productData, row, productName, sku, today, use
   };
 }
 
-function amazon_processRefund(row, orderNumber, today, amazonData) {
+function amazon_processRefund(row, orderNumber, today, orderIndex) {
   if (!orderNumber) {
     console.log(`行 ${row}: I列に注文番号が見つかりませんでした、スキップします`);
     return null;
   }
   
   // Amazon売上シート内でI列の注文番号を検索（自分自身を除く）
-  const foundRow = amazon_searchOrderNumberInData(amazonData, orderNumber, row);
+  const foundRow = amazon_searchOrderNumberInData(orderIndex, orderNumber, row);
   if (foundRow) {
     return {
       aValue: "", // 使用しない
@@ -200,7 +255,7 @@ function amazon_processRefund(row, orderNumber, today, amazonData) {
   }
 }
 
-function amazon_processSKUSearchWithQuantity(productData, row, sku, today, usedProductRows, quantity) {
+function amazon_processSKUSearchWithQuantity(productIndex, row, sku, today, usedProductRows, quantity) {
   if (!sku) {
     console.log(`行 ${row}: SKUが見つかりませんでした、スキップします`);
     return null;
@@ -210,7 +265,7 @@ function amazon_processSKUSearchWithQuantity(productData, row, sku, today, usedP
   
   // 数量分だけ繰り返し検索
   for (let i = 0; i < quantity; i++) {
-    const foundRow = amazon_searchSKUInArray(productData, sku, usedProductRows);
+    const foundRow = amazon_searchSKUInArray(productIndex, sku, usedProductRows);
     if (foundRow) {
       foundRows.push(foundRow);
       usedProductRows.add(foundRow); // 即座に使用済みに追加
@@ -234,14 +289,14 @@ function amazon_processSKUSearchWithQuantity(productData, row, sku, today, usedP
   }
 }
 
-function amazon_processDeliveryService(row, orderNumber, today, amazonData) {
+function amazon_processDeliveryService(row, orderNumber, today, orderIndex) {
   if (!orderNumber) {
     console.log(`行 ${row}: I列に注文番号が見つかりませんでした、スキップします`);
     return null;
   }
   
   // Amazon売上シート内でI列の注文番号を検索（自分自身を除く）
-  const foundRow = amazon_searchOrderNumberInData(amazonData, orderNumber, row);
+  const foundRow = amazon_searchOrderNumberInData(orderIndex, orderNumber, row);
   if (foundRow) {
     return {
       aValue: "", // 使用しない
@@ -289,87 +344,37 @@ function amazon_getColumnByHeader(sheet, headerName) {
 }
 
 function amazon_batchUpdateSheet(amazonSalesSheet, updates) {
-  // A列、B列、C列、D列の更新を一括で実行
-  const aUpdates = [];
-  const bUpdates = [];
-  const cUpdates = [];
-  const dUpdates = [];
+  // A列、B列、C列、D列の更新をバッファに蓄積し、連続範囲ごとに一括で実行
+  // A〜D列はこの処理が行ごとに書き込む列のため、書き込まない列を補完して矩形をまとめる
+  const buffer = utils_createWriteBuffer(amazonSalesSheet, { fillColumns: [1, 2, 3, 4] });
   
   updates.forEach(update => {
     if (update.aValue !== "") {
-      aUpdates.push([update.row, 1, update.aValue]);
+      utils_bufferSetValue(buffer, update.row, 1, update.aValue);
     }
     if (update.bValue !== "") {
-      bUpdates.push([update.row, 2, update.bValue]);
+      utils_bufferSetValue(buffer, update.row, 2, update.bValue);
     }
     if (update.cValue !== undefined && update.cValue !== "") {
-      cUpdates.push([update.row, 3, update.cValue]);
+      utils_bufferSetFormula(buffer, update.row, 3, update.cValue);
     }
     if (update.dValue !== "") {
-      dUpdates.push([update.row, 4, update.dValue]);
+      utils_bufferSetValue(buffer, update.row, 4, update.dValue);
     }
   });
   
-  // バッチ更新実行
-  if (aUpdates.length > 0) {
-    aUpdates.forEach(([row, col, value]) => {
-      amazonSalesSheet.getRange(row, col).setValue(value);
-    });
-  }
-  
-  if (bUpdates.length > 0) {
-    bUpdates.forEach(([row, col, value]) => {
-      amazonSalesSheet.getRange(row, col).setValue(value);
-    });
-  }
-  
-  if (cUpdates.length > 0) {
-    cUpdates.forEach(([row, col, value]) => {
-      amazonSalesSheet.getRange(row, col).setValue(value);
-    });
-  }
-  
-  if (dUpdates.length > 0) {
-    dUpdates.forEach(([row, col, value]) => {
-      amazonSalesSheet.getRange(row, col).setValue(value);
-    });
-  }
+  utils_flushWriteBuffer(buffer);
 }
 
-function amazon_searchSKUInArray(productData, sku, usedProductRows = new Set()) {
-  for (let i = 0; i < productData.length; i++) {
-    const row = i + 3;
-    const skuColumnIndex = 24;
-    const sheetSku = productData[i][skuColumnIndex];
-
-    if (usedProductRows.has(row)) {
-      continue;
-    }
-
-    const status = utils_calculateProductStatus(productData[i]);
-
-    if (String(sheetSku).trim() === String(sku).trim() && status !== PRODUCT_STATUS.SOLD) {
-      return row;
-    }
-  }
-
-  return null;
+function amazon_searchSKUInArray(productIndex, sku, usedProductRows = new Set()) {
+  // 配列データが渡された場合もインデックス化して検索する
+  return utils_findProductRow(utils_ensureProductIndex(productIndex, 3), sku, usedProductRows);
 }
 
-function amazon_searchOrderNumberInData(amazonData, orderNumber, excludeRow = null) {
-  for (let i = 0; i < amazonData.length; i++) {
-    const row = i + 3; // 実際の行番号（3行目から開始）
-    const sheetOrderNumber = amazonData[i][8]; // I列（0ベースなので8）
-    
-    // 除外対象行をスキップ
-    if (excludeRow && row === excludeRow) {
-      continue;
-    }
-    
-    if (String(sheetOrderNumber).trim() === String(orderNumber).trim()) {
-      return row;
-    }
+function amazon_searchOrderNumberInData(orderIndex, orderNumber, excludeRow = null) {
+  if (!orderIndex.isOrderNumberIndex) {
+    orderIndex = utils_buildOrderNumberIndex(orderIndex, 3, 8); // I列（0ベースなので8）
   }
   
-  return null;
+  return utils_findOrderNumberRow(orderIndex, orderNumber, excludeRow);
 }
\ No newline at end of file
@@ -0,0 +1,364 @@
+/**
+ * Finances API 増分同期
+ *
+ * 対象月のファイナンシャルイベントをページ単位で取得し、月ごとのイベントストア（非表示シート）に
+ * 新しいイベントだけを追記する。NextToken とカーソル（取得済みの最新記帳日時）を
+ * スクリプトプロパティに保存し、実行時間の上限に近づいたら時間主導トリガーで続きから再開する
+ * 記帳が遅れて反映されるイベントを取りこぼさないよう、新しいパスはカーソルより前（OVERLAP_MS）から取得し、
+ * 明細単位の重複判定キーで取得済みのイベントを除外する
+ */
+
+const FINANCES_SYNC_CONFIG = {
+  OPERATION: "listFinancialEvents",                 // SPAPI_RATE_LIMITS のキー
+  CHECKPOINT_PROPERTY_PREFIX: "FINANCES_SYNC_",     // + YYYYMM: チェックポイント（JSON）
+  ACTIVE_MONTH_PROPERTY: "FINANCES_SYNC_ACTIVE_MONTH",
+  STORE_SHEET_PREFIX: "_fin_",                      // + YYYYMM: イベントストア
+  MAX_RUNTIME_MS: 4.5 * 60 * 1000,                  // 1回の実行で取得に使う時間（上限6分）
+  RESUME_DELAY_MS: 60 * 1000,
+  RESUME_HANDLER: "amazon_resumeFinancesSync",
+  POSTED_BEFORE_MARGIN_MS: 3 * 60 * 1000,           // PostedBefore は現在時刻の2分以上前である必要がある
+  OVERLAP_MS: 48 * 60 * 60 * 1000,                  // 新しいパスで取り直す期間（記帳の反映は最大48時間遅れる）
+  KEY_VERSION: "v3",                                // 重複判定キーの形式（異なるストアは取り直す）
+  LOCK_TIMEOUT_MS: 10 * 1000
+};
+
+/**
+ * 対象月のファイナンシャルイベントを同期する
+ * 前回の実行が途中で終わっている場合は NextToken から、完了済みの場合はカーソル以降を取得する
+ * @param {string} targetMonth - 対象月（YYYYMM形式）
+ * @param {string} accessToken - アクセストークン
+ * @param {Object} options - { startedAt: 実行開始時刻, scheduler: SP-APIスケジューラー }
+ * @returns {Object} { complete, pageCount, added, total }
+ */
+function amazon_syncFinancialEvents(targetMonth, accessToken, options) {
+  options = options || {};
+  const startedAt = options.startedAt || Date.now();
+  const scheduler = options.scheduler || utils_createSpApiScheduler();
+  const endpoint = PropertiesService.getScriptProperties().getProperty("SP_API_ENDPOINT");
+
+  if (!endpoint) {
+    throw new Error("SP_API_ENDPOINTがスクリプトプロパティに設定されていません");
+  }
+
+  const year = parseInt(targetMonth.substring(0, 4), 10);
+  const month = parseInt(targetMonth.substring(4, 6), 10);
+  const { startDate, endDate } = amazon_getDateRange(year, month);
+  const postedBefore = new Date(Math.min(endDate.getTime(), Date.now() - FINANCES_SYNC_CONFIG.POSTED_BEFORE_MARGIN_MS));
+
+  const storeSheet = amazon_getFinancesStoreSheet_(targetMonth);
+  let knownKeys = amazon_readFinancesStoreKeys_(storeSheet);
+
+  // 以前の形式のキーでは別の明細が同じキーになり得るため、月初から取り直す
+  if (amazon_hasLegacyFinancesKeys_(knownKeys)) {
+    console.log(`イベントストアの重複判定キーが古い形式のため、${targetMonth} を月初から取り直します`);
+    amazon_resetFinancesSync(targetMonth);
+    knownKeys = new Set();
+  }
+
+  const checkpoint = amazon_getFinancesCheckpoint(targetMonth) || { nextToken: null, cursor: null, passStart: null, complete: true };
+
+  // 完了済みなら前回のカーソルの少し前から新しいパスとして取得する（取得済みイベントは重複除外される）
+  if (checkpoint.complete || !checkpoint.nextToken) {
+    const overlapStart = checkpoint.cursor ? new Date(checkpoint.cursor).getTime() - FINANCES_SYNC_CONFIG.OVERLAP_MS : 0;
+    checkpoint.passStart = new Date(Math.max(startDate.getTime(), overlapStart)).toISOString();
+    checkpoint.nextToken = null;
+    checkpoint.complete = false;
+  }
+
+  const result = { complete: false, pageCount: 0, added: 0, total: knownKeys.size };
+  let restarted = false;
+
+  const requestPage = () => {
+    const request = amazon_buildFinancialEventsRequest_(endpoint, accessToken, checkpoint, postedBefore);
+    utils_scheduleSpApiRequest(scheduler, FINANCES_SYNC_CONFIG.OPERATION, request, onPage);
+  };
+
+  const onPage = response => {
+    // NextTokenの期限切れはパスの先頭からやり直す（取得済みイベントは重複除外される）
+    if (response.code === 400 && checkpoint.nextToken && !restarted) {
+      console.warn(`NextTokenが無効です。${checkpoint.passStart} から再取得します: ${response.body}`);
+      restarted = true;
+      checkpoint.nextToken = null;
+      requestPage();
+      return;
+    }
+
+    if (response.code !== 200) {
+      console.error(`Finances APIエラー: ${response.body}`);
+      throw new Error(`Finances APIの呼び出しに失敗しました（ステータス: ${response.code}）`);
+    }
+
+    const payload = (response.json() || {}).payload || {};
+    const financialEvents = payload.FinancialEvents || {};
+    const events = amazon_collectFinancialEvents(financialEvents);
+
+    result.pageCount++;
+    result.added += amazon_appendFinancialEvents_(storeSheet, events, knownKeys);
+    result.total = knownKeys.size;
+
+    checkpoint.cursor = amazon_getLatestPostedDate_(financialEvents, checkpoint.cursor);
+    checkpoint.nextToken = payload.NextToken || null;
+    checkpoint.complete = !checkpoint.nextToken;
+    amazon_saveFinancesCheckpoint_(targetMonth, checkpoint);
+
+    console.log(`Finances API ページ ${result.pageCount}: ${events.length}件取得, ${result.added}件追加 (累計 ${result.total}件)`);
+
+    if (checkpoint.complete) {
+      result.complete = true;
+      return;
+    }
+
+    if (Date.now() - startedAt >= FINANCES_SYNC_CONFIG.MAX_RUNTIME_MS) {
+      console.log("実行時間の上限に近づいたため、チェックポイントを保存して中断します");
+      return;
+    }
+
+    requestPage();
+  };
+
+  requestPage();
+  utils_runSpApiScheduler(scheduler);
+
+  return result;
+}
+
+/**
+ * 時間主導トリガーから呼び出され、中断した同期を再開する
+ * 同期を実行中の場合は、再開を後に延ばす
+ */
+function amazon_resumeFinancesSync() {
+  amazon_clearFinancesResumeTriggers_();
+
+  const props = PropertiesService.getScriptProperties();
+  const targetMonth = props.getProperty(FINANCES_SYNC_CONFIG.ACTIVE_MONTH_PROPERTY);
+  if (!targetMonth) {
+    console.log("再開する同期がありません");
+    return;
+  }
+
+  const lock = LockService.getScriptLock();
+  if (!lock.tryLock(FINANCES_SYNC_CONFIG.LOCK_TIMEOUT_MS)) {
+    console.log("別の処理を実行中のため、同期の再開を延期します");
+    amazon_scheduleFinancesResume_(targetMonth);
+    return;
+  }
+
+  try {
+    const message = amazon_generateReportLocked_(targetMonth);
+    console.log(message);
+  } finally {
+    lock.releaseLock();
+  }
+}
+
+/**
+ * 中断した同期の続きを時間主導トリガーで予約する
+ */
+function amazon_scheduleFinancesResume_(targetMonth) {
+  amazon_clearFinancesResumeTriggers_();
+  PropertiesService.getScriptProperties().setProperty(FINANCES_SYNC_CONFIG.ACTIVE_MONTH_PROPERTY, targetMonth);
+
+  ScriptApp.newTrigger(FINANCES_SYNC_CONFIG.RESUME_HANDLER)
+    .timeBased()
+    .after(FINANCES_SYNC_CONFIG.RESUME_DELAY_MS)
+    .create();
+}
+
+/**
+ * 同期の完了後に再開用の状態を片付ける
+ */
+function amazon_finishFinancesSync_() {
+  amazon_clearFinancesResumeTriggers_();
+  PropertiesService.getScriptProperties().deleteProperty(FINANCES_SYNC_CONFIG.ACTIVE_MONTH_PROPERTY);
+}
+
+function amazon_clearFinancesResumeTriggers_() {
+  ScriptApp.getProjectTriggers()
+    .filter(trigger => trigger.getHandlerFunction() === FINANCES_SYNC_CONFIG.RESUME_HANDLER)
+    .forEach(trigger => ScriptApp.deleteTrigger(trigger));
+}
+
+/**
+ * 対象月のチェックポイントを取得する
+ * @param {string} targetMonth - 対象月（YYYYMM形式）
+ * @returns {Object|null} { nextToken, cursor, passStart, complete }
+ */
+function amazon_getFinancesCheckpoint(targetMonth) {
+  const value = PropertiesService.getScriptProperties().getProperty(FINANCES_SYNC_CONFIG.CHECKPOINT_PROPERTY_PREFIX + targetMonth);
+  if (!value) {
+    return null;
+  }
+
+  try {
+    return JSON.parse(value);
+  } catch (e) {
+    return null;
+  }
+}
+
+function amazon_saveFinancesCheckpoint_(targetMonth, checkpoint) {
+  PropertiesService.getScriptProperties().setProperty(
+    FINANCES_SYNC_CONFIG.CHECKPOINT_PROPERTY_PREFIX + targetMonth,
+    JSON.stringify({
+      nextToken: checkpoint.nextToken,
+      cursor: checkpoint.cursor,
+      passStart: checkpoint.passStart,
+      complete: checkpoint.complete
+    })
+  );
+}
+
+/**
+ * 対象月のチェックポイントとイベントストアを破棄する（次回は月初から全件取得する）
+ * @param {string} targetMonth - 対象月（YYYYMM形式）
+ */
+function amazon_resetFinancesSync(targetMonth) {
+  PropertiesService.getScriptProperties().deleteProperty(FINANCES_SYNC_CONFIG.CHECKPOINT_PROPERTY_PREFIX + targetMonth);
+
+  const storeSheet = SpreadsheetApp.getActiveSpreadsheet().getSheetByName(FINANCES_SYNC_CONFIG.STORE_SHEET_PREFIX + targetMonth);
+  if (storeSheet) {
+    storeSheet.clearContents();
+  }
+}
+
+/**
+ * イベントの重複判定キーを作成する
+ * 明細を区別する項目（種類・注文番号・記帳日時・明細ID・SKU・金額と、イベント内で同じ項目の明細の出現順・明細数。
+ * 収集時に event.identity に設定）を組み合わせる
+ * @param {Object} event - イベント行
+ * @returns {string} 重複判定キー
+ */
+function amazon_buildFinancialEventKey(event) {
+  return [FINANCES_SYNC_CONFIG.KEY_VERSION].concat(event.identity).join("|");
+}
+
+/**
+ * 1ページ分のファイナンシャルイベントをイベント行に変換する
+ * @param {Object} financialEvents - payload.FinancialEvents
+ * @returns {Array} イベント行の配列（各行の key に重複判定キーを設定する）
+ */
+function amazon_collectFinancialEvents(financialEvents) {
+  const events = [];
+  amazon_collectShipmentEvents(financialEvents.ShipmentEventList, events);
+  amazon_collectRefundEvents(financialEvents.RefundEventList, events);
+  amazon_collectServiceFeeEvents(financialEvents.ServiceFeeEventList, events);
+  amazon_collectAdjustmentEvents(financialEvents.AdjustmentEventList, events);
+
+  events.forEach(event => {
+    event.key = amazon_buildFinancialEventKey(event);
+  });
+  return events;
+}
+
+/**
+ * 対象月のイベントストアからCSV行（エスケープ済みの文字列）を読み込む
+ * @param {string} targetMonth - 対象月（YYYYMM形式）
+ * @returns {string[]} CSV行の配列（ヘッダーを除く）
+ */
+function amazon_readFinancesStoreLines(targetMonth) {
+  const storeSheet = amazon_getFinancesStoreSheet_(targetMonth);
+  const lastRow = storeSheet.getLastRow();
+  if (lastRow < 1) {
+    return [];
+  }
+
+  return storeSheet.getRange(1, 2, lastRow, 1).getValues().map(row => String(row[0]));
+}
+
+function amazon_buildFinancialEventsRequest_(endpoint, accessToken, checkpoint, postedBefore) {
+  const queryParams = checkpoint.nextToken
+    ? { NextToken: checkpoint.nextToken }
+    : { PostedAfter: checkpoint.passStart, PostedBefore: postedBefore.toISOString() };
+
+  return {
+    url: utils_buildSpApiUrl(endpoint, "/finances/v0/financialEvents", queryParams),
+    method: "get",
+    headers: {
+      "x-amz-access-token": accessToken,
+      "Content-Type": "application/json"
+    },
+    muteHttpExceptions: true
+  };
+}
+
+/**
+ * 新しいイベントだけをストアに追記する（A列: 重複判定キー, B列: CSV行）
+ */
+function amazon_appendFinancialEvents_(storeSheet, events, knownKeys) {
+  const newRows = [];
+
+  events.forEach(event => {
+    if (knownKeys.has(event.key)) {
+      return;
+    }
+    knownKeys.add(event.key);
+    newRows.push([event.key, amazon_toCsvLine(amazon_convertEventToCsvRow(event))]);
+  });
+
+  if (newRows.length > 0) {
+    storeSheet.getRange(storeSheet.getLastRow() + 1, 1, newRows.length, 2).setValues(newRows);
+  }
+
+  return newRows.length;
+}
+
+function amazon_readFinancesStoreKeys_(storeSheet) {
+  const lastRow = storeSheet.getLastRow();
+  if (lastRow < 1) {
+    return new Set();
+  }
+
+  return new Set(storeSheet.getRange(1, 1, lastRow, 1).getValues().map(row => String(row[0])));
+}
+
+function amazon_hasLegacyFinancesKeys_(knownKeys) {
+  const prefix = FINANCES_SYNC_CONFIG.KEY_VERSION + "|";
+  for (const key of knownKeys) {
+    if (key !== "" && key.indexOf(prefix) !== 0) {
+      return true;
+    }
+  }
+  return false;
+}
+
+function amazon_getFinancesStoreSheet_(targetMonth) {
+  const spreadsheet = SpreadsheetApp.getActiveSpreadsheet();
+  const storeName = FINANCES_SYNC_CONFIG.STORE_SHEET_PREFIX + targetMonth;
+  let storeSheet = spreadsheet.getSheetByName(storeName);
+
+  if (!storeSheet) {
+    // insertSheetでアクティブシートが切り替わるため元に戻す
+    const activeSheet = spreadsheet.getActiveSheet();
+    storeSheet = spreadsheet.insertSheet(storeName);
+    storeSheet.hideSheet();
+    // 日付や数値として解釈されないよう書式なしテキストにする
+    storeSheet.getRange("A:B").setNumberFormat("@");
+    if (activeSheet) {
+      activeSheet.activate();
+    }
+  }
+
+  return storeSheet;
+}
+
+/**
+ * ページ内の最新の記帳日時を返す（カーソルより新しい場合のみ更新）
+ */
+function amazon_getLatestPostedDate_(financialEvents, cursor) {
+  let latest = cursor ? new Date(cursor).getTime() : 0;
+
+  Object.keys(financialEvents).forEach(listName => {
+    const list = financialEvents[listName];
+    if (!Array.isArray(list)) {
+      return;
+    }
+    list.forEach(event => {
+      const posted = event.PostedDate ? new Date(event.PostedDate).getTime() : 0;
+      if (posted > latest) {
+        latest = posted;
+      }
+    });
+  });
+
+  return latest > 0 ? new Date(latest).toISOString() : cursor;
+}
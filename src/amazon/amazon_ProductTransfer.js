@@ -5,39 +5,9 @@
 
 function amazon_transferToProductSheet() {
   try {
-    const spreadsheet = SpreadsheetApp.getActiveSpreadsheet();
-    const amazonSalesSheet = spreadsheet.getSheetByName("Amazon売上");
-    const productSheet = spreadsheet.getSheetByName("商品管理");
-    
-    if (!amazonSalesSheet) {
-      throw new Error("Amazon売上シートが見つかりません。");
-    }
-    
-    if (!productSheet) {
-      throw new Error("商品管理シートが見つかりません。");
-    }
-    
-    const lastRow = amazonSalesSheet.getLastRow();
-    let transferredCount = 0;
-    
-    // Amazon売上シートの全データを一括取得
-    const amazonData = amazonSalesSheet.getRange(3, 1, lastRow - 2, amazonSalesSheet.getLastColumn()).getValues();
-
-    // A列の空白の最初の行を効率的に取得
-    const aColumn = amazonData.map(row => row[0]); // A列のデータのみ抽出
-    const startIndex = aColumn.findIndex(value => value === "" || value === null);
-    
-    // 処理対象行が見つからない場合は処理終了
-    if (startIndex === -1) {
-      console.log("A列に空白行が見つかりませんでした");
-      return "転記対象の空白行がありませんでした。";
-    }
-    
-    // 空白行から処理開始
-    transferredCount = amazon_processTransferRows(amazonData, amazonSalesSheet, productSheet, startIndex);
-    
-    console.log(`${transferredCount}行のデータを商品管理シートに転記しました。`);
-    return `${transferredCount}行のデータを商品管理シートに転記しました。`;
+    // 行数が多い場合は途中で中断し、続きを時間主導トリガーで再開する
+    const result = core_runJob(amazon_createTransferJob_());
+    return result.message;
     
   } catch (error) {
     console.error("商品管理シート転記エラー:", error);
@@ -45,10 +15,95 @@ function amazon_transferToProductSheet() {
   }
 }
 
-function amazon_processTransferRows(amazonData, amazonSalesSheet, productSheet, startIndex) {
+/**
+ * 商品管理シート転記のジョブ定義（状態: 次の行・転記件数）
+ */
+function amazon_createTransferJob_() {
+  return {
+    name: "amazon_transferToProductSheet",
+    title: "商品管理シート転記",
+    factory: "amazon_createTransferJob_",
+    // 1行あたりの時間はほぼ一定のため、残りの時間に合わせてチャンクを大きくし、商品管理シートへの書き込みをまとめる
+    adaptiveChunks: true,
+    start: amazon_startTransfer_,
+    open: amazon_openTransfer_,
+    runChunk: amazon_runTransferChunk_,
+    finish: state => {
+      console.log(`${state.transferredCount}行のデータを商品管理シートに転記しました。`);
+      return `${state.transferredCount}行のデータを商品管理シートに転記しました。`;
+    }
+  };
+}
+
+function amazon_startTransfer_() {
+  const amazonSalesSheet = amazon_getTransferSheets_().amazonSalesSheet;
+  const lastRow = amazonSalesSheet.getLastRow();
+  
+  // A列の空白の最初の行を効率的に取得
+  const aColumn = lastRow < 3 ? [] : amazonSalesSheet.getRange(3, 1, lastRow - 2, 1).getValues().map(row => row[0]);
+  const startIndex = aColumn.findIndex(value => value === "" || value === null);
+  
+  // 処理対象行が見つからない場合は処理終了
+  if (startIndex === -1) {
+    console.log("A列に空白行が見つかりませんでした");
+    return "転記対象の空白行がありませんでした。";
+  }
+  
+  return {
+    startIndex: startIndex,
+    nextIndex: startIndex,
+    endIndex: aColumn.length,
+    transferredCount: 0,
+    done: 0,
+    total: aColumn.length - startIndex
+  };
+}
+
+function amazon_openTransfer_(state) {
+  const sheets = amazon_getTransferSheets_();
+  const amazonSalesSheet = sheets.amazonSalesSheet;
+  
+  // Amazon売上シートの全データを一括取得
+  const amazonData = amazonSalesSheet.getRange(3, 1, state.endIndex, amazonSalesSheet.getLastColumn()).getValues();
+  
+  return { amazonSalesSheet: amazonSalesSheet, productSheet: sheets.productSheet, amazonData: amazonData };
+}
+
+function amazon_runTransferChunk_(state, context, chunkRows) {
+  const endIndex = Math.min(state.nextIndex + chunkRows, state.endIndex);
+  
+  // 書き込みはバッファに蓄積し、チャンクの処理後に一括で反映
+  const salesBuffer = utils_createWriteBuffer(context.amazonSalesSheet);
+  // 商品管理シートのAB〜AF列（転記で値だけを書き込む売上欄）は、書き込まない列を補完して1行1回で反映する
+  const productBuffer = utils_createWriteBuffer(context.productSheet, { fillColumns: [28, 29, 30, 31, 32] });
+  
+  state.transferredCount += amazon_processTransferRows(context.amazonData, salesBuffer, productBuffer, state.nextIndex, endIndex);
+  utils_flushWriteBuffers([productBuffer, salesBuffer]);
+  
+  state.nextIndex = endIndex;
+  state.done = endIndex - state.startIndex;
+}
+
+function amazon_getTransferSheets_() {
+  const spreadsheet = SpreadsheetApp.getActiveSpreadsheet();
+  const amazonSalesSheet = spreadsheet.getSheetByName("Amazon売上");
+  const productSheet = spreadsheet.getSheetByName("商品管理");
+  
+  if (!amazonSalesSheet) {
+    throw new Error("Amazon売上シートが見つかりません。");
+  }
+  
+  if (!productSheet) {
+    throw new Error("商品管理シートが見つかりません。");
+  }
+  
+  return { amazonSalesSheet, productSheet };
+}
+
+function amazon_processTransferRows(amazonData, salesBuffer, productBuffer, startIndex, endIndex = amazonData.length) {
   let transferredCount = 0;
   
-  for (let i = startIndex; i < amazonData.length; i++) {
+  for (let i = startIndex; i < endIndex; i++) {
     const row = i + 3; // 実際の行番号（3行目から開始）
     const status = amazonData[i][0]; // A列のステータス
     const targetRow = amazonData[i][1]; // B列の行番号
@@ -64,22 +119,22 @@ function amazon_processTransferRows(amazonData, amazonSalesSheet, productSheet,
     switch (transactionType) {
       case "注文":
         // 注文の処理
-        success = amazon_transferSalesData(amazonSalesSheet, productSheet, row, targetRow);
+        success = amazon_transferSalesData(salesBuffer, productBuffer, row, targetRow, amazonData[i]);
         break;
         
       case "返金":
         // 返金の処理
-        success = amazon_processRefundData(amazonSalesSheet, productSheet, row, targetRow);
+        success = amazon_processRefundData(salesBuffer, productBuffer, row, targetRow);
         break;
         
       case "配送サービス":
         // 配送サービスの処理
-        success = amazon_processShippingService(amazonSalesSheet, productSheet, row, targetRow);
+        success = amazon_processShippingService(salesBuffer, productBuffer, row, targetRow, amazonData[i]);
         break;
         
       case "調整":
         // 調整の処理
-        success = amazon_processAdjustmentData(amazonSalesSheet, productSheet, row, targetRow, amazonData[i]);
+        success = amazon_processAdjustmentData(salesBuffer, productBuffer, row, targetRow, amazonData[i]);
         break;
         
       default:
@@ -97,7 +152,7 @@ function amazon_processTransferRows(amazonData, amazonSalesSheet, productSheet,
   return transferredCount;
 }
 
-function amazon_transferSalesData(amazonSalesSheet, productSheet, sourceRow, targetRow) {
+function amazon_transferSalesData(salesBuffer, productBuffer, sourceRow, targetRow, rowData) {
   try {
     // targetRowがカンマ区切りの場合に分割して処理
     const targetRows = String(targetRow).split(",").map(row => parseInt(row.trim())).filter(row => !isNaN(row));
@@ -107,11 +162,11 @@ function amazon_transferSalesData(amazonSalesSheet, productSheet, sourceRow, tar
       return false;
     }
     
-    // 売上データの取得
-    const saleDate = amazonSalesSheet.getRange(sourceRow, 6).getValue(); // F列
-    const sPrice = amazonSalesSheet.getRange(sourceRow, 19).getValue() || 0; // S列
-    const tPrice = amazonSalesSheet.getRange(sourceRow, 20).getValue() || 0; // T列
-    const revenue = amazonSalesSheet.getRange(sourceRow, 33).getValue() || 0; // AG列
+    // 売上データの取得（一括取得済みの行データから）
+    const saleDate = rowData[5]; // F列
+    const sPrice = rowData[18] || 0; // S列
+    const tPrice = rowData[19] || 0; // T列
+    const revenue = rowData[32] || 0; // AG列
     
     // 日付をDateオブジェクトに変換
     const formattedDate = utils_parseDateOnly(saleDate);
@@ -130,21 +185,20 @@ function amazon_transferSalesData(amazonSalesSheet, productSheet, sourceRow, tar
       try {
         // 商品管理シートに転記
         if (formattedDate) {
-          const cell = productSheet.getRange(row, 28);
-          cell.setValue(formattedDate);
-          cell.setNumberFormat("yyyy/mm/dd"); // 日付形式を設定
+          utils_bufferSetValue(productBuffer, row, 28, formattedDate);
+          utils_bufferSetNumberFormat(productBuffer, row, 28, "yyyy/mm/dd"); // 日付形式を設定
         }
         
         if (totalSalePrice !== 0) {
-          productSheet.getRange(row, 29).setValue(dividedSalePrice); // AC列（販売価格）
+          utils_bufferSetValue(productBuffer, row, 29, dividedSalePrice); // AC列（販売価格）
         }
         
         if (revenue !== 0) {
-          productSheet.getRange(row, 30).setValue(dividedRevenue); // AD列（入金価格）
+          utils_bufferSetValue(productBuffer, row, 30, dividedRevenue); // AD列（入金価格）
         }
         
         // 売却廃却チェックボックスをTrueに設定
-        productSheet.getRange(row, 32).setValue(true); // AF列（売却廃却）
+        utils_bufferSetValue(productBuffer, row, 32, true); // AF列（売却廃却）
         
         successCount++;
         console.log(`${sourceRow}行目の売上データを商品管理シート${row}行目に転記完了（販売価格: ${dividedSalePrice}, 入金価格: ${dividedRevenue}）`);
@@ -157,8 +211,8 @@ function amazon_transferSalesData(amazonSalesSheet, productSheet, sourceRow, tar
     if (successCount > 0) {
       // Amazon売上シートのA列に「転記済み」、E列に転記日を記録
       const today = Utilities.formatDate(new Date(), "Asia/Tokyo", "yyyy/MM/dd");
-      amazonSalesSheet.getRange(sourceRow, 1).setValue("転記済み"); // A列
-      amazonSalesSheet.getRange(sourceRow, 5).setValue(today); // E列
+      utils_bufferSetValue(salesBuffer, sourceRow, 1, "転記済み"); // A列
+      utils_bufferSetValue(salesBuffer, sourceRow, 5, today); // E列
       
       console.log(`${sourceRow}行目: ${successCount}行の転記が完了しました（${targetRows.join(",")}行目、各行 販売価格: ${dividedSalePrice}, 入金価格: ${dividedRevenue}）`);
       return true;
@@ -173,7 +227,7 @@ function amazon_transferSalesData(amazonSalesSheet, productSheet, sourceRow, tar
   }
 }
 
-function amazon_processRefundData(amazonSalesSheet, productSheet, sourceRow, targetRow) {
+function amazon_processRefundData(salesBuffer, productBuffer, sourceRow, targetRow) {
   try {
     // targetRowがカンマ区切りの場合に分割して処理
     const targetRows = String(targetRow).split(",").map(row => parseInt(row.trim())).filter(row => !isNaN(row));
@@ -188,10 +242,10 @@ function amazon_processRefundData(amazonSalesSheet, productSheet, sourceRow, tar
     for (const row of targetRows) {
       try {
         // 商品管理シートの売上データをクリア
-        productSheet.getRange(row, 28).clearContent(); // AB列（売上日）
-        productSheet.getRange(row, 29).clearContent(); // AC列（販売価格）
-        productSheet.getRange(row, 30).clearContent(); // AD列（入金価格）
-        productSheet.getRange(row, 32).setValue(false); // AF列（売却廃却）をfalseに設定
+        utils_bufferClearContent(productBuffer, row, 28); // AB列（売上日）
+        utils_bufferClearContent(productBuffer, row, 29); // AC列（販売価格）
+        utils_bufferClearContent(productBuffer, row, 30); // AD列（入金価格）
+        utils_bufferSetValue(productBuffer, row, 32, false); // AF列（売却廃却）をfalseに設定
         
         successCount++;
         console.log(`${sourceRow}行目の返金処理完了（商品管理シート${row}行目の売上データをクリア）`);
@@ -204,17 +258,17 @@ function amazon_processRefundData(amazonSalesSheet, productSheet, sourceRow, tar
     if (successCount > 0) {
       // Amazon売上シートのA列に「返金処理済み」、E列に処理日を記録
       const today = Utilities.formatDate(new Date(), "Asia/Tokyo", "yyyy/MM/dd");
-      amazonSalesSheet.getRange(sourceRow, 1).setValue("返金処理済み"); // A列
-      amazonSalesSheet.getRange(sourceRow, 5).setValue(today); // E列
+      utils_bufferSetValue(salesBuffer, sourceRow, 1, "返金処理済み"); // A列
+      utils_bufferSetValue(salesBuffer, sourceRow, 5, today); // E列
       
       // B列から参照されている元の注文行も「返金処理済み」に更新
       try {
-        const bColumnValue = amazonSalesSheet.getRange(sourceRow, 2).getValue(); // B列の値を取得
+        const bColumnValue = targetRow; // B列の値（一括取得済み）
         if (bColumnValue && typeof bColumnValue === "string" && bColumnValue.startsWith("=B")) {
           // "=B123"のような形式から行番号を抽出
           const referencedRow = parseInt(bColumnValue.substring(2));
           if (!isNaN(referencedRow)) {
-            amazonSalesSheet.getRange(referencedRow, 1).setValue("返金処理済み"); // 参照先行のA列
+            utils_bufferSetValue(salesBuffer, referencedRow, 1, "返金処理済み"); // 参照先行のA列
             console.log(`${referencedRow}行目（元の注文行）もA列を「返金処理済み」に更新しました`);
           }
         }
@@ -235,7 +289,7 @@ function amazon_processRefundData(amazonSalesSheet, productSheet, sourceRow, tar
   }
 }
 
-function amazon_processShippingService(amazonSalesSheet, productSheet, sourceRow, targetRow) {
+function amazon_processShippingService(salesBuffer, productBuffer, sourceRow, targetRow, rowData) {
   try {
     // targetRowがカンマ区切りの場合に分割して処理
     const targetRows = String(targetRow).split(",").map(row => parseInt(row.trim())).filter(row => !isNaN(row));
@@ -246,7 +300,7 @@ function amazon_processShippingService(amazonSalesSheet, productSheet, sourceRow
     }
     
     // AG列のデータ取得
-    const agData = amazonSalesSheet.getRange(sourceRow, 33).getValue(); // AG列
+    const agData = rowData[32]; // AG列
     
     if (agData) {
       // マイナス記号を除去
@@ -264,7 +318,7 @@ function amazon_processShippingService(amazonSalesSheet, productSheet, sourceRow
         let successCount = 0;
         for (const row of targetRows) {
           try {
-            productSheet.getRange(row, 31).setValue(dividedValue); // AE列
+            utils_bufferSetValue(productBuffer, row, 31, dividedValue); // AE列
             successCount++;
             console.log(`${sourceRow}行目の配送サービスを商品管理シート${row}行目に記入（値: ${dividedValue}）`);
           } catch (rowError) {
@@ -275,8 +329,8 @@ function amazon_processShippingService(amazonSalesSheet, productSheet, sourceRow
         if (successCount > 0) {
           // Amazon売上シートのA列に「転記済み」、E列に転記日を記録
           const today = Utilities.formatDate(new Date(), "Asia/Tokyo", "yyyy/MM/dd");
-          amazonSalesSheet.getRange(sourceRow, 1).setValue("転記済み"); // A列
-          amazonSalesSheet.getRange(sourceRow, 5).setValue(today); // E列
+          utils_bufferSetValue(salesBuffer, sourceRow, 1, "転記済み"); // A列
+          utils_bufferSetValue(salesBuffer, sourceRow, 5, today); // E列
           
           console.log(`${sourceRow}行目: ${successCount}行の配送サービス処理が完了しました（${targetRows.join(",")}行目、各行${dividedValue}）`);
           return true;
@@ -289,7 +343,7 @@ function amazon_processShippingService(amazonSalesSheet, productSheet, sourceRow
         let successCount = 0;
         for (const row of targetRows) {
           try {
-            productSheet.getRange(row, 31).setValue(transferData); // AE列
+            utils_bufferSetValue(productBuffer, row, 31, transferData); // AE列
             successCount++;
             console.log(`${sourceRow}行目の配送サービスを商品管理シート${row}行目に記入（値: ${transferData}）`);
           } catch (rowError) {
@@ -300,8 +354,8 @@ function amazon_processShippingService(amazonSalesSheet, productSheet, sourceRow
         if (successCount > 0) {
           // Amazon売上シートのA列に「転記済み」、E列に転記日を記録
           const today = Utilities.formatDate(new Date(), "Asia/Tokyo", "yyyy/MM/dd");
-          amazonSalesSheet.getRange(sourceRow, 1).setValue("転記済み"); // A列
-          amazonSalesSheet.getRange(sourceRow, 5).setValue(today); // E列
+          utils_bufferSetValue(salesBuffer, sourceRow, 1, "転記済み"); // A列
+          utils_bufferSetValue(salesBuffer, sourceRow, 5, today); // E列
           
           console.log(`${sourceRow}行目: ${successCount}行の配送サービス処理が完了しました（${targetRows.join(",")}行目）`);
           return true;
@@ -321,7 +375,7 @@ function amazon_processShippingService(amazonSalesSheet, productSheet, sourceRow
   }
 }
 
-function amazon_processAdjustmentData(amazonSalesSheet, productSheet, sourceRow, targetRow, rowData) {
+function amazon_processAdjustmentData(salesBuffer, productBuffer, sourceRow, targetRow, rowData) {
   try {
     // targetRowがカンマ区切りの場合に分割して処理
     const targetRows = String(targetRow).split(",").map(row => parseInt(row.trim())).filter(row => !isNaN(row));
@@ -353,17 +407,16 @@ function amazon_processAdjustmentData(amazonSalesSheet, productSheet, sourceRow,
       try {
         // 商品管理シートに転記（AC列は除く）
         if (formattedDate) {
-          const cell = productSheet.getRange(row, 28);
-          cell.setValue(formattedDate);
-          cell.setNumberFormat("yyyy/mm/dd"); // 日付形式を設定
+          utils_bufferSetValue(productBuffer, row, 28, formattedDate);
+          utils_bufferSetNumberFormat(productBuffer, row, 28, "yyyy/mm/dd"); // 日付形式を設定
         }
         
         if (revenue !== 0) {
-          productSheet.getRange(row, 30).setValue(revenue); // AD列（入金価格）
+          utils_bufferSetValue(productBuffer, row, 30, revenue); // AD列（入金価格）
         }
         
         // 売却廃却チェックボックスをTrueに設定
-        productSheet.getRange(row, 32).setValue(true); // AF列（売却廃却）
+        utils_bufferSetValue(productBuffer, row, 32, true); // AF列（売却廃却）
         
         totalSuccessCount++;
         processedRows.push(row);
@@ -377,8 +430,8 @@ function amazon_processAdjustmentData(amazonSalesSheet, productSheet, sourceRow,
     if (totalSuccessCount > 0) {
       // Amazon売上シートのA列に「転記済み」、E列に転記日を記録
       const today = Utilities.formatDate(new Date(), "Asia/Tokyo", "yyyy/MM/dd");
-      amazonSalesSheet.getRange(sourceRow, 1).setValue("転記済み"); // A列
-      amazonSalesSheet.getRange(sourceRow, 5).setValue(today); // E列
+      utils_bufferSetValue(salesBuffer, sourceRow, 1, "転記済み"); // A列
+      utils_bufferSetValue(salesBuffer, sourceRow, 5, today); // E列
       
       console.log(`${sourceRow}行目: ${totalSuccessCount}行の調整処理が完了しました（${processedRows.join(",")}行目）`);
       return true;
@@ -161,7 +161,7 @@ function amazon_getDialogHtml() {
               alert("エラーが発生しました:\\n" + error.message);
               google.script.host.close();
             })
-            .generateReport(targetMonth);
+            .amazon_generateReport(targetMonth);
         }
       </script>
     </body>
@@ -175,32 +175,52 @@ function amazon_getDialogHtml() {
 
 /**
  * レポート生成のメイン関数
+ * Finances APIの増分同期が完了した場合はイベントストアからCSVを作成して保存し、
+ * 実行時間内に終わらない場合は続きを時間主導トリガーで予約する
+ * 同じイベントストアへの同時書き込みを防ぐため、LockService で同時実行を防ぐ
  * @param {string} targetMonth - 対象月（YYYYMM形式）
  * @returns {string} 完了メッセージ
  */
 function amazon_generateReport(targetMonth) {
+  const lock = LockService.getScriptLock();
+  if (!lock.tryLock(FINANCES_SYNC_CONFIG.LOCK_TIMEOUT_MS)) {
+    throw new Error("別の処理を実行中です。しばらく待ってから再度実行してください。");
+  }
+
+  try {
+    return amazon_generateReportLocked_(targetMonth);
+  } finally {
+    lock.releaseLock();
+  }
+}
+
+/**
+ * レポートを生成する（ロックを取得済みの実行から呼び出す）
+ */
+function amazon_generateReportLocked_(targetMonth) {
+  const startedAt = Date.now();
   console.log(`レポート生成開始: ${targetMonth}`);
   
-  // 対象期間を計算
-  const year = parseInt(targetMonth.substring(0, 4), 10);
-  const month = parseInt(targetMonth.substring(4, 6), 10);
-  const { startDate, endDate } = amazon_getDateRange(year, month);
-  
-  console.log(`対象期間: ${startDate.toISOString()} 〜 ${endDate.toISOString()}`);
-  
   // アクセストークンを取得
   const accessToken = amazon_getAccessToken();
   
-  // Finances APIからデータを取得
-  const financialEvents = amazon_fetchFinancialEvents(accessToken, startDate, endDate);
-  console.log(`取得したイベント数: ${financialEvents.length}`);
+  // Finances APIから新しいイベントだけを取得してイベントストアに追記
+  const syncResult = amazon_syncFinancialEvents(targetMonth, accessToken, { startedAt: startedAt });
+  console.log(`取得ページ数: ${syncResult.pageCount}, 追加イベント数: ${syncResult.added}, 累計: ${syncResult.total}`);
+  utils_logSpApiCacheStats();
+  
+  if (!syncResult.complete) {
+    amazon_scheduleFinancesResume_(targetMonth);
+    return `データ量が多いため、続きをバックグラウンドで取得します。\n\n取得済みイベント数: ${syncResult.total}\n取得完了後にレポートがGoogleドライブに保存されます。`;
+  }
+  
+  amazon_finishFinancesSync_();
   
-  // CSVデータに変換
-  const csvRows = amazon_convertToCsvRows(financialEvents);
-  console.log(`CSV行数: ${csvRows.length}`);
+  // イベントストアのCSV行からファイルを作成してドライブに保存
+  const csvLines = amazon_readFinancesStoreLines(targetMonth);
+  console.log(`CSV行数: ${csvLines.length}`);
   
-  // CSVファイルを作成してドライブに保存
-  const fileName = amazon_saveToGoogleDrive(csvRows, targetMonth);
+  const fileName = amazon_saveCsvLinesToGoogleDrive([amazon_toCsvLine(CSV_HEADERS)].concat(csvLines), targetMonth);
   
   console.log(`レポート生成完了: ${fileName}`);
   return `レポートを作成しました。\n\nファイル名: ${fileName}`;
@@ -227,7 +247,7 @@ function amazon_getDateRange(year, month) {
 // =============================================================================
 
 /**
- * LWAアクセストークンを取得する
+ * LWAアクセストークンを取得する（有効期限内はキャッシュから返す）
  * @returns {string} アクセストークン
  */
 function amazon_getAccessToken() {
@@ -235,95 +255,9 @@ function amazon_getAccessToken() {
 }
 
 // =============================================================================
-// Finances API
+// Finances API（取得処理は amazon_FinancesSync.js）
 // =============================================================================
 
-/**
- * Finances APIからファイナンシャルイベントを取得する
- * @param {string} accessToken - アクセストークン
- * @param {Date} startDate - 開始日
- * @param {Date} endDate - 終了日
- * @returns {Array} ファイナンシャルイベントの配列
- */
-function amazon_fetchFinancialEvents(accessToken, startDate, endDate) {
-  const props = PropertiesService.getScriptProperties();
-  const endpoint = props.getProperty("SP_API_ENDPOINT");
-  
-  if (!endpoint) {
-    throw new Error("SP_API_ENDPOINTがスクリプトプロパティに設定されていません");
-  }
-  
-  const allEvents = [];
-  let nextToken = null;
-  let pageCount = 0;
-  const maxPages = 100; // 無限ループ防止
-  
-  do {
-    pageCount++;
-    console.log(`Finances API呼び出し: ページ ${pageCount}`);
-    
-    // APIリクエストURLを構築
-    let url = `${endpoint}/finances/v0/financialEvents`;
-    const params = new URLSearchParams();
-    
-    if (nextToken) {
-      params.append("NextToken", nextToken);
-    } else {
-      params.append("PostedAfter", startDate.toISOString());
-      params.append("PostedBefore", endDate.toISOString());
-    }
-    
-    url += "?" + params.toString();
-    
-    const options = {
-      method: "get",
-      headers: {
-        "x-amz-access-token": accessToken,
-        "Content-Type": "application/json"
-      },
-      muteHttpExceptions: true
-    };
-    
-    const response = UrlFetchApp.fetch(url, options);
-    const responseCode = response.getResponseCode();
-    const responseBody = response.getContentText();
-    
-    // レート制限対応（429エラー）
-    if (responseCode === 429) {
-      console.log("レート制限に達しました。5秒待機します...");
-      Utilities.sleep(5000);
-      continue;
-    }
-    
-    if (responseCode !== 200) {
-      console.error(`Finances APIエラー: ${responseBody}`);
-      throw new Error(`Finances APIの呼び出しに失敗しました（ステータス: ${responseCode}）`);
-    }
-    
-    const data = JSON.parse(responseBody);
-    const payload = data.payload || {};
-    const financialEvents = payload.FinancialEvents || {};
-    
-    // 各種イベントを収集
-    amazon_collectShipmentEvents(financialEvents.ShipmentEventList, allEvents);
-    amazon_collectRefundEvents(financialEvents.RefundEventList, allEvents);
-    amazon_collectServiceFeeEvents(financialEvents.ServiceFeeEventList, allEvents);
-    amazon_collectAdjustmentEvents(financialEvents.AdjustmentEventList, allEvents);
-    
-    nextToken = payload.NextToken || null;
-    
-    // レート制限を考慮して待機
-    Utilities.sleep(2000);
-    
-  } while (nextToken && pageCount < maxPages);
-  
-  if (pageCount >= maxPages) {
-    console.warn("最大ページ数に達しました。一部のデータが取得できていない可能性があります。");
-  }
-  
-  return allEvents;
-}
-
 /**
  * 出荷イベントを収集する
  */
@@ -336,10 +270,14 @@ function amazon_collectShipmentEvents(shipmentEventList, allEvents) {
     const marketplaceName = event.MarketplaceName || "";
     
     const itemList = event.ShipmentItemList || [];
+    const eventRows = [];
     for (const item of itemList) {
       const row = amazon_createEventRow(postedDate, "Order", orderId, item, marketplaceName);
-      allEvents.push(row);
+      row.identity = ["Order", orderId, postedDate, item.OrderItemId || "", item.SellerSKU || "", amazon_describeItemAmounts_(item)];
+      eventRows.push(row);
     }
+    amazon_appendItemOrdinals_(eventRows);
+    allEvents.push(...eventRows);
   }
 }
 
@@ -355,10 +293,14 @@ function amazon_collectRefundEvents(refundEventList, allEvents) {
     const marketplaceName = event.MarketplaceName || "";
     
     const itemList = event.ShipmentItemAdjustmentList || [];
+    const eventRows = [];
     for (const item of itemList) {
       const row = amazon_createEventRow(postedDate, "Refund", orderId, item, marketplaceName);
-      allEvents.push(row);
+      row.identity = ["Refund", orderId, postedDate, item.OrderAdjustmentItemId || item.OrderItemId || "", item.SellerSKU || "", amazon_describeItemAmounts_(item)];
+      eventRows.push(row);
     }
+    amazon_appendItemOrdinals_(eventRows);
+    allEvents.push(...eventRows);
   }
 }
 
@@ -399,6 +341,12 @@ function amazon_collectServiceFeeEvents(serviceFeeEventList, allEvents) {
       other: 0,
       total: amazon_sumFeeList(event.FeeList)
     };
+    // サービス料金イベントには記帳日時がないため、料金の理由・対象商品・金額で区別する
+    // （1イベント1行のため出現順は付けない。項目がすべて同じイベントは同じ明細として扱う）
+    row.identity = [
+      "Service Fee", row.orderId, event.FeeReason || "", row.sku, event.FnSKU || "", event.ASIN || "",
+      event.FeeDescription || "", amazon_describeAmountList_(event.FeeList, "FeeType", "FeeAmount")
+    ];
     allEvents.push(row);
   }
 }
@@ -414,6 +362,7 @@ function amazon_collectAdjustmentEvents(adjustmentEventList, allEvents) {
     const adjustmentType = event.AdjustmentType || "Adjustment";
     
     const itemList = event.AdjustmentItemList || [];
+    const eventRows = [];
     for (const item of itemList) {
       const row = {
         dateTime: amazon_formatDate(postedDate),
@@ -445,11 +394,31 @@ function amazon_collectAdjustmentEvents(adjustmentEventList, allEvents) {
         other: amazon_getAmountValue(item.TotalAmount),
         total: amazon_getAmountValue(item.TotalAmount)
       };
-      allEvents.push(row);
+      row.identity = [
+        adjustmentType, postedDate, row.sku, item.FnSKU || "", item.ASIN || "", row.quantity,
+        amazon_getAmountValue(item.PerUnitAmount), amazon_getAmountValue(item.TotalAmount)
+      ];
+      eventRows.push(row);
     }
+    amazon_appendItemOrdinals_(eventRows);
+    allEvents.push(...eventRows);
   }
 }
 
+/**
+ * 1つのイベントの明細行の識別項目に、イベント内で項目がすべて同じ明細の出現順とイベントの明細数を追加する
+ * イベントの明細リストの中で数えるため、ページの区切りや取り直しの範囲に関係なく同じ値になる
+ */
+function amazon_appendItemOrdinals_(eventRows) {
+  const occurrences = new Map();
+  eventRows.forEach(row => {
+    const identity = row.identity.join("|");
+    const ordinal = occurrences.get(identity) || 0;
+    occurrences.set(identity, ordinal + 1);
+    row.identity.push(ordinal + "/" + eventRows.length);
+  });
+}
+
 /**
  * イベント行を作成する
  */
@@ -504,6 +473,21 @@ function amazon_createEventRow(postedDate, transactionType, orderId, item, marke
   };
 }
 
+/**
+ * 明細の請求・手数料・プロモーションの種類と金額を文字列にする（重複判定キー用）
+ */
+function amazon_describeItemAmounts_(item) {
+  return [
+    amazon_describeAmountList_(item.ItemChargeList || item.ItemChargeAdjustmentList, "ChargeType", "ChargeAmount"),
+    amazon_describeAmountList_(item.ItemFeeList || item.ItemFeeAdjustmentList, "FeeType", "FeeAmount"),
+    amazon_describeAmountList_(item.PromotionList || item.PromotionAdjustmentList, "PromotionId", "PromotionAmount")
+  ].join("/");
+}
+
+function amazon_describeAmountList_(list, typeField, amountField) {
+  return (list || []).map(entry => entry[typeField] + "=" + amazon_getAmountValue(entry[amountField])).join(";");
+}
+
 /**
  * 請求タイプ別に金額を集計する
  */
@@ -662,42 +646,55 @@ function amazon_convertToCsvRows(events) {
   
   // データ行
   for (const event of events) {
-    const row = [
-      event.dateTime,
-      event.settlementId,
-      event.transactionType,
-      event.orderId,
-      event.sku,
-      event.productName,
-      event.quantity,
-      event.amazonService,
-      event.fulfillment,
-      event.city,
-      event.state,
-      event.postalCode,
-      event.taxCollectionModel,
-      amazon_formatNumber(event.productSales),
-      amazon_formatNumber(event.productSalesTax),
-      amazon_formatNumber(event.shippingCredits),
-      amazon_formatNumber(event.shippingCreditsTax),
-      amazon_formatNumber(event.giftWrapCredits),
-      amazon_formatNumber(event.giftWrapCreditsTax),
-      amazon_formatNumber(event.pointsFee),
-      amazon_formatNumber(event.promotionalRebates),
-      amazon_formatNumber(event.promotionalRebatesTax),
-      event.withholdingTax,
-      amazon_formatNumber(event.sellingFees),
-      amazon_formatNumber(event.fbaFees),
-      amazon_formatNumber(event.otherTransactionFees),
-      amazon_formatNumber(event.other),
-      amazon_formatNumber(event.total)
-    ];
-    rows.push(row);
+    rows.push(amazon_convertEventToCsvRow(event));
   }
   
   return rows;
 }
 
+/**
+ * イベント1件をCSVの列の配列に変換する
+ */
+function amazon_convertEventToCsvRow(event) {
+  return [
+    event.dateTime,
+    event.settlementId,
+    event.transactionType,
+    event.orderId,
+    event.sku,
+    event.productName,
+    event.quantity,
+    event.amazonService,
+    event.fulfillment,
+    event.city,
+    event.state,
+    event.postalCode,
+    event.taxCollectionModel,
+    amazon_formatNumber(event.productSales),
+    amazon_formatNumber(event.productSalesTax),
+    amazon_formatNumber(event.shippingCredits),
+    amazon_formatNumber(event.shippingCreditsTax),
+    amazon_formatNumber(event.giftWrapCredits),
+    amazon_formatNumber(event.giftWrapCreditsTax),
+    amazon_formatNumber(event.pointsFee),
+    amazon_formatNumber(event.promotionalRebates),
+    amazon_formatNumber(event.promotionalRebatesTax),
+    event.withholdingTax,
+    amazon_formatNumber(event.sellingFees),
+    amazon_formatNumber(event.fbaFees),
+    amazon_formatNumber(event.otherTransactionFees),
+    amazon_formatNumber(event.other),
+    amazon_formatNumber(event.total)
+  ];
+}
+
+/**
+ * CSVの列の配列をエスケープ済みの1行に変換する
+ */
+function amazon_toCsvLine(row) {
+  return row.map(cell => amazon_escapeCsvCell(cell)).join(",");
+}
+
 /**
  * 数値をフォーマットする
  */
@@ -712,6 +709,13 @@ function amazon_formatNumber(value) {
  * CSVファイルをGoogleドライブに保存する
  */
 function amazon_saveToGoogleDrive(csvRows, targetMonth) {
+  return amazon_saveCsvLinesToGoogleDrive(csvRows.map(row => amazon_toCsvLine(row)), targetMonth);
+}
+
+/**
+ * エスケープ済みのCSV行をファイルとしてGoogleドライブに保存する
+ */
+function amazon_saveCsvLinesToGoogleDrive(csvLines, targetMonth) {
   const props = PropertiesService.getScriptProperties();
   const folderId = props.getProperty("DRIVE_FOLDER_ID");
   
@@ -726,9 +730,7 @@ function amazon_saveToGoogleDrive(csvRows, targetMonth) {
   const fileName = amazon_getUniqueFileName(folder, baseFileName, "csv");
   
   // CSV文字列を生成（BOM付きUTF-8）
-  const csvContent = csvRows.map(row => 
-    row.map(cell => amazon_escapeCsvCell(cell)).join(",")
-  ).join("\r\n");
+  const csvContent = csvLines.join("\r\n");
   
   const bom = "\uFEFF";
   const blob = Utilities.newBlob(bom + csvContent, "text/csv", fileName);
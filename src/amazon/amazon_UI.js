@@ -28,7 +28,8 @@ function amazon_handleCsvImport() {
 function amazon_handleDataProcessing() {
   try {
     var result = amazon_processData();
-    SpreadsheetApp.getUi().alert("データ処理が完了しました。\n" + result);
+    var title = core_isJobPending("amazon_processData") ? "データ処理を中断しました。" : "データ処理が完了しました。";
+    SpreadsheetApp.getUi().alert(title + "\n" + result);
   } catch (error) {
     SpreadsheetApp.getUi().alert("エラーが発生しました: " + error.message);
     console.error("データ処理エラー:", error);
@@ -41,7 +42,8 @@ function amazon_handleDataProcessing() {
 function amazon_handleTransfer() {
   try {
     var result = amazon_transferToProductSheet();
-    SpreadsheetApp.getUi().alert("商品管理シートへの転記が完了しました。\n" + result);
+    var title = core_isJobPending("amazon_transferToProductSheet") ? "商品管理シートへの転記を中断しました。" : "商品管理シートへの転記が完了しました。";
+    SpreadsheetApp.getUi().alert(title + "\n" + result);
   } catch (error) {
     SpreadsheetApp.getUi().alert("エラーが発生しました: " + error.message);
     console.error("転記エラー:", error);
@@ -66,30 +68,49 @@ function amazon_processCsvContent(csvContent) {
   }
 }
 
-function amazon_parseCsvContent(csvContent) {
-  const lines = csvContent.split("\n");
-  
-  if (lines.length < 9) {
-    throw new Error("CSVファイルの形式が正しくありません（9行目以降にデータが必要）。");
+/**
+ * CSVチャンク処理（ダイアログから行の区切りで分割して順番に呼び出される）
+ * @param {string} csvChunk - CSVテキストの一部（0番目のチャンクのみ前置き8行を含む）
+ * @param {number} chunkIndex - チャンク番号（0始まり）
+ * @param {number|null} baseLastRow - 取込開始前の最終行（0番目のチャンクの戻り値）
+ * @returns {Object} 処理結果
+ */
+function amazon_processCsvChunk(csvChunk, chunkIndex, baseLastRow) {
+  try {
+    console.log("Processing CSV chunk", chunkIndex, "from dialog...");
+    const csvData = chunkIndex === 0 ? amazon_parseCsvContent(csvChunk) : utils_parseCsv(csvChunk);
+
+    if (chunkIndex === 0) {
+      // 重複チェックの比較対象は取込開始前の行に限定する（同じファイル内の同一行は従来通り取り込む）
+      baseLastRow = utils_getSheetOrCreate("Amazon売上").getLastRow();
+    } else if (csvData.length === 0) {
+      return { success: true, message: "", baseLastRow: baseLastRow };
+    }
+
+    const result = amazon_writeToSalesSheet(csvData, baseLastRow);
+    return { success: true, message: result, baseLastRow: baseLastRow };
+  } catch (error) {
+    console.error("processCsvChunk error:", error);
+    throw new Error("CSVファイルの処理に失敗しました: " + error.message);
   }
+}
 
-  const dataLines = lines.slice(8);
+function amazon_parseCsvContent(csvContent) {
+  const tokenizer = utils_createCsvTokenizer({ skipRows: 8 });
   const parsedData = [];
+  const onRow = row => parsedData.push(row);
 
-  for (let i = 0; i < dataLines.length; i++) {
-    const line = dataLines[i].trim();
-    if (line) {
-      const row = utils_parseCSVLine(line);
-      if (row && row.length > 0) {
-        parsedData.push(row);
-      }
-    }
+  utils_feedCsvChunk(tokenizer, csvContent, onRow);
+  utils_endCsvTokenizer(tokenizer, onRow);
+
+  if (tokenizer.recordCount < 9) {
+    throw new Error("CSVファイルの形式が正しくありません（9行目以降にデータが必要）。");
   }
 
   return parsedData;
 }
 
-function amazon_writeToSalesSheet(csvData) {
+function amazon_writeToSalesSheet(csvData, untilRow) {
   console.log("writeToAmazonSalesSheet called with", csvData.length, "rows");
   
   const spreadsheet = SpreadsheetApp.getActiveSpreadsheet();
@@ -104,8 +125,8 @@ function amazon_writeToSalesSheet(csvData) {
     throw new Error("読み込むデータがありません。");
   }
 
-  const existingData = amazon_getExistingData(sheet);
-  const newData = amazon_filterDuplicates(csvData, existingData);
+  const existingFingerprints = amazon_getExistingFingerprints(sheet, untilRow);
+  const newData = amazon_filterDuplicates(csvData, existingFingerprints);
   console.log("After duplicate filtering:", newData.length, "rows");
 
   if (newData.length === 0) {
@@ -129,26 +150,11 @@ function amazon_writeToSalesSheet(csvData) {
   return `${newData.length}行のデータを追加しました。`;
 }
 
-function amazon_getExistingData(sheet) {
-  const lastRow = sheet.getLastRow();
-  if (lastRow < 1) {
-    return [];
-  }
-
-  const range = sheet.getRange(1, 6, lastRow, sheet.getLastColumn() - 5);
-  return range.getValues().filter(row => row.some(cell => cell !== ""));
+function amazon_getExistingFingerprints(sheet, untilRow) {
+  // F列以降の既存行のフィンガープリント（非表示シートに保存し、追加行のみ差分で読み込む）
+  return utils_getExistingFingerprints(sheet, 6, { persist: true, untilRow: untilRow });
 }
 
-function amazon_filterDuplicates(newData, existingData) {
-  if (existingData.length === 0) {
-    return newData;
-  }
-
-  return newData.filter(newRow => {
-    return !existingData.some(existingRow => {
-      return utils_arraysEqual(newRow, existingRow);
-    });
-  });
+function amazon_filterDuplicates(newData, existingFingerprints) {
+  return utils_filterDuplicates(newData, existingFingerprints);
 }
-
-
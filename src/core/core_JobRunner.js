@@ -0,0 +1,493 @@
+/**
+ * ジョブランナー
+ * 行の多い処理をチャンク単位で実行し、実行時間の上限に近づいたら進捗（次の行・使用済み行など）を
+ * スクリプトプロパティに保存して、時間主導トリガーで続きから再開する
+ * 同時実行は LockService で防ぎ、進行状況はサイドバーで確認できる
+ *
+ * ジョブ定義（各機能が作成する）:
+ *   name     - ジョブ名（プロパティのキーに使う）
+ *   title    - 表示名
+ *   factory  - ジョブ定義を作成するグローバル関数名（再開時に呼び出す）
+ *   chunkRows - 1チャンクの行数（省略時は JOB_RUNNER_CONFIG.CHUNK_ROWS）
+ *   adaptiveChunks - true の場合、最初のチャンクの後は1行あたりの処理時間から残りの時間で処理できる行数を1チャンクにする
+ *                    （1行あたりの時間が行によって大きく変わらない処理で、チャンクごとの書き込みをまとめるために使う）
+ *   start()  - 初期状態を返す（JSONにできる値のみ。done / total を含める）。処理対象がなければメッセージ文字列を返す
+ *   open(state) - 実行ごとに1回呼ばれ、シートの読み込みなどを行ってチャンク処理用のコンテキストを返す
+ *   runChunk(state, context, chunkRows) - 1チャンクを処理して書き込みを反映し、state.done を進める
+ *   finish(state, context) - 完了メッセージを返す
+ */
+
+const JOB_RUNNER_CONFIG = {
+  PROPERTY_PREFIX: "JOB_",                    // + ジョブ名: 進捗、+ ジョブ名 + "__" + 番号: 状態（JSON を分割）
+  MAX_RUNTIME_MS: 4.5 * 60 * 1000,            // 1回の実行で処理に使う時間（上限6分）
+  RESUME_DELAY_MS: 60 * 1000,
+  WATCHDOG_DELAY_MS: 7 * 60 * 1000,           // 実行が上限で打ち切られた場合に備えた再開（6分より後）
+  RESUME_HANDLER: "core_resumeJobs",
+  LOCK_TIMEOUT_MS: 10 * 1000,
+  CHUNK_ROWS: 1000,
+  CHUNK_TIME_RATIO: 0.8,                      // 残りの時間のうち、次のチャンクに使う割合（見積もりの誤差に備える）
+  MIN_CHUNK_RATIO: 0.1,                       // 残りの時間で処理できる行数が chunkRows のこの割合より少なければ中断する
+  MAX_CHUNK_GROWTH: 2,                        // 次のチャンクは、これまでの最大のチャンクのこの倍数まで
+  MAX_PROPERTY_VALUE_LENGTH: 8000,            // 1プロパティの上限は9KB
+  PROGRESS_SIDEBAR: "core/core_JobProgress"
+};
+
+/**
+ * ジョブを実行する（再開待ちの状態があれば続きから）
+ * 上限時間内に終わらない場合は状態を保存し、続きを時間主導トリガーで予約して戻る
+ * @param {Object} job - ジョブ定義
+ * @param {Object} initialState - 初期状態（省略時は job.start() を使う）
+ * @returns {Object} { complete, message, state, context }
+ */
+function core_runJob(job, initialState) {
+  const startedAt = Date.now();
+  const lock = LockService.getScriptLock();
+  if (!lock.tryLock(JOB_RUNNER_CONFIG.LOCK_TIMEOUT_MS)) {
+    throw new Error("別の処理を実行中です。しばらく待ってから再度実行してください。");
+  }
+
+  try {
+    let record = core_loadJob_(job.name);
+
+    if (record && initialState) {
+      throw new Error("「" + job.title + "」の続きが再開待ちです（" + core_formatJobProgress_(record.header) + "）。完了してから再度実行してください。");
+    }
+
+    if (!record) {
+      const state = initialState || job.start();
+      if (typeof state === "string") {
+        return { complete: true, message: state, state: null, context: null };
+      }
+      record = core_createJobRecord_(job, state);
+    }
+
+    const result = core_continueJob_(job, record, startedAt);
+
+    if (!result.complete) {
+      core_showJobProgress_();
+    }
+    return result;
+
+  } finally {
+    lock.releaseLock();
+  }
+}
+
+/**
+ * 時間主導トリガーから呼び出され、再開待ちのジョブを順に続きから実行する
+ * エラーになったジョブは記録して次のジョブに進み、再開待ちのジョブが残っていれば再開を予約する
+ */
+function core_resumeJobs() {
+  const startedAt = Date.now();
+  core_clearResumeTriggers_();
+
+  const lock = LockService.getScriptLock();
+  if (!lock.tryLock(JOB_RUNNER_CONFIG.LOCK_TIMEOUT_MS)) {
+    console.log("別の処理を実行中のため、ジョブの再開を延期します");
+    core_scheduleResume_(JOB_RUNNER_CONFIG.RESUME_DELAY_MS);
+    return;
+  }
+
+  let interrupted = false;
+  let firstError = null;
+
+  try {
+    const names = core_listPendingJobs_();
+    if (names.length === 0) {
+      console.log("再開するジョブがありません");
+      return;
+    }
+
+    for (let i = 0; i < names.length; i++) {
+      // 1つのジョブのエラーで他の再開待ちのジョブが止まらないよう、ジョブごとに捕捉して次に進む
+      try {
+        const record = core_loadJob_(names[i]);
+        const factory = record && globalThis[record.header.factory];
+        if (typeof factory !== "function") {
+          console.error("ジョブを再開できません（定義が見つかりません）: " + names[i]);
+          core_deleteJobState_(names[i], record ? record.header.parts : 0);
+          continue;
+        }
+
+        const result = core_continueJob_(factory(), record, startedAt);
+        console.log(result.message);
+        if (!result.complete) {
+          interrupted = true;
+          break;
+        }
+      } catch (error) {
+        console.error("ジョブの再開エラー（" + names[i] + "）:", error);
+        firstError = firstError || error;
+      }
+    }
+  } finally {
+    // 中断したジョブは続きを予約済み。それ以外で再開待ちのジョブが残っている場合（エラーで状態を更新できなかった場合など）も再開を予約する
+    if (!interrupted && core_listPendingJobs_().length > 0) {
+      core_scheduleResume_(JOB_RUNNER_CONFIG.RESUME_DELAY_MS);
+    }
+    lock.releaseLock();
+  }
+
+  // 実行ログ・失敗通知に残るよう、他のジョブを処理した後で最初のエラーを投げる
+  if (firstError) {
+    throw firstError;
+  }
+}
+
+/**
+ * ジョブが再開待ちか判定する
+ * @param {string} name - ジョブ名
+ * @returns {boolean}
+ */
+function core_isJobPending(name) {
+  const header = core_getJobHeader_(name);
+  return Boolean(header && !header.complete);
+}
+
+/**
+ * 全ジョブの進行状況を取得する（サイドバーから呼び出される）
+ * @returns {Object[]} [{ name, title, status, done, total, executions, message, updatedAt }]
+ */
+function core_getJobProgress() {
+  const properties = PropertiesService.getScriptProperties().getProperties();
+
+  return Object.keys(properties)
+    .filter(key => core_isJobHeaderKey_(key))
+    .map(key => {
+      const header = core_parseJson_(properties[key]) || {};
+      return {
+        name: key.substring(JOB_RUNNER_CONFIG.PROPERTY_PREFIX.length),
+        title: header.title,
+        status: header.status,
+        done: header.done,
+        total: header.total,
+        executions: header.executions,
+        message: header.message || "",
+        updatedAt: header.updatedAt
+      };
+    })
+    .sort((a, b) => b.updatedAt - a.updatedAt);
+}
+
+/**
+ * メニューから呼び出され、進行状況のサイドバーを表示する
+ */
+function core_showJobProgress() {
+  const html = HtmlService.createHtmlOutputFromFile(JOB_RUNNER_CONFIG.PROGRESS_SIDEBAR)
+    .setTitle("処理の進行状況");
+  SpreadsheetApp.getUi().showSidebar(html);
+}
+
+/**
+ * 行番号の集合を文字列にする（連続する範囲ごとに「前の範囲からの差.行数」を36進数で表す）
+ * @param {Iterable<number>} rows - 行番号
+ * @returns {string}
+ */
+function core_encodeRowSet(rows) {
+  const sorted = Array.from(new Set(rows)).sort((a, b) => a - b);
+  const parts = [];
+  let previousEnd = 0;
+
+  for (let i = 0; i < sorted.length; ) {
+    const start = sorted[i];
+    let count = 1;
+    while (i + count < sorted.length && sorted[i + count] === start + count) {
+      count++;
+    }
+    parts.push((start - previousEnd).toString(36) + (count > 1 ? "." + count.toString(36) : ""));
+    previousEnd = start + count;
+    i += count;
+  }
+
+  return parts.join(",");
+}
+
+/**
+ * core_encodeRowSet の文字列から行番号の集合を復元する
+ * @param {string} encoded - core_encodeRowSet の戻り値
+ * @returns {Set<number>}
+ */
+function core_decodeRowSet(encoded) {
+  const rows = new Set();
+  if (!encoded) {
+    return rows;
+  }
+
+  let previousEnd = 0;
+  encoded.split(",").forEach(part => {
+    const [gap, count] = part.split(".");
+    const start = previousEnd + parseInt(gap, 36);
+    const length = count ? parseInt(count, 36) : 1;
+    for (let row = start; row < start + length; row++) {
+      rows.add(row);
+    }
+    previousEnd = start + length;
+  });
+
+  return rows;
+}
+
+// ============================================
+// 実行
+// ============================================
+
+/**
+ * チャンクを繰り返し処理し、完了・中断に応じて状態とトリガーを更新する
+ */
+function core_continueJob_(job, record, startedAt) {
+  const header = record.header;
+  const state = record.state;
+  let longestChunkMs = 0;
+  let slowestMsPerRow = 0;
+  let watchdogScheduled = false;
+
+  header.executions++;
+  header.status = "running";
+
+  try {
+    const context = job.open(state);
+
+    while (state.done < state.total) {
+      const chunkRows = core_planChunkRows_(job, header, state, startedAt, longestChunkMs);
+      if (chunkRows === 0) {
+        header.status = "waiting";
+        core_saveJob_(job.name, record);
+        core_scheduleResume_(JOB_RUNNER_CONFIG.RESUME_DELAY_MS);
+
+        const message = core_formatJobProgress_(header) + "まで処理しました。残りは約" +
+          Math.round(JOB_RUNNER_CONFIG.RESUME_DELAY_MS / 60000) + "分後に自動で再開します（進行状況はサイドバーで確認できます）。";
+        console.log("「" + header.title + "」を中断しました: " + message);
+        return { complete: false, message: message, state: state, context: context };
+      }
+
+      const chunkStartedAt = Date.now();
+      const before = state.done;
+      job.runChunk(state, context, chunkRows);
+      if (state.done <= before) {
+        throw new Error("ジョブ「" + job.name + "」のチャンク処理で進捗がありません");
+      }
+      const chunkMs = Date.now() - chunkStartedAt;
+      longestChunkMs = Math.max(longestChunkMs, chunkMs);
+
+      // 再開後の最初のチャンクにも使えるよう、この実行で最も遅い1行あたりの時間を進捗に残す
+      if (job.adaptiveChunks) {
+        slowestMsPerRow = Math.max(slowestMsPerRow, chunkMs / (state.done - before));
+        header.msPerRow = slowestMsPerRow;
+        header.largestChunkRows = Math.max(header.largestChunkRows || 0, state.done - before);
+      }
+
+      core_saveJob_(job.name, record);
+
+      // 実行が上限で打ち切られても続きから再開できるよう、残りがあれば再開を予約しておく
+      if (!watchdogScheduled && state.done < state.total) {
+        core_scheduleResume_(JOB_RUNNER_CONFIG.WATCHDOG_DELAY_MS);
+        watchdogScheduled = true;
+      }
+    }
+
+    const message = job.finish(state, context);
+    core_finishJob_(job.name, record, "done", message);
+    return { complete: true, message: message, state: state, context: context };
+
+  } catch (error) {
+    core_finishJob_(job.name, record, "error", error.message);
+    throw error;
+  }
+}
+
+/**
+ * 次のチャンクの行数を決める（中断する場合は 0）
+ * 通常は chunkRows 行ずつ、「経過時間＋最長チャンクの時間」が上限を超える場合は中断する
+ * adaptiveChunks のジョブは、1行あたりの処理時間（この実行で最も遅いチャンク、再開直後は前回の実行で計測）から
+ * 残りの時間で処理できる行数を1チャンクにする。見積もりの外れに備え、これまでの最大のチャンクの MAX_CHUNK_GROWTH 倍までにする
+ */
+function core_planChunkRows_(job, header, state, startedAt, longestChunkMs) {
+  const chunkRows = job.chunkRows || JOB_RUNNER_CONFIG.CHUNK_ROWS;
+  const remainingMs = JOB_RUNNER_CONFIG.MAX_RUNTIME_MS - (Date.now() - startedAt);
+  const remainingRows = state.total - state.done;
+
+  if (!job.adaptiveChunks || !header.msPerRow) {
+    return remainingMs - longestChunkMs > 0 ? Math.min(chunkRows, remainingRows) : 0;
+  }
+
+  const fitRows = Math.floor(remainingMs * JOB_RUNNER_CONFIG.CHUNK_TIME_RATIO / header.msPerRow);
+  if (fitRows < Math.min(chunkRows, remainingRows) * JOB_RUNNER_CONFIG.MIN_CHUNK_RATIO) {
+    return 0;
+  }
+  const maxRows = header.largestChunkRows * JOB_RUNNER_CONFIG.MAX_CHUNK_GROWTH;
+  return Math.min(Math.max(fitRows, 1), maxRows, remainingRows);
+}
+
+function core_createJobRecord_(job, state) {
+  return {
+    header: {
+      title: job.title,
+      factory: job.factory,
+      status: "running",
+      done: state.done,
+      total: state.total,
+      executions: 0,
+      parts: 0,
+      startedAt: Date.now(),
+      updatedAt: Date.now(),
+      complete: false
+    },
+    state: state
+  };
+}
+
+/**
+ * 完了・エラー時に状態を削除し、結果だけを進捗として残す
+ */
+function core_finishJob_(name, record, status, message) {
+  const header = record.header;
+  core_deleteJobState_(name, header.parts);
+
+  header.status = status;
+  header.message = message;
+  header.done = record.state.done;
+  header.complete = true;
+  header.parts = 0;
+  header.updatedAt = Date.now();
+  PropertiesService.getScriptProperties().setProperty(JOB_RUNNER_CONFIG.PROPERTY_PREFIX + name, JSON.stringify(header));
+
+  if (core_listPendingJobs_().length === 0) {
+    core_clearResumeTriggers_();
+  }
+}
+
+function core_showJobProgress_() {
+  try {
+    core_showJobProgress();
+  } catch (e) {
+    // スクリプトエディタなど UI のない実行ではサイドバーを表示しない
+    console.log("進行状況のサイドバーを表示できません: " + e.message);
+  }
+}
+
+function core_formatJobProgress_(header) {
+  return header.done + " / " + header.total + " 行";
+}
+
+// ============================================
+// 状態の保存・読み込み
+// ============================================
+
+/**
+ * 状態を JSON にして 1プロパティの上限以下に分割し、進捗（ヘッダー）とまとめて保存する
+ */
+function core_saveJob_(name, record) {
+  const key = JOB_RUNNER_CONFIG.PROPERTY_PREFIX + name;
+  const header = record.header;
+  const json = core_toAsciiJson_(record.state);
+  const size = JOB_RUNNER_CONFIG.MAX_PROPERTY_VALUE_LENGTH;
+  const previousParts = header.parts;
+  const properties = {};
+
+  header.parts = Math.max(1, Math.ceil(json.length / size));
+  for (let i = 0; i < header.parts; i++) {
+    properties[key + "__" + i] = json.substring(i * size, (i + 1) * size);
+  }
+
+  header.done = record.state.done;
+  header.total = record.state.total;
+  header.updatedAt = Date.now();
+  properties[key] = JSON.stringify(header);
+
+  const props = PropertiesService.getScriptProperties();
+  props.setProperties(properties);
+  for (let i = header.parts; i < previousParts; i++) {
+    props.deleteProperty(key + "__" + i);
+  }
+}
+
+/**
+ * 再開待ちのジョブの進捗と状態を読み込む
+ * @returns {Object|null} { header, state }
+ */
+function core_loadJob_(name) {
+  const key = JOB_RUNNER_CONFIG.PROPERTY_PREFIX + name;
+  const properties = PropertiesService.getScriptProperties().getProperties();
+  const header = core_parseJson_(properties[key]);
+  if (!header || header.complete) {
+    return null;
+  }
+
+  const parts = [];
+  for (let i = 0; i < header.parts; i++) {
+    parts.push(properties[key + "__" + i] || "");
+  }
+
+  const state = core_parseJson_(parts.join(""));
+  if (!state) {
+    console.error("ジョブの状態を読み込めません: " + name);
+    return null;
+  }
+
+  return { header: header, state: state };
+}
+
+function core_getJobHeader_(name) {
+  return core_parseJson_(PropertiesService.getScriptProperties().getProperty(JOB_RUNNER_CONFIG.PROPERTY_PREFIX + name));
+}
+
+function core_deleteJobState_(name, parts) {
+  const props = PropertiesService.getScriptProperties();
+  for (let i = 0; i < parts; i++) {
+    props.deleteProperty(JOB_RUNNER_CONFIG.PROPERTY_PREFIX + name + "__" + i);
+  }
+}
+
+function core_listPendingJobs_() {
+  const properties = PropertiesService.getScriptProperties().getProperties();
+
+  return Object.keys(properties)
+    .filter(key => core_isJobHeaderKey_(key))
+    .filter(key => {
+      const header = core_parseJson_(properties[key]);
+      return header && !header.complete;
+    })
+    .map(key => key.substring(JOB_RUNNER_CONFIG.PROPERTY_PREFIX.length));
+}
+
+function core_isJobHeaderKey_(key) {
+  return key.indexOf(JOB_RUNNER_CONFIG.PROPERTY_PREFIX) === 0 && key.indexOf("__") === -1;
+}
+
+/**
+ * 非ASCII文字を \uXXXX にした JSON（分割位置に関係なく1文字1バイトに収める）
+ */
+function core_toAsciiJson_(value) {
+  return JSON.stringify(value).replace(/[\u0080-\uffff]/g, char => "\\u" + ("000" + char.charCodeAt(0).toString(16)).slice(-4));
+}
+
+function core_parseJson_(value) {
+  if (!value) {
+    return null;
+  }
+
+  try {
+    return JSON.parse(value);
+  } catch (e) {
+    return null;
+  }
+}
+
+// ============================================
+// 再開トリガー
+// ============================================
+
+function core_scheduleResume_(delayMs) {
+  core_clearResumeTriggers_();
+
+  ScriptApp.newTrigger(JOB_RUNNER_CONFIG.RESUME_HANDLER)
+    .timeBased()
+    .after(delayMs)
+    .create();
+}
+
+function core_clearResumeTriggers_() {
+  ScriptApp.getProjectTriggers()
+    .filter(trigger => trigger.getHandlerFunction() === JOB_RUNNER_CONFIG.RESUME_HANDLER)
+    .forEach(trigger => ScriptApp.deleteTrigger(trigger));
+}
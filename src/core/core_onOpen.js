@@ -13,6 +13,10 @@ function onOpen() {
     .addItem("商品登録", "spapi_registerSelectedProducts")
     .addItem("納品プラン作成", "spapi_createShipmentPlan")
     .addItem("販売詳細レポートを出力", "amazon_showMonthSelectionDialog")
+    .addSeparator()
+    .addItem("処理の進行状況", "core_showJobProgress")
+    .addItem("SP-APIキャッシュをクリア", "utils_clearSpApiCache")
+    .addItem("重複チェック情報をリセット", "utils_resetAllFingerprintStores")
     .addToUi();
 
   ui.createMenu("決算整理")
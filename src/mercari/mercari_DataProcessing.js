@@ -29,6 +29,9 @@ function mercari_processData() {
     const productLastRow = productSheet.getLastRow();
     const productData = productLastRow < 2 ? [] : productSheet.getRange(3, 1, productLastRow - 2, productSheet.getLastColumn()).getValues();
     
+    // Y列の検索インデックスを一度だけ作成
+    const productIndex = utils_buildProductIndex(productData, 3);
+    
     // 使用済みの商品管理シート行番号を管理
     const usedProductRows = new Set();
     
@@ -43,7 +46,7 @@ function mercari_processData() {
     }
     
     // 空白行から処理開始
-    const result = mercari_processRows(mercariData, productData, startIndex, usedProductRows);
+    const result = mercari_processRows(mercariData, productIndex, startIndex, usedProductRows);
     const updates = result.updates;
     const processedCount = result.processedCount;
     const rowsToDelete = result.rowsToDelete;
@@ -56,15 +59,8 @@ function mercari_processData() {
     // 一括書き込み完了後に削除処理を実行
     console.log("★最終フェーズ：削除処理を実行★");
     if (rowsToDelete && rowsToDelete.size > 0) {
-      const sortedRowsToDelete = Array.from(rowsToDelete).sort((a, b) => b - a);
-      console.log(`削除対象行（後ろから順番）: ${sortedRowsToDelete.join(", ")}`);
-      
-      for (const rowNum of sortedRowsToDelete) {
-        mercari_deleteRow(rowNum);
-        console.log(`最終フェーズ - 行 ${rowNum} を削除しました`);
-      }
-      
-      console.log(`★最終フェーズ完了：${sortedRowsToDelete.length}行を削除★`);
+      const deletion = mercari_deleteRows(mercariSalesSheet, rowsToDelete);
+      console.log(`★最終フェーズ完了：${deletion.rows}行を削除（${deletion.runs}範囲, シート操作 ${deletion.apiCalls}回）★`);
     } else {
       console.log("★最終フェーズ：削除対象行なし★");
     }
@@ -78,14 +74,20 @@ function mercari_processData() {
   }
 }
 
-function mercari_processRows(mercariData, productData, startIndex, usedProductRows) {
+function mercari_processRows(mercariData, productIndex, startIndex, usedProductRows) {
   const updates = [];
   const excludedRows = new Set(); // キャンセルで除外された行を追跡
   const rowsToDelete = new Set(); // 最後に削除する行番号を蓄積
   let processedCount = 0;
+  let cancelCount = 0;
+  let relatedCount = 0;
+  let skippedCount = 0;
   
   console.log("★第1フェーズ：キャンセル処理を全て実行★");
   
+  // G列の値 → 行番号のインデックスを一度だけ作成
+  const gValueIndex = utils_buildColumnIndex(mercariData, 3, 6);
+  
   // 第1フェーズ: キャンセル処理を全て実行
   for (let i = startIndex; i < mercariData.length; i++) {
     const row = i + 3; // 実際の行番号（3行目から開始）
@@ -100,24 +102,22 @@ function mercari_processRows(mercariData, productData, startIndex, usedProductRo
     
     // I列がキャンセルの場合の処理
     if (iValue && typeof iValue === "string" && iValue.includes("キャンセル")) {
-      console.log(`第1フェーズ - 行 ${row}: キャンセル処理を実行`);
+      cancelCount++;
       
       const gValue = mercariData[i][6]; // G列の値（0ベースなので6）
       
-      // G列の値で同じメルカリ売上シートのG列を検索し、該当行を削除対象に追加
+      // G列の値が一致する同じメルカリ売上シートの行を削除対象に追加
       if (gValue && gValue !== "" && gValue !== null) {
-        console.log(`G列の値 "${gValue}" で関連行を削除対象に追加`);
-        mercari_collectRowsToDelete(mercariData, gValue, row, excludedRows, rowsToDelete);
+        relatedCount += mercari_collectRowsToDelete(gValueIndex, gValue, row, excludedRows, rowsToDelete);
       }
       
       // キャンセル行自体も削除対象に追加
       excludedRows.add(row);
       rowsToDelete.add(row);
-      console.log(`第1フェーズ - 行 ${row}: キャンセル行を削除対象に追加`);
     }
   }
   
-  console.log(`★第1フェーズ完了：${excludedRows.size}行を除外★`);
+  console.log(`★第1フェーズ完了：キャンセル ${cancelCount}行, G列一致 ${relatedCount}件, 計${excludedRows.size}行を除外★`);
   console.log("★第2フェーズ：通常の検索処理を実行★");
   
   // 第2フェーズ: 通常の検索処理（キャンセルで除外された行以外）
@@ -132,17 +132,15 @@ function mercari_processRows(mercariData, productData, startIndex, usedProductRo
     
     // キャンセルで除外された行はスキップ
     if (excludedRows.has(row)) {
-      console.log(`第2フェーズ - 行 ${row}: キャンセルで除外済みのためスキップ`);
+      skippedCount++;
       continue;
     }
     
-    const result = mercari_processNormalDataRow(mercariData[i], productData, row, usedProductRows);
+    const result = mercari_processNormalDataRow(mercariData[i], productIndex, row, usedProductRows);
     if (!result) {
       continue;
     }
     
-    console.log(`第2フェーズ - 行 ${row}: 処理結果 - A:"${result.aValue}", B:"${result.bValue}", C:"${result.cValue}", D:"${result.dValue}"`);
-    
     updates.push({
       row: row,
       aValue: result.aValue,
@@ -153,12 +151,12 @@ function mercari_processRows(mercariData, productData, startIndex, usedProductRo
     processedCount++;
   }
   
-  console.log("★第2フェーズ完了★");
+  console.log(`★第2フェーズ完了：${processedCount}行を処理, 除外済み ${skippedCount}行をスキップ★`);
   
   return { updates, processedCount, rowsToDelete };
 }
 
-function mercari_processNormalDataRow(rowData, productData, row, usedProductRows) {
+function mercari_processNormalDataRow(rowData, productIndex, row, usedProductRows) {
   try {
     const fValue = rowData[5]; // F列の値（0ベースなので5）
     const oValue = rowData[14]; // O列の値（0ベースなので14）
@@ -197,7 +195,7 @@ function mercari_processNormalDataRow(rowData, productData, row, usedProductRows
     const foundRows = [];
     for (let i = 0; i < quantity; i++) {
       console.log(`通常処理 - 行 ${row}: ${i + 1}個目の検索を実行中...`);
-      const foundRow = mercari_searchProductByYColumn(productData, fValue, usedProductRows);
+      const foundRow = mercari_searchProductByYColumn(productIndex, fValue, usedProductRows);
       if (!foundRow) {
         console.log(`通常処理 - 行 ${row}: F列の値 "${fValue}" の${i + 1}個目が商品管理シートのY列で見つかりませんでした`);
         break; // 見つからない場合は処理を中断
@@ -234,117 +232,67 @@ function mercari_processNormalDataRow(rowData, productData, row, usedProductRows
 }
 
 function mercari_batchUpdateSheet(mercariSalesSheet, updates) {
-  // A列、B列、C列、D列の更新を一括で実行
-  const aUpdates = [];
-  const bUpdates = [];
-  const cUpdates = [];
-  const dUpdates = [];
+  // A列、B列、C列、D列の更新をバッファに蓄積し、連続範囲ごとに一括で実行
+  // A〜D列はこの処理が行ごとに書き込む列のため、書き込まない列を補完して矩形をまとめる
+  const buffer = utils_createWriteBuffer(mercariSalesSheet, { fillColumns: [1, 2, 3, 4] });
   
   updates.forEach(update => {
     if (update.aValue !== "") {
-      aUpdates.push([update.row, 1, update.aValue]);
+      utils_bufferSetValue(buffer, update.row, 1, update.aValue);
     }
     if (update.bValue !== "") {
-      bUpdates.push([update.row, 2, update.bValue]);
+      utils_bufferSetValue(buffer, update.row, 2, update.bValue);
     }
     if (update.cValue !== undefined && update.cValue !== "") {
-      cUpdates.push([update.row, 3, update.cValue]);
+      utils_bufferSetFormula(buffer, update.row, 3, update.cValue);
     }
     if (update.dValue !== "") {
-      dUpdates.push([update.row, 4, update.dValue]);
+      utils_bufferSetValue(buffer, update.row, 4, update.dValue);
     }
   });
   
-  // バッチ更新実行
-  if (aUpdates.length > 0) {
-    aUpdates.forEach(([row, col, value]) => {
-      mercariSalesSheet.getRange(row, col).setValue(value);
-    });
-  }
-  
-  if (bUpdates.length > 0) {
-    bUpdates.forEach(([row, col, value]) => {
-      mercariSalesSheet.getRange(row, col).setValue(value);
-    });
-  }
-  
-  if (cUpdates.length > 0) {
-    cUpdates.forEach(([row, col, value]) => {
-      mercariSalesSheet.getRange(row, col).setValue(value);
-    });
-  }
-  
-  if (dUpdates.length > 0) {
-    dUpdates.forEach(([row, col, value]) => {
-      mercariSalesSheet.getRange(row, col).setValue(value);
-    });
-  }
+  utils_flushWriteBuffer(buffer);
 }
 
-function mercari_collectRowsToDelete(mercariData, gValue, currentRow, excludedRows, rowsToDelete) {
-  console.log(`★G列検索開始（削除対象収集）★ 検索値:"${gValue}" 現在行:${currentRow}`);
+/**
+ * G列の値が一致する行（現在行を除く）を削除対象に追加する
+ * @param {Map} gValueIndex - G列の値 → 行番号のインデックス（utils_buildColumnIndex）
+ * @returns {number} 追加した行数
+ */
+function mercari_collectRowsToDelete(gValueIndex, gValue, currentRow, excludedRows, rowsToDelete) {
+  const rows = gValueIndex.get(utils_normalizeSearchKey(gValue)) || [];
   let hitCount = 0;
   
-  // G列の値でメルカリ売上シート内を検索
-  for (let i = 0; i < mercariData.length; i++) {
-    const dataRow = mercariData[i];
-    const sheetRow = i + 3; // 実際の行番号（3行目から開始）
-    const dataGValue = dataRow[6]; // G列の値（0ベースなので6）
-    
-    console.log(`行 ${sheetRow}: G列値:"${dataGValue}" 一致判定:${String(dataGValue).trim() === String(gValue).trim()} 現在行除外判定:${sheetRow !== currentRow}`);
-    
-    // 現在処理中の行は除外し、G列の値が一致する行を検索
-    if (sheetRow !== currentRow && 
-        dataGValue && 
-        String(dataGValue).trim() === String(gValue).trim()) {
-      
-      hitCount++;
-      console.log(`★ヒット★ G列の値 "${gValue}" でヒットした行 ${sheetRow} を削除対象に追加`);
-      
-      // 削除対象リストに追加
-      rowsToDelete.add(sheetRow);
-      
-      // 除外された行をセットに追加（今後の処理でスキップするため）
-      excludedRows.add(sheetRow);
-      console.log(`行 ${sheetRow} をexcludedRowsと削除対象に追加しました`);
+  rows.forEach(sheetRow => {
+    if (sheetRow === currentRow) {
+      return;
     }
-  }
+    
+    hitCount++;
+    rowsToDelete.add(sheetRow);
+    // 除外された行をセットに追加（今後の処理でスキップするため）
+    excludedRows.add(sheetRow);
+  });
   
-  console.log(`★G列検索完了（削除対象収集）★ 検索値:"${gValue}" で ${hitCount} 件を削除対象に追加`);
+  return hitCount;
 }
 
-function mercari_deleteRow(rowNumber) {
-  const spreadsheet = SpreadsheetApp.getActiveSpreadsheet();
-  const mercariSalesSheet = spreadsheet.getSheetByName("メルカリ売上");
-  
-  if (!mercariSalesSheet) {
-    console.log("メルカリ売上シートが見つかりません");
-    return;
-  }
-  
+/**
+ * 削除対象行を連続する範囲にまとめて削除する
+ * @param {Sheet} mercariSalesSheet - メルカリ売上シート
+ * @param {Set<number>} rowsToDelete - 削除する行番号
+ * @returns {Object} 統計（utils_deleteRowsPlanned の戻り値）
+ */
+function mercari_deleteRows(mercariSalesSheet, rowsToDelete) {
   try {
-    mercariSalesSheet.deleteRow(rowNumber);
-    console.log(`行 ${rowNumber} を削除しました`);
+    return utils_deleteRowsPlanned(mercariSalesSheet, rowsToDelete);
   } catch (error) {
-    console.error(`行 ${rowNumber} の削除に失敗しました:`, error);
+    console.error(`行の削除に失敗しました（${rowsToDelete.size}行）:`, error);
+    throw error;
   }
 }
 
-function mercari_searchProductByYColumn(productData, searchValue, usedProductRows = new Set()) {
-  for (let i = 0; i < productData.length; i++) {
-    const row = i + 3;
-    const yColumnValue = productData[i][24];
-
-    if (usedProductRows.has(row)) {
-      continue;
-    }
-
-    const status = utils_calculateProductStatus(productData[i]);
-
-    if (String(yColumnValue).trim() === String(searchValue).trim() && status !== PRODUCT_STATUS.SOLD) {
-      return row;
-    }
-  }
-
-  return null;
+function mercari_searchProductByYColumn(productIndex, searchValue, usedProductRows = new Set()) {
+  // 配列データが渡された場合もインデックス化して検索する
+  return utils_findProductRow(utils_ensureProductIndex(productIndex, 3), searchValue, usedProductRows);
 }
\ No newline at end of file
@@ -33,8 +33,14 @@ function mercari_transferToProductSheet() {
       return "転記対象の空白行がありませんでした。";
     }
     
+    // 書き込みはバッファに蓄積し、全行の処理後に一括で反映
+    const salesBuffer = utils_createWriteBuffer(mercariSalesSheet);
+    // 商品管理シートのAB〜AF列（転記で値だけを書き込む売上欄）は、書き込まない列を補完して1行1回で反映する
+    const productBuffer = utils_createWriteBuffer(productSheet, { fillColumns: [28, 29, 30, 31, 32] });
+    
     // 空白行から処理開始
-    transferredCount = mercari_processTransferRows(mercariData, mercariSalesSheet, productSheet, startIndex);
+    transferredCount = mercari_processTransferRows(mercariData, salesBuffer, productBuffer, startIndex);
+    utils_flushWriteBuffers([productBuffer, salesBuffer]);
     
     console.log(`${transferredCount}行のデータを商品管理シートに転記しました。`);
     return `${transferredCount}行のデータを商品管理シートに転記しました。`;
@@ -45,7 +51,7 @@ function mercari_transferToProductSheet() {
   }
 }
 
-function mercari_processTransferRows(mercariData, mercariSalesSheet, productSheet, startIndex) {
+function mercari_processTransferRows(mercariData, salesBuffer, productBuffer, startIndex) {
   let transferredCount = 0;
   
   for (let i = startIndex; i < mercariData.length; i++) {
@@ -73,10 +79,10 @@ function mercari_processTransferRows(mercariData, mercariSalesSheet, productShee
         continue;
       }
       
-      // メルカリ売上データの取得
-      const saleDate = mercariSalesSheet.getRange(row, 13).getValue(); // M列（売上日）
-      const salePrice = mercariSalesSheet.getRange(row, 19).getValue() || 0; // S列（売上価格）
-      const revenue = mercariSalesSheet.getRange(row, 18).getValue() || 0; // R列（入金額）
+      // メルカリ売上データの取得（一括取得済みの行データから）
+      const saleDate = mercariData[i][12]; // M列（売上日）
+      const salePrice = mercariData[i][18] || 0; // S列（売上価格）
+      const revenue = mercariData[i][17] || 0; // R列（入金額）
       
       // 日付をYYYY/MM/DD形式に変換
       let formattedDate = "";
@@ -100,19 +106,19 @@ function mercari_processTransferRows(mercariData, mercariSalesSheet, productShee
         try {
           // 商品管理シートに転記
           if (formattedDate) {
-            productSheet.getRange(targetRowNum, 28).setValue(formattedDate); // AB列（売上日）
+            utils_bufferSetValue(productBuffer, targetRowNum, 28, formattedDate); // AB列（売上日）
           }
           
           if (totalSalePrice !== 0) {
-            productSheet.getRange(targetRowNum, 29).setValue(dividedSalePrice); // AC列（販売価格）
+            utils_bufferSetValue(productBuffer, targetRowNum, 29, dividedSalePrice); // AC列（販売価格）
           }
           
           if (totalRevenue !== 0) {
-            productSheet.getRange(targetRowNum, 30).setValue(dividedRevenue); // AD列（入金価格）
+            utils_bufferSetValue(productBuffer, targetRowNum, 30, dividedRevenue); // AD列（入金価格）
           }
           
           // 売却廃却チェックボックスをTrueに設定
-          productSheet.getRange(targetRowNum, 32).setValue(true); // AF列（売却廃却）
+          utils_bufferSetValue(productBuffer, targetRowNum, 32, true); // AF列（売却廃却）
           
           successCount++;
           console.log(`${row}行目のメルカリ売上データを商品管理シート${targetRowNum}行目に転記完了（販売価格: ${dividedSalePrice}, 入金価格: ${dividedRevenue}）`);
@@ -125,8 +131,8 @@ function mercari_processTransferRows(mercariData, mercariSalesSheet, productShee
       if (successCount > 0) {
         // メルカリ売上シートのA列に「転記済み」、E列に転記日を記録
         const today = Utilities.formatDate(new Date(), "Asia/Tokyo", "yyyy/MM/dd");
-        mercariSalesSheet.getRange(row, 1).setValue("転記済み"); // A列
-        mercariSalesSheet.getRange(row, 5).setValue(today); // E列
+        utils_bufferSetValue(salesBuffer, row, 1, "転記済み"); // A列
+        utils_bufferSetValue(salesBuffer, row, 5, today); // E列
         
         console.log(`${row}行目: ${successCount}行の転記が完了しました（${targetRows.join(",")}行目、各行 販売価格: ${dividedSalePrice}, 入金価格: ${dividedRevenue}）`);
         transferredCount++;
@@ -66,31 +66,49 @@ function mercari_processCsvContent(csvContent) {
   }
 }
 
-function mercari_parseCsvContent(csvContent) {
-  const lines = csvContent.split("\n");
-  
-  if (lines.length < 2) {
-    throw new Error("CSVファイルの形式が正しくありません（ヘッダー行とデータが必要）。");
+/**
+ * CSVチャンク処理（ダイアログから行の区切りで分割して順番に呼び出される）
+ * @param {string} csvChunk - CSVテキストの一部（0番目のチャンクのみヘッダー行を含む）
+ * @param {number} chunkIndex - チャンク番号（0始まり）
+ * @param {number|null} baseLastRow - 取込開始前の最終行（0番目のチャンクの戻り値）
+ * @returns {Object} 処理結果
+ */
+function mercari_processCsvChunk(csvChunk, chunkIndex, baseLastRow) {
+  try {
+    console.log("ダイアログからメルカリCSVチャンクを処理中:", chunkIndex);
+    const csvData = chunkIndex === 0 ? mercari_parseCsvContent(csvChunk) : utils_parseCsv(csvChunk);
+
+    if (chunkIndex === 0) {
+      // 重複チェックの比較対象は取込開始前の行に限定する（同じファイル内の同一行は従来通り取り込む）
+      baseLastRow = utils_getSheetOrCreate("メルカリ売上").getLastRow();
+    } else if (csvData.length === 0) {
+      return { success: true, message: "", baseLastRow: baseLastRow };
+    }
+
+    const result = mercari_writeToSalesSheet(csvData, baseLastRow);
+    return { success: true, message: result, baseLastRow: baseLastRow };
+  } catch (error) {
+    console.error("CSVチャンク処理エラー:", error);
+    throw new Error("メルカリCSVファイルの処理に失敗しました: " + error.message);
   }
+}
 
-  // ヘッダー行をスキップしてデータ行から処理開始
-  const dataLines = lines.slice(1);
+function mercari_parseCsvContent(csvContent) {
+  const tokenizer = utils_createCsvTokenizer({ skipRows: 1 });
   const parsedData = [];
+  const onRow = row => parsedData.push(row);
 
-  for (let i = 0; i < dataLines.length; i++) {
-    const line = dataLines[i].trim();
-    if (line) {
-      const row = utils_parseCSVLine(line);
-      if (row && row.length > 0) {
-        parsedData.push(row);
-      }
-    }
+  utils_feedCsvChunk(tokenizer, csvContent, onRow);
+  utils_endCsvTokenizer(tokenizer, onRow);
+
+  if (tokenizer.recordCount < 2) {
+    throw new Error("CSVファイルの形式が正しくありません（ヘッダー行とデータが必要）。");
   }
 
   return parsedData;
 }
 
-function mercari_writeToSalesSheet(csvData) {
+function mercari_writeToSalesSheet(csvData, untilRow) {
   console.log("writeToMercariSalesSheetが呼び出されました。データ行数:", csvData.length);
   
   const spreadsheet = SpreadsheetApp.getActiveSpreadsheet();
@@ -105,8 +123,8 @@ function mercari_writeToSalesSheet(csvData) {
     throw new Error("読み込むデータがありません。");
   }
 
-  const existingData = mercari_getExistingData(sheet);
-  const newData = mercari_filterDuplicates(csvData, existingData);
+  const existingFingerprints = mercari_getExistingFingerprints(sheet, untilRow);
+  const newData = mercari_filterDuplicates(csvData, existingFingerprints);
   console.log("重複フィルタリング後のデータ行数:", newData.length);
 
   if (newData.length === 0) {
@@ -130,25 +148,11 @@ function mercari_writeToSalesSheet(csvData) {
   return `${newData.length}行のデータを追加しました。`;
 }
 
-function mercari_getExistingData(sheet) {
-  const lastRow = sheet.getLastRow();
-  if (lastRow < 1) {
-    return [];
-  }
-
-  const range = sheet.getRange(1, 7, lastRow, sheet.getLastColumn() - 6);
-  return range.getValues().filter(row => row.some(cell => cell !== ""));
+function mercari_getExistingFingerprints(sheet, untilRow) {
+  // G列以降の既存行のフィンガープリント（非表示シートに保存し、追加行のみ差分で読み込む）
+  return utils_getExistingFingerprints(sheet, 7, { persist: true, untilRow: untilRow });
 }
 
-function mercari_filterDuplicates(newData, existingData) {
-  if (existingData.length === 0) {
-    return newData;
-  }
-
-  return newData.filter(newRow => {
-    return !existingData.some(existingRow => {
-      return utils_arraysEqual(newRow, existingRow);
-    });
-  });
+function mercari_filterDuplicates(newData, existingFingerprints) {
+  return utils_filterDuplicates(newData, existingFingerprints);
 }
-
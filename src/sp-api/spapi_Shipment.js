@@ -138,7 +138,7 @@ function spapi_confirmSkus_(skuCounts) {
 // ===========================================
 
 /**
- * SP-APIのアクセストークンを取得する
+ * SP-APIのアクセストークンを取得する（有効期限内はキャッシュから返す）
  * @returns {string} アクセストークン
  */
 function spapi_getAccessToken_() {
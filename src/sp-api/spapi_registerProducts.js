@@ -37,100 +37,266 @@ function spapi_getScriptConfig() {
 // 登録処理の実行
 // ============================================
 
-function spapi_executeRegistration(sheet, accessToken, scriptConfig, processableRows, analysisResult) {
+/**
+ * 登録処理を実行する
+ * 行ごとに「SKU存在チェック → 商品タイプ取得 → 商品登録 → 価格設定」の段階をスケジューラーに予約し、
+ * 前の段階のレスポンスを受け取った行から次の段階へ進める（行をまたいでパイプライン化）
+ * @param {Sheet} sheet - 対象シート
+ * @param {string} accessToken - アクセストークン
+ * @param {Object} scriptConfig - スクリプト設定
+ * @param {Object[]} processableRows - 登録対象の行データ
+ * @param {Object} analysisResult - 分析結果
+ * @param {Object} scheduler - SP-APIスケジューラー（省略時は新規作成）
+ * @returns {Object[]} - 処理結果の配列（processableRows の順）
+ */
+function spapi_executeRegistration(sheet, accessToken, scriptConfig, processableRows, analysisResult, scheduler) {
+  if (!accessToken || accessToken.trim() === "") {
+    throw new Error("アクセストークンが空です");
+  }
+
+  scheduler = scheduler || utils_createSpApiScheduler();
   const results = [];
 
-  for (const row of processableRows) {
-    const { rowNumber, asin, sku, price, breakEvenPrice, duplicateValue } = row;
+  processableRows.forEach((row, index) => {
+    Logger.log("--- 処理開始: 行 " + row.rowNumber + " ---");
+    const context = { sheet, accessToken, scriptConfig, analysisResult, scheduler, results, index, row };
+    spapi_scheduleSkuCheck_(context);
+  });
 
-    Logger.log("--- 処理開始: 行 " + rowNumber + " ---");
+  const stats = utils_runSpApiScheduler(scheduler);
+  Logger.log("SP-APIリクエスト: " + stats.requests + " 件 (fetchAll " + stats.batches + " 回, 再送 " + stats.retries + " 回, 429 " + stats.throttled + " 回)");
+  utils_logSpApiCacheStats();
 
-    // SKU存在チェック
-    try {
-      const skuExists = spapi_checkSkuExists(accessToken, sku, scriptConfig);
-      if (skuExists) {
-        const result = {
-          row: rowNumber,
-          sku,
-          asin,
-          status: "スキップ",
-          errorType: "SKU_EXISTS",
-          message: "SKU「" + sku + "」は既に登録済みのためスキップしました",
-        };
-        results.push(result);
-        spapi_updateResultCell(sheet, rowNumber, result);
-        spapi_copySkuToColumn(sheet, rowNumber, sku);
-        Logger.log("SKU存在のためスキップ: " + sku);
-        continue;
-      }
-    } catch (e) {
-      Logger.log("SKU存在チェックエラー (行 " + rowNumber + "): " + e.message);
+  return results.filter(result => result);
+}
+
+// ============================================
+// 登録ジョブ
+// ============================================
+
+/**
+ * 商品登録のジョブ定義（状態: 対象行番号・重複でスキップした行・件数）
+ * 再開時は行データを読み直して続きの行から登録する
+ */
+function spapi_createRegistrationJob_() {
+  return {
+    name: "spapi_registerSelectedProducts",
+    title: "商品登録",
+    factory: "spapi_createRegistrationJob_",
+    chunkRows: 50,
+    open: spapi_openRegistration_,
+    runChunk: spapi_runRegistrationChunk_,
+    finish: state => "商品登録が完了しました。\n\n成功: " + state.successCount + " 件\nエラー/スキップ: " + state.errorCount + " 件"
+  };
+}
+
+/**
+ * 分析結果から登録ジョブの初期状態を作成する
+ * @param {Sheet} sheet - 対象シート
+ * @param {Object} analysisResult - 分析結果
+ * @returns {Object} 初期状態
+ */
+function spapi_buildRegistrationState_(sheet, analysisResult) {
+  const rowNumbers = analysisResult.processableRows.map(row => row.rowNumber);
+
+  return {
+    sheetName: sheet.getName(),
+    rows: core_encodeRowSet(rowNumbers),
+    duplicateRows: analysisResult.skippedRows
+      .filter(row => row.skipReason === "重複（X列）")
+      .map(row => [row.rowNumber, row.duplicateValue]),
+    successCount: 0,
+    errorCount: 0,
+    done: 0,
+    total: rowNumbers.length
+  };
+}
+
+function spapi_openRegistration_(state) {
+  const scriptConfig = spapi_getScriptConfig();
+  const sheet = SpreadsheetApp.getActiveSpreadsheet().getSheetByName(state.sheetName);
+  if (!sheet) {
+    throw new Error("シート「" + state.sheetName + "」が見つかりません");
+  }
+
+  return {
+    sheet: sheet,
+    scriptConfig: scriptConfig,
+    // 有効期限内ならキャッシュ済みのトークンが使われる
+    accessToken: spapi_getAccessToken(scriptConfig),
+    rowNumbers: Array.from(core_decodeRowSet(state.rows)).sort((a, b) => a - b),
+    analysisResult: {
+      skippedRows: state.duplicateRows.map(([rowNumber, duplicateValue]) => ({ rowNumber, duplicateValue, skipReason: "重複（X列）" })),
+    },
+    scheduler: utils_createSpApiScheduler(),
+    results: [],
+  };
+}
+
+function spapi_runRegistrationChunk_(state, context, chunkRows) {
+  const rowDataList = spapi_getRowDataList(context.sheet, context.rowNumbers.slice(state.done, state.done + chunkRows));
+  const results = spapi_executeRegistration(
+    context.sheet,
+    context.accessToken,
+    context.scriptConfig,
+    rowDataList,
+    context.analysisResult,
+    context.scheduler
+  );
+
+  state.successCount += results.filter(r => r.status === "成功").length;
+  state.errorCount += results.filter(r => r.status !== "成功").length;
+  state.done += rowDataList.length;
+  Array.prototype.push.apply(context.results, results);
+}
+
+/**
+ * 段階1: SKU存在チェック（登録済みならスキップ、チェック失敗時は登録へ進む）
+ */
+function spapi_scheduleSkuCheck_(context) {
+  const { row, accessToken, scriptConfig } = context;
+  const request = spapi_buildListingsItemRequest_(accessToken, row.sku, scriptConfig, "get");
+
+  utils_scheduleSpApiRequest(context.scheduler, "getListingsItem", request, response => {
+    Logger.log("SKU存在チェック結果 (HTTP " + response.code + "): " + row.sku);
+
+    if (response.code === 200) {
+      spapi_recordRegistrationResult_(context, {
+        row: row.rowNumber,
+        sku: row.sku,
+        asin: row.asin,
+        status: "スキップ",
+        errorType: "SKU_EXISTS",
+        message: "SKU「" + row.sku + "」は既に登録済みのためスキップしました",
+      });
+      spapi_copySkuToColumn(context.sheet, row.rowNumber, row.sku);
+      Logger.log("SKU存在のためスキップ: " + row.sku);
+      return;
     }
 
-    // 商品登録処理
+    spapi_scheduleProductTypeLookup_(context);
+  }, error => spapi_recordRegistrationError_(context, error));
+}
+
+/**
+ * 段階2: ASINから商品タイプを取得（キャッシュ済みならリクエストせずに登録へ進む）
+ */
+function spapi_scheduleProductTypeLookup_(context) {
+  const { row, accessToken, scriptConfig } = context;
+  const cacheKey = spapi_buildProductTypeCacheKey_(row.asin, scriptConfig);
+  const cachedProductType = utils_cacheGet("productType", cacheKey);
+  if (cachedProductType) {
+    Logger.log("キャッシュ済みの商品タイプ: " + cachedProductType + " (ASIN: " + row.asin + ")");
+    spapi_schedulePutListing_(context, cachedProductType);
+    return;
+  }
+
+  const request = spapi_buildProductTypeRequest_(accessToken, row.asin, scriptConfig);
+
+  utils_scheduleSpApiRequest(context.scheduler, "getCatalogItem", request, response => {
+    let productType;
     try {
-      const response = spapi_putListing(accessToken, sku, asin, price, scriptConfig);
-      const result = {
-        row: rowNumber,
-        sku,
-        asin,
-        status: "成功",
-        errorType: null,
-        message: response.status || "FBA出品登録完了",
-      };
-      results.push(result);
-      spapi_updateResultCell(sheet, rowNumber, result);
-      spapi_copySkuToColumn(sheet, rowNumber, sku);
-
-      // Y列にX列の値をコピー（登録成功した行）
-      spapi_copyValueToSkipColumn(sheet, rowNumber, duplicateValue);
-
-      // 重複行にもY列をコピー
-      spapi_copyValueToDuplicateRows(sheet, duplicateValue, analysisResult);
-
-      Logger.log("登録成功: 行 " + rowNumber);
-
-      // 価格設定（下限価格・自動価格ルール）
-      const hasBreakEvenPrice = breakEvenPrice && !isNaN(breakEvenPrice) && breakEvenPrice > 0;
-      const hasRuleId = scriptConfig.AUTOMATED_PRICING_RULE_ID && scriptConfig.AUTOMATED_PRICING_RULE_ID.trim() !== "";
-
-      if (hasBreakEvenPrice || hasRuleId) {
-        try {
-          const minimumPrice = hasBreakEvenPrice ? Math.ceil(breakEvenPrice * 0.9) : null;
-          if (hasBreakEvenPrice) {
-            Logger.log("下限価格設定: " + breakEvenPrice + " × 0.9 = " + minimumPrice);
-          }
-          if (hasRuleId) {
-            Logger.log("自動価格ルール設定: " + scriptConfig.AUTOMATED_PRICING_RULE_ID);
-          }
-          spapi_patchPricingSettings(accessToken, sku, minimumPrice, response.productType, scriptConfig);
-          Logger.log("価格設定成功: 行 " + rowNumber);
-        } catch (pricingError) {
-          Logger.log("価格設定エラー (行 " + rowNumber + "): " + pricingError.message);
-        }
-      } else {
-        Logger.log("Q列が空かつルールID未設定のため価格設定をスキップ: 行 " + rowNumber);
-      }
+      productType = spapi_parseProductTypeResponse_(row.asin, response.code, response.body, scriptConfig);
     } catch (e) {
-      Logger.log("商品登録エラー (行 " + rowNumber + "): " + e.message);
-      const errorType = spapi_detectErrorType(e.message);
-      const result = {
-        row: rowNumber,
-        sku,
-        asin,
-        status: "エラー",
-        errorType,
-        message: e.message,
-      };
-      results.push(result);
-      spapi_updateResultCell(sheet, rowNumber, result);
+      spapi_recordRegistrationError_(context, e);
+      return;
     }
 
-    Logger.log("--- 処理完了: 行 " + rowNumber + " ---");
-    Utilities.sleep(1000);
+    utils_cachePut("productType", cacheKey, productType);
+    spapi_schedulePutListing_(context, productType);
+  }, error => spapi_recordRegistrationError_(context, error));
+}
+
+/**
+ * 段階3: 商品登録（PUT）
+ */
+function spapi_schedulePutListing_(context, productType) {
+  const { sheet, row, accessToken, scriptConfig } = context;
+  const request = spapi_buildPutListingRequest_(accessToken, row.sku, row.asin, row.price, productType, scriptConfig);
+
+  utils_scheduleSpApiRequest(context.scheduler, "putListingsItem", request, response => {
+    Logger.log("商品登録レスポンス (HTTP " + response.code + "): " + response.body.substring(0, 500));
+
+    if (response.code >= 400) {
+      spapi_recordRegistrationError_(context, new Error("登録失敗 (HTTP " + response.code + "): " + response.body));
+      return;
+    }
+
+    spapi_recordRegistrationResult_(context, {
+      row: row.rowNumber,
+      sku: row.sku,
+      asin: row.asin,
+      status: "成功",
+      errorType: null,
+      message: spapi_formatListingStatus_(response.code, response.body),
+    });
+    spapi_copySkuToColumn(sheet, row.rowNumber, row.sku);
+
+    // Y列にX列の値をコピー（登録成功した行）
+    spapi_copyValueToSkipColumn(sheet, row.rowNumber, row.duplicateValue);
+
+    // 重複行にもY列をコピー
+    spapi_copyValueToDuplicateRows(sheet, row.duplicateValue, context.analysisResult);
+
+    Logger.log("登録成功: 行 " + row.rowNumber);
+
+    spapi_schedulePricingSettings_(context, productType);
+  }, error => spapi_recordRegistrationError_(context, error));
+}
+
+/**
+ * 段階4: 価格設定（下限価格・自動価格ルール）。失敗しても登録結果は成功のまま
+ */
+function spapi_schedulePricingSettings_(context, productType) {
+  const { row, accessToken, scriptConfig } = context;
+  const breakEvenPrice = row.breakEvenPrice;
+  const hasBreakEvenPrice = breakEvenPrice && !isNaN(breakEvenPrice) && breakEvenPrice > 0;
+  const hasRuleId = scriptConfig.AUTOMATED_PRICING_RULE_ID && scriptConfig.AUTOMATED_PRICING_RULE_ID.trim() !== "";
+
+  if (!hasBreakEvenPrice && !hasRuleId) {
+    Logger.log("Q列が空かつルールID未設定のため価格設定をスキップ: 行 " + row.rowNumber);
+    return;
+  }
+
+  const minimumPrice = hasBreakEvenPrice ? Math.ceil(breakEvenPrice * 0.9) : null;
+  if (hasBreakEvenPrice) {
+    Logger.log("下限価格設定: " + breakEvenPrice + " × 0.9 = " + minimumPrice);
   }
+  if (hasRuleId) {
+    Logger.log("自動価格ルール設定: " + scriptConfig.AUTOMATED_PRICING_RULE_ID);
+  }
+
+  const request = spapi_buildPatchPricingRequest_(accessToken, row.sku, minimumPrice, productType, scriptConfig);
 
-  return results;
+  utils_scheduleSpApiRequest(context.scheduler, "patchListingsItem", request, response => {
+    if (response.code >= 400) {
+      Logger.log("価格設定エラー (行 " + row.rowNumber + "): 価格設定失敗 (HTTP " + response.code + "): " + response.body);
+      return;
+    }
+    Logger.log("価格設定成功: 行 " + row.rowNumber);
+  }, error => {
+    Logger.log("価格設定エラー (行 " + row.rowNumber + "): " + error.message);
+  });
+}
+
+function spapi_recordRegistrationError_(context, error) {
+  const { row } = context;
+  Logger.log("商品登録エラー (行 " + row.rowNumber + "): " + error.message);
+
+  spapi_recordRegistrationResult_(context, {
+    row: row.rowNumber,
+    sku: row.sku,
+    asin: row.asin,
+    status: "エラー",
+    errorType: spapi_detectErrorType(error.message),
+    message: error.message,
+  });
+}
+
+function spapi_recordRegistrationResult_(context, result) {
+  context.results[context.index] = result;
+  spapi_updateResultCell(context.sheet, context.row.rowNumber, result);
+  Logger.log("--- 処理完了: 行 " + context.row.rowNumber + " ---");
 }
 
 // ============================================
@@ -216,25 +382,30 @@ function spapi_registerSelectedProducts() {
     return;
   }
   
-  // アクセストークンを取得
-  let accessToken;
+  // アクセストークンを取得（認証エラーは登録開始前に知らせる。取得したトークンはジョブがキャッシュから使う）
   try {
-    accessToken = spapi_getAccessToken(scriptConfig);
+    spapi_getAccessToken(scriptConfig);
   } catch (e) {
     spapi_showResult("認証エラー", "アクセストークン取得に失敗しました: " + e.message);
     return;
   }
   
-  // 登録処理を実行（analysisResultを追加で渡す）
-  const results = spapi_executeRegistration(
-    sheet,
-    accessToken,
-    scriptConfig,
-    analysisResult.processableRows,
-    analysisResult  // 追加
-  );
-  
+  // 登録処理をジョブとして実行（行数が多い場合は途中で中断し、続きを時間主導トリガーで再開する）
+  let jobResult;
+  try {
+    jobResult = core_runJob(spapi_createRegistrationJob_(), spapi_buildRegistrationState_(sheet, analysisResult));
+  } catch (e) {
+    spapi_showResult("エラー", e.message);
+    return;
+  }
+
+  if (!jobResult.complete) {
+    spapi_showResult("中断", jobResult.message);
+    return;
+  }
+
   // 結果を表示
+  const results = jobResult.context.results;
   const successCount = results.filter(r => r.status === "成功").length;
   const errorCount = results.filter(r => r.status !== "成功").length;
   
@@ -446,6 +617,14 @@ function spapi_showApprovalDialog(analysisResult) {
 // ============================================
 
 function spapi_getAccessToken(config) {
+  // 有効期限内のトークンがあれば再利用する（utils_getSpApiAccessToken とキャッシュを共有）
+  const cacheKey = utils_buildLwaTokenCacheKey(config.LWA_TOKEN_ENDPOINT, config.LWA_CLIENT_ID, config.LWA_REFRESH_TOKEN);
+  const cachedToken = utils_cacheGet("lwaToken", cacheKey);
+  if (cachedToken) {
+    Logger.log("キャッシュ済みのアクセストークンを使用します");
+    return cachedToken;
+  }
+
   const payload = {
     grant_type: "refresh_token",
     refresh_token: config.LWA_REFRESH_TOKEN,
@@ -480,6 +659,8 @@ function spapi_getAccessToken(config) {
   
   // トークンの存在確認（デバッグ用：先頭10文字のみ表示）
   Logger.log("アクセストークン取得成功: " + json.access_token.substring(0, 10) + "...");
+
+  utils_cachePut("lwaToken", cacheKey, json.access_token, utils_getLwaTokenTtl(json.expires_in));
   
   return json.access_token;
 }
@@ -489,6 +670,28 @@ function spapi_getAccessToken(config) {
 // ============================================
 
 function spapi_checkSkuExists(accessToken, sku, config) {
+  const request = spapi_buildListingsItemRequest_(accessToken, sku, config, "get");
+
+  Logger.log("SKU存在チェック: " + request.url);
+
+  const res = UrlFetchApp.fetch(request.url, request);
+
+  const code = res.getResponseCode();
+  Logger.log("SKU存在チェック結果 (HTTP " + code + "): " + sku);
+  
+  return code === 200;
+}
+
+/**
+ * Listings Items API（/listings/2021-08-01/items/{sellerId}/{sku}）のリクエストを作成する
+ * @param {string} accessToken - アクセストークン
+ * @param {string} sku - SKU
+ * @param {Object} config - スクリプト設定
+ * @param {string} method - get / put / patch
+ * @param {Object} body - リクエストボディ（put・patchのみ）
+ * @returns {Object} - UrlFetchApp.fetchAll に渡せるリクエスト
+ */
+function spapi_buildListingsItemRequest_(accessToken, sku, config, method, body) {
   // アクセストークンの検証
   if (!accessToken || accessToken.trim() === "") {
     throw new Error("アクセストークンが空です");
@@ -500,24 +703,23 @@ function spapi_checkSkuExists(accessToken, sku, config) {
               encodeURIComponent(sku) +
               "?marketplaceIds=" + config.MARKETPLACE_ID;
   
-  Logger.log("SKU存在チェック: " + url);
-  
-  const headers = {
-    "Authorization": "Bearer " + accessToken,
-    "Accept": "application/json",
-    "x-amz-access-token": accessToken
-  };
-  
-  const res = UrlFetchApp.fetch(url, {
-    method: "get",
-    headers: headers,
+  const request = {
+    url: url,
+    method: method,
+    headers: {
+      "Authorization": "Bearer " + accessToken,
+      "Accept": "application/json",
+      "x-amz-access-token": accessToken
+    },
     muteHttpExceptions: true
-  });
-  
-  const code = res.getResponseCode();
-  Logger.log("SKU存在チェック結果 (HTTP " + code + "): " + sku);
-  
-  return code === 200;
+  };
+
+  if (body) {
+    request.contentType = "application/json";
+    request.payload = JSON.stringify(body);
+  }
+
+  return request;
 }
 
 // ============================================
@@ -525,6 +727,35 @@ function spapi_checkSkuExists(accessToken, sku, config) {
 // ============================================
 
 function spapi_getProductTypeByAsin(accessToken, asin, config) {
+  const cacheKey = spapi_buildProductTypeCacheKey_(asin, config);
+  const cachedProductType = utils_cacheGet("productType", cacheKey);
+  if (cachedProductType) {
+    Logger.log("キャッシュ済みの商品タイプ: " + cachedProductType + " (ASIN: " + asin + ")");
+    return cachedProductType;
+  }
+
+  const request = spapi_buildProductTypeRequest_(accessToken, asin, config);
+  
+  Logger.log("商品タイプ取得URL: " + request.url);
+  
+  const res = UrlFetchApp.fetch(request.url, request);
+  const productType = spapi_parseProductTypeResponse_(asin, res.getResponseCode(), res.getContentText(), config);
+
+  utils_cachePut("productType", cacheKey, productType);
+  return productType;
+}
+
+/**
+ * 商品タイプのキャッシュキー（マーケットプレイスごとにASINの商品タイプが異なるため含める）
+ */
+function spapi_buildProductTypeCacheKey_(asin, config) {
+  return config.MARKETPLACE_ID + ":" + asin;
+}
+
+/**
+ * Catalog Items API の商品タイプ取得リクエストを作成する
+ */
+function spapi_buildProductTypeRequest_(accessToken, asin, config) {
   if (!accessToken || accessToken.trim() === "") {
     throw new Error("アクセストークンが空です");
   }
@@ -535,23 +766,22 @@ function spapi_getProductTypeByAsin(accessToken, asin, config) {
               "?marketplaceIds=" + config.MARKETPLACE_ID +
               "&includedData=summaries,productTypes";
   
-  const headers = {
-    "Authorization": "Bearer " + accessToken,
-    "Accept": "application/json",
-    "x-amz-access-token": accessToken
-  };
-  
-  Logger.log("商品タイプ取得URL: " + url);
-  
-  const res = UrlFetchApp.fetch(url, {
+  return {
+    url: url,
     method: "get",
-    headers: headers,
+    headers: {
+      "Authorization": "Bearer " + accessToken,
+      "Accept": "application/json",
+      "x-amz-access-token": accessToken
+    },
     muteHttpExceptions: true
-  });
-  
-  const statusCode = res.getResponseCode();
-  const bodyText = res.getContentText();
-  
+  };
+}
+
+/**
+ * 商品タイプ取得レスポンスから商品タイプを取り出す
+ */
+function spapi_parseProductTypeResponse_(asin, statusCode, bodyText, config) {
   Logger.log("商品タイプ取得レスポンス (HTTP " + statusCode + ")");
   
   if (statusCode !== 200) {
@@ -614,12 +844,47 @@ function spapi_putListing(accessToken, sku, asin, price, config) {
   const productType = spapi_getProductTypeByAsin(accessToken, asin, config);
   Logger.log("商品タイプ取得完了: " + productType);
   
-  const url = config.SP_API_ENDPOINT +
-              "/listings/2021-08-01/items/" +
-              config.SELLER_ID + "/" +
-              encodeURIComponent(sku) +
-              "?marketplaceIds=" + config.MARKETPLACE_ID;
+  const request = spapi_buildPutListingRequest_(accessToken, sku, asin, price, productType, config);
   
+  Logger.log("商品登録リクエスト送信中...");
+  
+  const res = UrlFetchApp.fetch(request.url, request);
+  
+  const status = res.getResponseCode();
+  const responseBody = res.getContentText();
+  
+  Logger.log("商品登録レスポンス (HTTP " + status + "): " + responseBody.substring(0, 500));
+  
+  if (status >= 400) {
+    throw new Error("登録失敗 (HTTP " + status + "): " + responseBody);
+  }
+  
+  Logger.log("=== 商品登録完了 ===");
+  return { status: spapi_formatListingStatus_(status, responseBody), productType: productType };
+}
+
+/**
+ * 商品登録の結果メッセージを作成する
+ * HTTPステータスとレスポンスの status（ACCEPTED など）を含め、200 と 202（受付のみ）を区別できるようにする
+ * @param {number} code - HTTPステータス
+ * @param {string} body - レスポンス本文
+ * @returns {string} 結果メッセージ
+ */
+function spapi_formatListingStatus_(code, body) {
+  let submissionStatus = "";
+  try {
+    submissionStatus = JSON.parse(body).status || "";
+  } catch (e) {
+    // JSONでない場合はHTTPステータスだけを表示
+  }
+
+  return "FBA出品登録完了 (HTTP " + code + (submissionStatus ? ", " + submissionStatus : "") + ")";
+}
+
+/**
+ * 商品登録（PUT）リクエストを作成する
+ */
+function spapi_buildPutListingRequest_(accessToken, sku, asin, price, productType, config) {
   const body = {
     productType: productType,
     requirements: "LISTING_OFFER_ONLY",
@@ -637,36 +902,12 @@ function spapi_putListing(accessToken, sku, asin, price, config) {
     }
   };
   
-  Logger.log("商品登録URL: " + url);
-  Logger.log("商品登録ボディ: " + JSON.stringify(body).substring(0, 500));
-  
-  const options = {
-    method: "put",
-    contentType: "application/json",
-    headers: {
-      "Authorization": "Bearer " + accessToken,
-      "Accept": "application/json",
-      "x-amz-access-token": accessToken
-    },
-    payload: JSON.stringify(body),
-    muteHttpExceptions: true
-  };
-  
-  Logger.log("商品登録リクエスト送信中...");
-  
-  const res = UrlFetchApp.fetch(url, options);
-  
-  const status = res.getResponseCode();
-  const responseBody = res.getContentText();
-  
-  Logger.log("商品登録レスポンス (HTTP " + status + "): " + responseBody.substring(0, 500));
-  
-  if (status >= 400) {
-    throw new Error("登録失敗 (HTTP " + status + "): " + responseBody);
-  }
-  
-  Logger.log("=== 商品登録完了 ===");
-  return { status: "FBA出品登録完了", productType: productType };
+  const request = spapi_buildListingsItemRequest_(accessToken, sku, config, "put", body);
+
+  Logger.log("商品登録URL: " + request.url);
+  Logger.log("商品登録ボディ: " + request.payload.substring(0, 500));
+
+  return request;
 }
 
 // ============================================
@@ -674,10 +915,27 @@ function spapi_putListing(accessToken, sku, asin, price, config) {
 // ============================================
 
 function spapi_patchPricingSettings(accessToken, sku, minimumPrice, productType, config) {
-  if (!accessToken || accessToken.trim() === "") {
-    throw new Error("アクセストークンが空です");
+  const request = spapi_buildPatchPricingRequest_(accessToken, sku, minimumPrice, productType, config);
+
+  const res = UrlFetchApp.fetch(request.url, request);
+
+  const status = res.getResponseCode();
+  const responseBody = res.getContentText();
+
+  Logger.log("価格設定レスポンス (HTTP " + status + "): " + responseBody);
+
+  if (status >= 400) {
+    throw new Error("価格設定失敗 (HTTP " + status + "): " + responseBody);
   }
 
+  Logger.log("=== 価格設定完了 ===");
+  return { status: "価格設定完了" };
+}
+
+/**
+ * 価格設定（PATCH）リクエストを作成する
+ */
+function spapi_buildPatchPricingRequest_(accessToken, sku, minimumPrice, productType, config) {
   const ruleId = config.AUTOMATED_PRICING_RULE_ID;
   const hasMinPrice = minimumPrice && !isNaN(minimumPrice) && minimumPrice > 0;
   const hasRuleId = ruleId && ruleId.trim() !== "";
@@ -685,12 +943,6 @@ function spapi_patchPricingSettings(accessToken, sku, minimumPrice, productType,
   Logger.log("=== 価格設定開始 ===");
   Logger.log("SKU: " + sku + ", 下限価格: " + (hasMinPrice ? minimumPrice : "なし") + ", ルールID: " + (hasRuleId ? ruleId : "なし"));
 
-  const url = config.SP_API_ENDPOINT +
-              "/listings/2021-08-01/items/" +
-              config.SELLER_ID + "/" +
-              encodeURIComponent(sku) +
-              "?marketplaceIds=" + config.MARKETPLACE_ID;
-
   const purchasableOfferValue = {
     marketplace_id: config.MARKETPLACE_ID,
   };
@@ -728,34 +980,12 @@ function spapi_patchPricingSettings(accessToken, sku, minimumPrice, productType,
     ]
   };
 
-  Logger.log("価格設定URL: " + url);
-  Logger.log("価格設定ボディ: " + JSON.stringify(body));
-
-  const options = {
-    method: "patch",
-    contentType: "application/json",
-    headers: {
-      "Authorization": "Bearer " + accessToken,
-      "Accept": "application/json",
-      "x-amz-access-token": accessToken
-    },
-    payload: JSON.stringify(body),
-    muteHttpExceptions: true
-  };
-
-  const res = UrlFetchApp.fetch(url, options);
+  const request = spapi_buildListingsItemRequest_(accessToken, sku, config, "patch", body);
 
-  const status = res.getResponseCode();
-  const responseBody = res.getContentText();
-
-  Logger.log("価格設定レスポンス (HTTP " + status + "): " + responseBody);
+  Logger.log("価格設定URL: " + request.url);
+  Logger.log("価格設定ボディ: " + request.payload);
 
-  if (status >= 400) {
-    throw new Error("価格設定失敗 (HTTP " + status + "): " + responseBody);
-  }
-
-  Logger.log("=== 価格設定完了 ===");
-  return { status: "価格設定完了" };
+  return request;
 }
 
 // ============================================
@@ -764,9 +994,46 @@ function spapi_patchPricingSettings(accessToken, sku, minimumPrice, productType,
 
 function spapi_getAvailablePricingRules() {
   const scriptConfig = spapi_getScriptConfig();
+  const productType = "PRODUCT";
+
+  // スキーマ全体は大きいため、抽出したルール一覧だけをキャッシュする
+  const cacheKey = [productType, scriptConfig.SELLER_ID, scriptConfig.MARKETPLACE_ID].join(":");
+  let rules = utils_cacheGet("pricingRules", cacheKey);
+
+  if (rules) {
+    Logger.log("キャッシュ済みの自動価格設定ルールを使用します");
+  } else {
+    rules = spapi_fetchPricingRules_(scriptConfig, productType);
+    if (rules.length > 0) {
+      utils_cachePut("pricingRules", cacheKey, rules);
+    }
+  }
+
+  if (rules.length === 0) {
+    Logger.log("利用可能な自動価格設定ルールが見つかりません");
+    SpreadsheetApp.getUi().alert("情報", "利用可能な自動価格設定ルールが見つかりませんでした。", SpreadsheetApp.getUi().ButtonSet.OK);
+    return [];
+  }
+
+  Logger.log("=== 利用可能な自動価格設定ルール ===");
+  let message = "利用可能な自動価格設定ルール:\n\n";
+  rules.forEach((rule, index) => {
+    Logger.log((index + 1) + ". " + rule.displayName + "\n   ID: " + rule.ruleId);
+    message += (index + 1) + ". " + rule.displayName + "\n   ID: " + rule.ruleId + "\n\n";
+  });
+
+  SpreadsheetApp.getUi().alert("自動価格設定ルール一覧", message, SpreadsheetApp.getUi().ButtonSet.OK);
+
+  return rules;
+}
+
+/**
+ * 商品タイプ定義のスキーマから自動価格設定ルール（rule_id の候補）を取り出す
+ * @returns {Object[]} - [{ ruleId, displayName }]（見つからない場合は空配列）
+ */
+function spapi_fetchPricingRules_(scriptConfig, productType) {
   const accessToken = spapi_getAccessToken(scriptConfig);
 
-  const productType = "PRODUCT";
   const url = scriptConfig.SP_API_ENDPOINT +
               "/definitions/2020-09-01/productTypes/" +
               encodeURIComponent(productType) +
@@ -819,8 +1086,6 @@ function spapi_getAvailablePricingRules() {
   const rulePlan = purchasableOffer?.automated_pricing_merchandising_rule_plan?.items?.properties?.merchandising_rule?.properties?.rule_id;
 
   if (!rulePlan || !rulePlan.enum) {
-    Logger.log("利用可能な自動価格設定ルールが見つかりません");
-    SpreadsheetApp.getUi().alert("情報", "利用可能な自動価格設定ルールが見つかりませんでした。", SpreadsheetApp.getUi().ButtonSet.OK);
     return [];
   }
 
@@ -835,15 +1100,6 @@ function spapi_getAvailablePricingRules() {
     });
   }
 
-  Logger.log("=== 利用可能な自動価格設定ルール ===");
-  let message = "利用可能な自動価格設定ルール:\n\n";
-  rules.forEach((rule, index) => {
-    Logger.log((index + 1) + ". " + rule.displayName + "\n   ID: " + rule.ruleId);
-    message += (index + 1) + ". " + rule.displayName + "\n   ID: " + rule.ruleId + "\n\n";
-  });
-
-  SpreadsheetApp.getUi().alert("自動価格設定ルール一覧", message, SpreadsheetApp.getUi().ButtonSet.OK);
-
   return rules;
 }
 
@@ -116,15 +116,9 @@ function utils_parseMultipleRows(targetRowValue) {
 }
 
 function utils_filterDuplicates(newData, existingData) {
-  if (existingData.length === 0) {
-    return newData;
-  }
-
-  return newData.filter(newRow => {
-    return !existingData.some(existingRow => {
-      return arraysEqual(newRow, existingRow);
-    });
-  });
+  // 既存データ（行の配列）またはフィンガープリントのSetを受け付ける
+  const fingerprints = existingData instanceof Set ? existingData : utils_createFingerprintSet(existingData);
+  return utils_filterByFingerprints(newData, fingerprints);
 }
 
 function utils_getExistingData(sheet, startColumn) {
@@ -0,0 +1,247 @@
+/**
+ * ストリーミングCSVトークナイザー
+ * チャンク単位で受け取ったテキストを1パスで解析し、行が確定するたびにコールバックへ渡す
+ * CRLF・BOM・引用符内の改行に対応し、先頭の前置き行（Amazonペイメントレポートの8行など）を読み飛ばす
+ */
+
+const CSV_STREAM_STATE = {
+  UNQUOTED: 0,    // 引用符の外
+  QUOTED: 1,      // 引用符の中
+  QUOTE_SEEN: 2   // 引用符の中で " を検出（次の文字で "" か閉じ引用符かを判定）
+};
+
+/**
+ * トークナイザーを作成する
+ * @param {Object} options - { skipRows: 読み飛ばす先頭行数, skipBlankRows: 空行を除外するか（既定true）,
+ *                            trimRecords: 行の前後の引用符外の空白を除くか（既定true、従来の line.trim() と同じ） }
+ * @returns {Object} トークナイザーの状態
+ */
+function utils_createCsvTokenizer(options) {
+  options = options || {};
+
+  return {
+    skipRows: options.skipRows || 0,
+    skipBlankRows: options.skipBlankRows !== false,
+    trimRecords: options.trimRecords !== false,
+    state: CSV_STREAM_STATE.UNQUOTED,
+    field: "",
+    fieldOpen: false,
+    firstQuoteAt: -1,  // 先頭フィールドで最初の引用符が開いた位置（引用符外の先頭部分の長さ）
+    lastQuoteEnd: -1,  // 現在のフィールドで最後の引用符が閉じた位置
+    row: [],
+    pendingCR: false,
+    started: false,
+    recordCount: 0,
+    rowCount: 0
+  };
+}
+
+/**
+ * チャンクを解析し、確定した行をコールバックに渡す
+ * チャンクの境界はフィールド・引用符・CRLFの途中でもよい
+ * @param {Object} tokenizer - トークナイザーの状態
+ * @param {string} chunk - CSVテキストの一部
+ * @param {Function} onRow - 行（文字列の配列）を受け取るコールバック
+ */
+function utils_feedCsvChunk(tokenizer, chunk, onRow) {
+  let text = chunk;
+  if (!text) {
+    return;
+  }
+
+  if (!tokenizer.started) {
+    tokenizer.started = true;
+    if (text.charCodeAt(0) === 0xFEFF) {
+      text = text.slice(1);
+    }
+  }
+
+  const len = text.length;
+  let i = 0;
+
+  // 前のチャンクがCRで終わっていた場合、続くLFを読み飛ばす
+  if (tokenizer.pendingCR) {
+    tokenizer.pendingCR = false;
+    if (len > 0 && text.charCodeAt(0) === 10) {
+      i = 1;
+    }
+  }
+
+  // ループ内ではローカル変数で状態を持ち、チャンクの終わりでトークナイザーに書き戻す
+  let state = tokenizer.state;
+  let field = tokenizer.field;
+  let fieldOpen = tokenizer.fieldOpen;
+  let firstQuoteAt = tokenizer.firstQuoteAt;
+  let lastQuoteEnd = tokenizer.lastQuoteEnd;
+  let row = tokenizer.row;
+  let fieldStart = i;
+
+  while (i < len) {
+    if (state === CSV_STREAM_STATE.QUOTED) {
+      // 引用符内は次の " まで一括で読み進める
+      const quoteIndex = text.indexOf("\"", i);
+      if (quoteIndex === -1) {
+        i = len;
+        break;
+      }
+      field += text.slice(fieldStart, quoteIndex);
+      state = CSV_STREAM_STATE.QUOTE_SEEN;
+      i = quoteIndex + 1;
+      fieldStart = i;
+      continue;
+    }
+
+    const c = text.charCodeAt(i);
+
+    if (state === CSV_STREAM_STATE.QUOTE_SEEN) {
+      state = CSV_STREAM_STATE.UNQUOTED;
+      if (c === 34) {
+        // "" はエスケープされた引用符
+        field += "\"";
+        state = CSV_STREAM_STATE.QUOTED;
+        i++;
+        fieldStart = i;
+        continue;
+      }
+      lastQuoteEnd = field.length;
+    }
+
+    if (c === 44) {
+      row.push(field + text.slice(fieldStart, i));
+      field = "";
+      fieldOpen = false;
+      lastQuoteEnd = -1;
+      fieldStart = i + 1;
+    } else if (c === 34) {
+      field += text.slice(fieldStart, i);
+      fieldOpen = true;
+      if (row.length === 0 && firstQuoteAt === -1) {
+        firstQuoteAt = field.length;
+      }
+      state = CSV_STREAM_STATE.QUOTED;
+      fieldStart = i + 1;
+    } else if (c === 10 || c === 13) {
+      row.push(field + text.slice(fieldStart, i));
+      field = "";
+      fieldOpen = false;
+      tokenizer.row = row;
+      tokenizer.firstQuoteAt = firstQuoteAt;
+      tokenizer.lastQuoteEnd = lastQuoteEnd;
+      utils_endCsvRow_(tokenizer, onRow);
+      firstQuoteAt = -1;
+      lastQuoteEnd = -1;
+      row = tokenizer.row;
+      if (c === 13) {
+        if (i + 1 < len) {
+          if (text.charCodeAt(i + 1) === 10) {
+            i++;
+          }
+        } else {
+          tokenizer.pendingCR = true;
+        }
+      }
+      fieldStart = i + 1;
+    }
+    i++;
+  }
+
+  if (fieldStart < len) {
+    field += text.slice(fieldStart, len);
+    fieldOpen = true;
+  }
+
+  tokenizer.state = state;
+  tokenizer.field = field;
+  tokenizer.fieldOpen = fieldOpen;
+  tokenizer.firstQuoteAt = firstQuoteAt;
+  tokenizer.lastQuoteEnd = lastQuoteEnd;
+  tokenizer.row = row;
+}
+
+/**
+ * 末尾の改行がない最終行を確定させる
+ */
+function utils_endCsvTokenizer(tokenizer, onRow) {
+  if (tokenizer.fieldOpen || tokenizer.row.length > 0) {
+    if (tokenizer.state !== CSV_STREAM_STATE.UNQUOTED) {
+      // 閉じ引用符（または閉じていない引用符）で終わる最終フィールドは末尾の空白を除かない
+      tokenizer.lastQuoteEnd = tokenizer.field.length;
+    }
+    utils_endCsvField_(tokenizer, "");
+    utils_endCsvRow_(tokenizer, onRow);
+  }
+  tokenizer.state = CSV_STREAM_STATE.UNQUOTED;
+  tokenizer.pendingCR = false;
+}
+
+/**
+ * CSVテキスト全体を解析して行の配列を返す
+ * @param {string} csvContent - CSVテキスト
+ * @param {Object} options - utils_createCsvTokenizer と同じ
+ * @returns {string[][]} 行の配列
+ */
+function utils_parseCsv(csvContent, options) {
+  const tokenizer = utils_createCsvTokenizer(options);
+  const rows = [];
+  const onRow = row => rows.push(row);
+
+  utils_feedCsvChunk(tokenizer, csvContent, onRow);
+  utils_endCsvTokenizer(tokenizer, onRow);
+
+  rows.recordCount = tokenizer.recordCount;
+  return rows;
+}
+
+function utils_endCsvField_(tokenizer, tail) {
+  tokenizer.row.push(tokenizer.field + tail);
+  tokenizer.field = "";
+  tokenizer.fieldOpen = false;
+}
+
+function utils_endCsvRow_(tokenizer, onRow) {
+  const row = tokenizer.row;
+  tokenizer.row = [];
+  tokenizer.recordCount++;
+
+  const quoted = tokenizer.firstQuoteAt !== -1;
+  if (tokenizer.trimRecords) {
+    utils_trimCsvRecord_(row, tokenizer.firstQuoteAt, tokenizer.lastQuoteEnd);
+  }
+  tokenizer.firstQuoteAt = -1;
+  tokenizer.lastQuoteEnd = -1;
+
+  if (tokenizer.recordCount <= tokenizer.skipRows) {
+    return;
+  }
+
+  // 空白だけの行は除外する（"" だけの行は空のフィールドを1つ持つ行として残す）
+  if (tokenizer.skipBlankRows && row.length === 1 && !quoted && row[0].trim() === "") {
+    return;
+  }
+
+  tokenizer.rowCount++;
+  onRow(row);
+}
+
+/**
+ * 行の先頭・末尾の引用符外の空白を除く（従来の line.trim() 後に解析した結果と同じ）
+ * @param {string[]} row - 行
+ * @param {number} firstQuoteAt - 先頭フィールドの引用符外の先頭部分の長さ（-1: 引用符なし）
+ * @param {number} lastQuoteEnd - 末尾フィールドで最後の引用符が閉じた位置（-1: 引用符なし）
+ */
+function utils_trimCsvRecord_(row, firstQuoteAt, lastQuoteEnd) {
+  const last = row.length - 1;
+  if (lastQuoteEnd === -1) {
+    row[last] = row[last].trimEnd();
+  } else {
+    row[last] = row[last].slice(0, lastQuoteEnd) + row[last].slice(lastQuoteEnd).trimEnd();
+  }
+
+  const first = row[0];
+  const prefixLength = firstQuoteAt === -1 ? first.length : Math.min(firstQuoteAt, first.length);
+  const prefix = first.slice(0, prefixLength);
+  const trimmedPrefix = prefix.trimStart();
+  if (trimmedPrefix.length !== prefix.length) {
+    row[0] = trimmedPrefix + first.slice(prefixLength);
+  }
+}
@@ -0,0 +1,272 @@
+/**
+ * CSV取込の重複チェック用フィンガープリント
+ * 行ごとに正規化した内容のハッシュを作成し、Setの参照で重複判定する
+ * 永続化モードでは非表示シートにフィンガープリントを保存し、既存行は末尾のチェックサムの照合だけで再利用する
+ */
+
+const FINGERPRINT_STORE_CONFIG = {
+  SHEET_PREFIX: "_fp_",  // 保存用非表示シートの接頭辞（対象シート名を後ろに付与）
+  META_ROW: 1,           // A1: 同期状態（JSON）
+  DATA_START_ROW: 2,     // A2以降: フィンガープリント
+  TAIL_ROWS: 50          // 同期済みの確認に使う末尾の行数
+};
+
+/**
+ * 行のフィンガープリントを作成する
+ * utils_arraysEqual と同じく、列数と各セルの String().trim() が一致する行は同じ値になる
+ * @param {Array} row - 行データ
+ * @returns {string} フィンガープリント
+ */
+function utils_buildRowFingerprint(row) {
+  const normalized = JSON.stringify(row.map(cell => String(cell).trim()));
+  // 数値として解釈されないよう英字で始める
+  return "h" + utils_hashString_(normalized, 0x9e3779b9).toString(36) + "." + utils_hashString_(normalized, 0x85ebca6b).toString(36);
+}
+
+/**
+ * 行データの配列からフィンガープリントのSetを作成する
+ */
+function utils_createFingerprintSet(rows) {
+  const fingerprints = new Set();
+  rows.forEach(row => fingerprints.add(utils_buildRowFingerprint(row)));
+  return fingerprints;
+}
+
+/**
+ * フィンガープリントのSetを使って既存データと重複する行を除外する
+ * @param {Array[]} newData - 新しく取り込む行
+ * @param {Set} fingerprints - 既存行のフィンガープリント
+ * @returns {Array[]} 重複を除いた行
+ */
+function utils_filterByFingerprints(newData, fingerprints) {
+  if (fingerprints.size === 0) {
+    return newData;
+  }
+
+  return newData.filter(newRow => !fingerprints.has(utils_buildRowFingerprint(newRow)));
+}
+
+/**
+ * 既存データのフィンガープリントを取得する
+ * @param {Sheet} sheet - 対象シート
+ * @param {number} startColumn - 比較対象の開始列
+ * @param {Object} options - { persist: true で非表示シートに保存した結果を再利用, untilRow: 比較対象とする最終行 }
+ * @returns {Set} フィンガープリントのSet
+ */
+function utils_getExistingFingerprints(sheet, startColumn, options) {
+  options = options || {};
+  // untilRow: 0（空のシートへの取込開始時）も「比較対象なし」として扱う
+  const hasUntilRow = options.untilRow !== undefined && options.untilRow !== null;
+  const lastRow = hasUntilRow ? Math.min(sheet.getLastRow(), options.untilRow) : sheet.getLastRow();
+
+  if (!options.persist) {
+    const lastColumn = sheet.getLastColumn();
+    if (lastRow < 1 || lastColumn < startColumn) {
+      return new Set();
+    }
+    const rows = sheet.getRange(1, startColumn, lastRow, lastColumn - startColumn + 1).getValues();
+    return new Set(utils_fingerprintNonEmptyRows_(rows));
+  }
+
+  return utils_syncFingerprintStore_(sheet, startColumn, lastRow);
+}
+
+/**
+ * 保存済みフィンガープリントを破棄する（次回取込時に全件再構築される）
+ */
+function utils_resetFingerprintStore(sheet) {
+  const spreadsheet = SpreadsheetApp.getActiveSpreadsheet();
+  const storeSheet = spreadsheet.getSheetByName(FINGERPRINT_STORE_CONFIG.SHEET_PREFIX + sheet.getName());
+
+  if (storeSheet) {
+    storeSheet.clearContents();
+  }
+}
+
+/**
+ * すべての保存済みフィンガープリントを破棄する（メニューから実行）
+ */
+function utils_resetAllFingerprintStores() {
+  const spreadsheet = SpreadsheetApp.getActiveSpreadsheet();
+  const storeSheets = spreadsheet.getSheets().filter(sheet => sheet.getName().indexOf(FINGERPRINT_STORE_CONFIG.SHEET_PREFIX) === 0);
+
+  storeSheets.forEach(storeSheet => storeSheet.clearContents());
+
+  const ui = SpreadsheetApp.getUi();
+  ui.alert("重複チェック情報", storeSheets.length + "シート分の保存済みフィンガープリントを削除しました。次回のCSV取込時に再作成されます。", ui.ButtonSet.OK);
+}
+
+/**
+ * 非表示シートのフィンガープリントを対象シートと同期して返す
+ * 前回の同期位置までの末尾 TAIL_ROWS 行だけを読み、そのチェックサムが保存時と一致すれば
+ * 保存済みのフィンガープリントを再利用して、追加行の分だけハッシュ化して追記する
+ * 列数が変わった・行が減った・末尾の内容が変わった（行削除後の追加など）場合だけ全行を読んで再構築する
+ * 末尾より前の行の編集は検出しないため、その場合はメニューの「重複チェック情報をリセット」で作り直す
+ */
+function utils_syncFingerprintStore_(sheet, startColumn, lastRow) {
+  const storeSheet = utils_getFingerprintStoreSheet_(sheet);
+  const lastColumn = sheet.getLastColumn();
+
+  if (lastRow < 1 || lastColumn < startColumn) {
+    utils_writeFingerprintStore_(storeSheet, [], {
+      startColumn: startColumn,
+      lastRow: 0,
+      lastColumn: lastColumn,
+      count: 0,
+      tailChecksum: utils_checksumRows_([], 0, 0)
+    }, true);
+    return new Set();
+  }
+
+  const meta = utils_readFingerprintMeta_(storeSheet);
+  const numColumns = lastColumn - startColumn + 1;
+  const reusable = meta &&
+    meta.startColumn === startColumn &&
+    meta.lastColumn === lastColumn &&
+    meta.lastRow <= lastRow &&
+    typeof meta.tailChecksum === "string";
+
+  if (reusable) {
+    // 同期済み範囲の末尾と追加行だけを1回で読む
+    const firstRow = Math.max(1, meta.lastRow - FINGERPRINT_STORE_CONFIG.TAIL_ROWS + 1);
+    const rows = sheet.getRange(firstRow, startColumn, lastRow - firstRow + 1, numColumns).getValues();
+    const syncedLength = meta.lastRow - firstRow + 1;
+
+    if (utils_checksumRows_(rows, 0, syncedLength) === meta.tailChecksum) {
+      const stored = meta.count > 0
+        ? storeSheet.getRange(FINGERPRINT_STORE_CONFIG.DATA_START_ROW, 1, meta.count, 1).getValues().map(row => String(row[0]))
+        : [];
+
+      if (meta.lastRow === lastRow) {
+        return new Set(stored);
+      }
+
+      // 前回同期以降に追加された行だけをハッシュ化する
+      const deltaRows = rows.slice(syncedLength);
+      const deltaFingerprints = utils_fingerprintNonEmptyRows_(deltaRows);
+      console.log(`フィンガープリント差分同期: ${sheet.getName()} ${deltaRows.length}行を追加`);
+
+      utils_writeFingerprintStore_(storeSheet, deltaFingerprints, {
+        startColumn: startColumn,
+        lastRow: lastRow,
+        lastColumn: lastColumn,
+        count: meta.count + deltaFingerprints.length,
+        tailChecksum: utils_tailChecksum_(rows, firstRow, lastRow)
+      }, false, meta.count);
+
+      return new Set(stored.concat(deltaFingerprints));
+    }
+  }
+
+  console.log(`フィンガープリントを再構築します: ${sheet.getName()}`);
+  const rows = sheet.getRange(1, startColumn, lastRow, numColumns).getValues();
+  const fingerprints = utils_fingerprintNonEmptyRows_(rows);
+  utils_writeFingerprintStore_(storeSheet, fingerprints, {
+    startColumn: startColumn,
+    lastRow: lastRow,
+    lastColumn: lastColumn,
+    count: fingerprints.length,
+    tailChecksum: utils_tailChecksum_(rows, 1, lastRow)
+  }, true);
+  return new Set(fingerprints);
+}
+
+/**
+ * 同期位置 lastRow までの末尾 TAIL_ROWS 行のチェックサムを計算する
+ * @param {Array[]} rows - firstRow 行目から読み込んだ行データ
+ * @param {number} firstRow - rows[0] の行番号
+ * @param {number} lastRow - 同期位置（最終行）
+ */
+function utils_tailChecksum_(rows, firstRow, lastRow) {
+  const tailStart = Math.max(firstRow, lastRow - FINGERPRINT_STORE_CONFIG.TAIL_ROWS + 1);
+  return utils_checksumRows_(rows, tailStart - firstRow, lastRow - firstRow + 1);
+}
+
+/**
+ * 行範囲の内容のチェックサムを計算する（行の順序と各セルの String().trim() が一致すれば同じ値）
+ * @param {Array[]} rows - 行データ
+ * @param {number} start - 開始位置（0始まり）
+ * @param {number} end - 終了位置（この位置は含まない）
+ * @returns {string} チェックサム
+ */
+function utils_checksumRows_(rows, start, end) {
+  let h1 = 0x2545f491;
+  let h2 = 0x68e31da4;
+
+  for (let i = start; i < end; i++) {
+    const rowHash = utils_hashString_(rows[i].map(cell => String(cell).trim()).join("\u0001"), 0x27d4eb2f);
+    h1 = Math.imul(h1 ^ (rowHash >>> 0), 2654435761);
+    h2 = Math.imul(h2 ^ Math.floor(rowHash / 4294967296), 1597334677);
+  }
+
+  return (h1 >>> 0).toString(36) + "." + (h2 >>> 0).toString(36);
+}
+
+function utils_fingerprintNonEmptyRows_(rows) {
+  return rows
+    .filter(row => row.some(cell => cell !== ""))
+    .map(row => utils_buildRowFingerprint(row));
+}
+
+function utils_getFingerprintStoreSheet_(sheet) {
+  const spreadsheet = SpreadsheetApp.getActiveSpreadsheet();
+  const storeName = FINGERPRINT_STORE_CONFIG.SHEET_PREFIX + sheet.getName();
+  let storeSheet = spreadsheet.getSheetByName(storeName);
+
+  if (!storeSheet) {
+    // insertSheetでアクティブシートが切り替わるため元に戻す
+    const activeSheet = spreadsheet.getActiveSheet();
+    storeSheet = spreadsheet.insertSheet(storeName);
+    storeSheet.hideSheet();
+    if (activeSheet) {
+      activeSheet.activate();
+    }
+  }
+
+  return storeSheet;
+}
+
+function utils_readFingerprintMeta_(storeSheet) {
+  const metaText = storeSheet.getRange(FINGERPRINT_STORE_CONFIG.META_ROW, 1).getValue();
+  if (!metaText) {
+    return null;
+  }
+
+  try {
+    return JSON.parse(metaText);
+  } catch (e) {
+    return null;
+  }
+}
+
+function utils_writeFingerprintStore_(storeSheet, fingerprints, meta, replace, offset) {
+  if (replace) {
+    storeSheet.clearContents();
+  }
+
+  if (fingerprints.length > 0) {
+    const startRow = FINGERPRINT_STORE_CONFIG.DATA_START_ROW + (offset || 0);
+    storeSheet.getRange(startRow, 1, fingerprints.length, 1).setValues(fingerprints.map(fp => [fp]));
+  }
+
+  storeSheet.getRange(FINGERPRINT_STORE_CONFIG.META_ROW, 1).setValue(JSON.stringify(meta));
+}
+
+/**
+ * 文字列の53bitハッシュ（cyrb53）
+ */
+function utils_hashString_(str, seed) {
+  let h1 = 0xdeadbeef ^ seed;
+  let h2 = 0x41c6ce57 ^ seed;
+
+  for (let i = 0; i < str.length; i++) {
+    const ch = str.charCodeAt(i);
+    h1 = Math.imul(h1 ^ ch, 2654435761);
+    h2 = Math.imul(h2 ^ ch, 1597334677);
+  }
+
+  h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+  h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+
+  return 4294967296 * (2097151 & h2) + (h1 >>> 0);
+}
@@ -16,41 +16,21 @@ function utils_calculateProductStatus(rowData) {
 
 function utils_searchProductByYColumn(productData, searchValue, usedProductRows, dataStartRow) {
   usedProductRows = usedProductRows || new Set();
-  dataStartRow = dataStartRow || 3;
-  const yColumnIndex = 24; // Y列（0始まり）
-
-  for (let i = 0; i < productData.length; i++) {
-    const row = i + dataStartRow;
-    const yColumnValue = productData[i][yColumnIndex];
-
-    if (usedProductRows.has(row)) {
-      continue;
-    }
-
-    const status = utils_calculateProductStatus(productData[i]);
+  // 配列データはインデックス化して検索する（utils_buildProductIndex で作成したインデックスもそのまま使える）
+  const productIndex = utils_ensureProductIndex(productData, dataStartRow || 3);
 
-    if (status === PRODUCT_STATUS.SOLD) {
-      continue;
-    }
-
-    if (String(yColumnValue).trim() === String(searchValue).trim()) {
-      return row;
-    }
-  }
-
-  return null;
+  return utils_findProductRow(productIndex, searchValue, usedProductRows);
 }
 
 function utils_searchMultipleProducts(productData, searchValue, quantity, usedProductRows, dataStartRow) {
   usedProductRows = usedProductRows || new Set();
-  dataStartRow = dataStartRow || 3;
+  const productIndex = utils_ensureProductIndex(productData, dataStartRow || 3);
   const foundRows = [];
 
   for (let q = 0; q < quantity; q++) {
-    const row = utils_searchProductByYColumn(productData, searchValue, usedProductRows, dataStartRow);
+    const row = utils_consumeProductRow(productIndex, searchValue, usedProductRows);
     if (row) {
       foundRows.push(row);
-      usedProductRows.add(row);
     }
   }
 
@@ -74,9 +54,11 @@ function utils_batchUpdateSheetColumn(sheet, updates, columnIndex) {
     return;
   }
 
+  const buffer = utils_createWriteBuffer(sheet);
   updates.forEach(function(update) {
-    sheet.getRange(update.row, columnIndex).setValue(update.value);
+    utils_bufferSetValue(buffer, update.row, columnIndex, update.value);
   });
+  utils_flushWriteBuffer(buffer);
 }
 
 function utils_batchUpdateMultipleColumns(sheet, rowUpdates) {
@@ -84,14 +66,16 @@ function utils_batchUpdateMultipleColumns(sheet, rowUpdates) {
     return;
   }
 
+  const buffer = utils_createWriteBuffer(sheet);
   rowUpdates.forEach(function(update) {
     const columns = update.columns;
     for (const colIndex in columns) {
       if (columns.hasOwnProperty(colIndex)) {
-        sheet.getRange(update.row, parseInt(colIndex)).setValue(columns[colIndex]);
+        utils_bufferSetValue(buffer, update.row, parseInt(colIndex), columns[colIndex]);
       }
     }
   });
+  utils_flushWriteBuffer(buffer);
 }
 
 function utils_setHyperlink(sheet, row, column, url, displayText) {
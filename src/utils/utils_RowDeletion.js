@@ -0,0 +1,44 @@
+/**
+ * 行削除プランナー
+ * 削除対象の行番号を連続する範囲にまとめ、後ろの範囲から deleteRows(start, count) で削除する
+ * deleteRows は数式の参照・背景色・入力規則もシートと同じように移動するため、内容を書き戻す方式は使わない
+ */
+
+/**
+ * 削除対象の行番号を連続する範囲にまとめる
+ * @param {Iterable<number>} rowNumbers - 削除する行番号（重複・順不同可）
+ * @returns {Object} { runs: [{ start, count }]（後ろの範囲から順）, rowCount: 削除行数 }
+ */
+function utils_planRowDeletion(rowNumbers) {
+  const sorted = Array.from(new Set(rowNumbers)).sort((a, b) => a - b);
+  const runs = [];
+
+  sorted.forEach(row => {
+    const last = runs[runs.length - 1];
+    if (last && last.start + last.count === row) {
+      last.count++;
+    } else {
+      runs.push({ start: row, count: 1 });
+    }
+  });
+
+  // 前の行番号がずれないよう、後ろの範囲から削除する
+  runs.reverse();
+  return { runs: runs, rowCount: sorted.length };
+}
+
+/**
+ * 行をまとめて削除する
+ * @param {Sheet} sheet - 対象シート
+ * @param {Iterable<number>} rowNumbers - 削除する行番号
+ * @returns {Object} 統計（削除行数・範囲数・シートAPI呼び出し回数）
+ */
+function utils_deleteRowsPlanned(sheet, rowNumbers) {
+  const plan = utils_planRowDeletion(rowNumbers);
+
+  plan.runs.forEach(run => {
+    sheet.deleteRows(run.start, run.count);
+  });
+
+  return { rows: plan.rowCount, runs: plan.runs.length, apiCalls: plan.runs.length };
+}
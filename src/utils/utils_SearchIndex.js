@@ -0,0 +1,205 @@
+/**
+ * 検索インデックス
+ * 商品管理シートのSKU（Y列）と売上シートの注文番号などを実行ごとに一度だけ索引化し、
+ * 売上1行ごとの全件走査を O(1) の参照に置き換える
+ */
+
+const SEARCH_INDEX_CONFIG = {
+  PRODUCT_KEY_COLUMN_INDEX: 24, // 商品管理シート Y列（0始まり）
+  PRODUCT_DATA_START_ROW: 3,
+  ORDER_NUMBER_COLUMN_INDEX: 8, // Amazon売上シート I列（0始まり）
+  SALES_DATA_START_ROW: 3
+};
+
+/**
+ * 検索キーを正規化する（従来の String().trim() 比較と同じ意味）
+ */
+function utils_normalizeSearchKey(value) {
+  return String(value).trim();
+}
+
+/**
+ * 商品管理シートのデータからSKUインデックスを作成する
+ * 未売却行のキューと、ステータスを問わない全行リストをキーごとに保持する
+ * @param {Array[]} productData - 商品管理シートのデータ（データ開始行から）
+ * @param {number} dataStartRow - データ開始行
+ * @returns {Object} 商品インデックス
+ */
+function utils_buildProductIndex(productData, dataStartRow) {
+  dataStartRow = dataStartRow || SEARCH_INDEX_CONFIG.PRODUCT_DATA_START_ROW;
+  const keyIndex = SEARCH_INDEX_CONFIG.PRODUCT_KEY_COLUMN_INDEX;
+  const available = new Map();
+  const all = new Map();
+
+  for (let i = 0; i < productData.length; i++) {
+    const row = i + dataStartRow;
+    const rawValue = productData[i][keyIndex];
+    const key = utils_normalizeSearchKey(rawValue);
+
+    if (rawValue) {
+      if (!all.has(key)) {
+        all.set(key, []);
+      }
+      all.get(key).push(row);
+    }
+
+    if (utils_calculateProductStatus(productData[i]) === PRODUCT_STATUS.SOLD) {
+      continue;
+    }
+
+    if (!available.has(key)) {
+      available.set(key, []);
+    }
+    available.get(key).push(row);
+  }
+
+  return {
+    isProductIndex: true,
+    dataStartRow: dataStartRow,
+    available: available,
+    all: all,
+    cursors: new WeakMap() // 使用済み行のSet → (キー → 読み飛ばし済みの位置)
+  };
+}
+
+/**
+ * 配列データが渡された場合はインデックスを作成し、インデックスの場合はそのまま返す
+ */
+function utils_ensureProductIndex(productDataOrIndex, dataStartRow) {
+  if (productDataOrIndex && productDataOrIndex.isProductIndex) {
+    return productDataOrIndex;
+  }
+  return utils_buildProductIndex(productDataOrIndex || [], dataStartRow);
+}
+
+/**
+ * 未使用かつ未売却の最初の行を取得する（使用済みにはしない）
+ * 読み飛ばした位置は usedProductRows ごとに記録するため、別のSetや新しいSetで検索しても結果は変わらない
+ * @param {Object} productIndex - 商品インデックス
+ * @param {*} searchValue - 検索値
+ * @param {Set} usedProductRows - 使用済み行番号（行の追加のみ。削除した場合は新しいSetを使う）
+ * @returns {number|null} 行番号
+ */
+function utils_findProductRow(productIndex, searchValue, usedProductRows) {
+  const key = utils_normalizeSearchKey(searchValue);
+  const rows = productIndex.available.get(key);
+  if (!rows) {
+    return null;
+  }
+
+  if (!usedProductRows) {
+    return rows[0];
+  }
+
+  let cursors = productIndex.cursors.get(usedProductRows);
+  if (!cursors) {
+    cursors = new Map();
+    productIndex.cursors.set(usedProductRows, cursors);
+  }
+
+  // 同じSetでは使用済み行が未使用に戻らないため、読み飛ばした位置から再開する
+  let head = cursors.get(key) || 0;
+  while (head < rows.length && usedProductRows.has(rows[head])) {
+    head++;
+  }
+  cursors.set(key, head);
+
+  return head < rows.length ? rows[head] : null;
+}
+
+/**
+ * 未使用かつ未売却の最初の行を取得し、使用済みとして記録する
+ */
+function utils_consumeProductRow(productIndex, searchValue, usedProductRows) {
+  const row = utils_findProductRow(productIndex, searchValue, usedProductRows);
+  if (row) {
+    usedProductRows.add(row);
+  }
+  return row;
+}
+
+/**
+ * ステータスを問わず、検索値に一致する全行を取得する（空欄のセルは対象外）
+ */
+function utils_getProductRowsByKey(productIndex, searchValue) {
+  const rows = productIndex.all.get(utils_normalizeSearchKey(searchValue));
+  return rows ? rows.slice() : [];
+}
+
+/**
+ * 売上シートのデータから注文番号インデックスを作成する
+ * 自分自身を除外した検索に対応するため、キーごとに先頭2行を保持する
+ * @param {Array[]} salesData - 売上シートのデータ（データ開始行から）
+ * @param {number} dataStartRow - データ開始行
+ * @param {number} columnIndex - 注文番号の列（0始まり）
+ * @returns {Object} 注文番号インデックス
+ */
+function utils_buildOrderNumberIndex(salesData, dataStartRow, columnIndex) {
+  dataStartRow = dataStartRow || SEARCH_INDEX_CONFIG.SALES_DATA_START_ROW;
+  columnIndex = columnIndex === undefined ? SEARCH_INDEX_CONFIG.ORDER_NUMBER_COLUMN_INDEX : columnIndex;
+  const firstRows = new Map();
+
+  for (let i = 0; i < salesData.length; i++) {
+    const key = utils_normalizeSearchKey(salesData[i][columnIndex]);
+    const rows = firstRows.get(key);
+
+    if (!rows) {
+      firstRows.set(key, [i + dataStartRow]);
+    } else if (rows.length < 2) {
+      rows.push(i + dataStartRow);
+    }
+  }
+
+  return { isOrderNumberIndex: true, firstRows: firstRows };
+}
+
+/**
+ * 指定列の値ごとに、一致する全行番号を保持するインデックスを作成する（空欄のセルは対象外）
+ * @param {Array[]} data - シートのデータ（データ開始行から）
+ * @param {number} dataStartRow - データ開始行
+ * @param {number} columnIndex - 対象列（0始まり）
+ * @returns {Map} 正規化した値 → 行番号の配列（昇順）
+ */
+function utils_buildColumnIndex(data, dataStartRow, columnIndex) {
+  const index = new Map();
+
+  for (let i = 0; i < data.length; i++) {
+    const value = data[i][columnIndex];
+    if (!value) {
+      continue;
+    }
+
+    const key = utils_normalizeSearchKey(value);
+    const rows = index.get(key);
+    if (rows) {
+      rows.push(i + dataStartRow);
+    } else {
+      index.set(key, [i + dataStartRow]);
+    }
+  }
+
+  return index;
+}
+
+/**
+ * 注文番号に一致する最初の行を取得する
+ * @param {Object} orderIndex - 注文番号インデックス
+ * @param {*} orderNumber - 注文番号
+ * @param {number} excludeRow - 除外する行番号（自分自身）
+ * @returns {number|null} 行番号
+ */
+function utils_findOrderNumberRow(orderIndex, orderNumber, excludeRow) {
+  const rows = orderIndex.firstRows.get(utils_normalizeSearchKey(orderNumber));
+  if (!rows) {
+    return null;
+  }
+
+  for (const row of rows) {
+    if (excludeRow && row === excludeRow) {
+      continue;
+    }
+    return row;
+  }
+
+  return null;
+}
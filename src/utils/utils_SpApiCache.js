@@ -0,0 +1,316 @@
+/**
+ * SP-APIキャッシュ
+ * LWAアクセストークン・ASIN→商品タイプ・自動価格設定ルールを実行をまたいで再利用する
+ * 実行内のメモリ → CacheService → PropertiesService（永続化する名前空間のみ）の順に参照し、
+ * 名前空間ごとの最終使用時刻インデックスを使って、件数上限を超えたら最も古く使われたエントリから削除する
+ */
+
+const SPAPI_CACHE_CONFIG = {
+  KEY_PREFIX: "SPAPI_CACHE_",
+  STATS_PROPERTY: "SPAPI_CACHE_STATS",
+  MAX_CACHE_SERVICE_TTL_SECONDS: 21600,  // CacheServiceの保持期間の上限（6時間）
+  MAX_CACHE_VALUE_LENGTH: 100000,        // CacheService 1件の上限（100KB）
+  MAX_PROPERTY_VALUE_LENGTH: 8000,       // プロパティ1件の上限（9KB）に余裕を持たせる
+  TOUCH_INTERVAL_SECONDS: 3600,          // 参照時に最終使用時刻を更新する間隔
+  TOKEN_EXPIRY_MARGIN_SECONDS: 600,      // 1回の実行（最大6分）の途中で期限切れにならないよう早めに再取得する
+  NAMESPACES: {
+    // ttlSeconds: 既定の保持期間, maxEntries: 件数上限, persist: PropertiesServiceにも保存するか
+    lwaToken: { ttlSeconds: 3300, maxEntries: 5, persist: false },
+    productType: { ttlSeconds: 30 * 24 * 3600, maxEntries: 200, persist: true },
+    pricingRules: { ttlSeconds: 24 * 3600, maxEntries: 10, persist: true }
+  }
+};
+
+// 実行中のみ有効な状態（GASでは実行ごとに初期化される）
+const SPAPI_CACHE_STATE = {
+  memory: new Map(),
+  indexes: {},
+  stats: {}
+};
+
+/**
+ * キャッシュから値を取得する
+ * @param {string} namespace - 名前空間（SPAPI_CACHE_CONFIG.NAMESPACES のキー）
+ * @param {string} key - キー
+ * @returns {*} キャッシュされた値（ない場合・期限切れの場合は null）
+ */
+function utils_cacheGet(namespace, key) {
+  const config = utils_getSpApiCacheNamespace_(namespace);
+  const storageKey = utils_buildSpApiCacheKey_(namespace, key);
+  const counter = utils_getSpApiCacheCounter_(namespace);
+  const now = Math.floor(Date.now() / 1000);
+
+  const memoryEntry = SPAPI_CACHE_STATE.memory.get(storageKey);
+  if (memoryEntry && memoryEntry.e > now) {
+    counter.hits++;
+    counter.memoryHits++;
+    return memoryEntry.v;
+  }
+
+  let entry = utils_parseSpApiCacheEntry_(CacheService.getScriptCache().get(storageKey));
+  if (!entry && config.persist) {
+    entry = utils_parseSpApiCacheEntry_(PropertiesService.getScriptProperties().getProperty(storageKey));
+    if (entry && entry.e > now) {
+      utils_putCacheServiceEntry_(storageKey, entry, now);
+    }
+  }
+
+  if (!entry || entry.e <= now) {
+    counter.misses++;
+    return null;
+  }
+
+  SPAPI_CACHE_STATE.memory.set(storageKey, entry);
+  utils_touchSpApiCacheIndex_(namespace, key, now);
+  counter.hits++;
+  return entry.v;
+}
+
+/**
+ * キャッシュに値を保存する
+ * 件数上限を超えた場合は、最終使用時刻が最も古いエントリから削除する
+ * @param {string} namespace - 名前空間
+ * @param {string} key - キー
+ * @param {*} value - 保存する値（JSONに変換できる値）
+ * @param {number} ttlSeconds - 保持期間（省略時は名前空間の既定値）
+ */
+function utils_cachePut(namespace, key, value, ttlSeconds) {
+  const config = utils_getSpApiCacheNamespace_(namespace);
+  const storageKey = utils_buildSpApiCacheKey_(namespace, key);
+  const now = Math.floor(Date.now() / 1000);
+  const entry = { v: value, e: now + Math.max(1, Math.floor(ttlSeconds || config.ttlSeconds)) };
+
+  SPAPI_CACHE_STATE.memory.set(storageKey, entry);
+  utils_putCacheServiceEntry_(storageKey, entry, now);
+
+  if (config.persist) {
+    const json = JSON.stringify(entry);
+    if (json.length <= SPAPI_CACHE_CONFIG.MAX_PROPERTY_VALUE_LENGTH) {
+      PropertiesService.getScriptProperties().setProperty(storageKey, json);
+    }
+  }
+
+  const index = utils_getSpApiCacheIndex_(namespace);
+  index[key] = now;
+  utils_evictSpApiCacheEntries_(namespace, index, config.maxEntries);
+  utils_saveSpApiCacheIndex_(namespace, index);
+}
+
+/**
+ * キャッシュから取得し、ない場合は loader で取得した値を保存して返す
+ * @param {string} namespace - 名前空間
+ * @param {string} key - キー
+ * @param {Function} loader - 値を取得する関数（戻り値を保存する）
+ * @param {number} ttlSeconds - 保持期間（省略時は名前空間の既定値）
+ * @returns {*} 値
+ */
+function utils_cacheGetOrLoad(namespace, key, loader, ttlSeconds) {
+  const cached = utils_cacheGet(namespace, key);
+  if (cached !== null) {
+    return cached;
+  }
+
+  const value = loader();
+  if (value !== null && value !== undefined) {
+    utils_cachePut(namespace, key, value, ttlSeconds);
+  }
+  return value;
+}
+
+/**
+ * キャッシュを無効化する
+ * @param {string} namespace - 名前空間（省略時はすべての名前空間）
+ * @param {string} key - キー（省略時は名前空間内のすべてのエントリ）
+ * @returns {number} 削除したエントリ数
+ */
+function utils_invalidateSpApiCache(namespace, key) {
+  if (!namespace) {
+    return Object.keys(SPAPI_CACHE_CONFIG.NAMESPACES)
+      .reduce((count, name) => count + utils_invalidateSpApiCache(name), 0);
+  }
+
+  const index = utils_getSpApiCacheIndex_(namespace);
+  const keys = key !== undefined ? [key] : Object.keys(index);
+
+  keys.forEach(k => {
+    utils_removeSpApiCacheEntry_(namespace, k);
+    delete index[k];
+  });
+
+  utils_saveSpApiCacheIndex_(namespace, index);
+  console.log(`SP-APIキャッシュを無効化しました: ${namespace} ${keys.length}件`);
+  return keys.length;
+}
+
+/**
+ * ヒット・ミス件数を取得する
+ * @returns {Object} { execution: この実行の件数, total: 記録済みの累計（この実行分を含む） }
+ */
+function utils_getSpApiCacheStats() {
+  const execution = JSON.parse(JSON.stringify(SPAPI_CACHE_STATE.stats));
+  const total = utils_readSpApiCacheTotals_();
+
+  Object.keys(execution).forEach(namespace => {
+    const sum = total[namespace] || { hits: 0, misses: 0, memoryHits: 0, evictions: 0 };
+    Object.keys(execution[namespace]).forEach(name => {
+      sum[name] = (sum[name] || 0) + execution[namespace][name];
+    });
+    total[namespace] = sum;
+  });
+
+  return { execution: execution, total: total };
+}
+
+/**
+ * この実行のヒット・ミス件数をログに出力し、累計に加算する
+ */
+function utils_logSpApiCacheStats() {
+  const stats = utils_getSpApiCacheStats();
+
+  Object.keys(stats.execution).forEach(namespace => {
+    const c = stats.execution[namespace];
+    console.log(`SP-APIキャッシュ ${namespace}: ヒット ${c.hits}（メモリ ${c.memoryHits}）, ミス ${c.misses}, 削除 ${c.evictions}`);
+  });
+
+  PropertiesService.getScriptProperties().setProperty(SPAPI_CACHE_CONFIG.STATS_PROPERTY, JSON.stringify(stats.total));
+  SPAPI_CACHE_STATE.stats = {};
+}
+
+/**
+ * メニューから呼び出され、累計のヒット・ミス件数を表示してすべてのキャッシュを無効化する
+ */
+function utils_clearSpApiCache() {
+  const total = utils_getSpApiCacheStats().total;
+  const lines = Object.keys(total).map(namespace => {
+    const c = total[namespace];
+    return `${namespace}: ヒット ${c.hits} / ミス ${c.misses}`;
+  });
+
+  const count = utils_invalidateSpApiCache();
+
+  const ui = SpreadsheetApp.getUi();
+  ui.alert("SP-APIキャッシュ", (lines.length > 0 ? "【累計】\n" + lines.join("\n") + "\n\n" : "") + count + "件のキャッシュを削除しました。", ui.ButtonSet.OK);
+}
+
+/**
+ * LWAアクセストークンのキャッシュキーを作成する（認証情報そのものはキーに含めない）
+ */
+function utils_buildLwaTokenCacheKey(tokenEndpoint, clientId, refreshToken) {
+  return utils_hashString_(tokenEndpoint + "\n" + clientId + "\n" + refreshToken, 0x2545f491).toString(36);
+}
+
+/**
+ * LWAトークン応答の expires_in からキャッシュの保持期間を計算する
+ */
+function utils_getLwaTokenTtl(expiresIn) {
+  const seconds = parseInt(expiresIn, 10) || 3600;
+  return Math.max(60, seconds - SPAPI_CACHE_CONFIG.TOKEN_EXPIRY_MARGIN_SECONDS);
+}
+
+function utils_getSpApiCacheNamespace_(namespace) {
+  const config = SPAPI_CACHE_CONFIG.NAMESPACES[namespace];
+  if (!config) {
+    throw new Error("未定義のキャッシュ名前空間です: " + namespace);
+  }
+  return config;
+}
+
+function utils_buildSpApiCacheKey_(namespace, key) {
+  const raw = SPAPI_CACHE_CONFIG.KEY_PREFIX + namespace + ":" + key;
+  // CacheServiceのキーは250文字まで
+  return raw.length <= 200 ? raw : SPAPI_CACHE_CONFIG.KEY_PREFIX + namespace + ":#" + utils_hashString_(raw, 0).toString(36);
+}
+
+function utils_getSpApiCacheCounter_(namespace) {
+  if (!SPAPI_CACHE_STATE.stats[namespace]) {
+    SPAPI_CACHE_STATE.stats[namespace] = { hits: 0, misses: 0, memoryHits: 0, evictions: 0 };
+  }
+  return SPAPI_CACHE_STATE.stats[namespace];
+}
+
+function utils_parseSpApiCacheEntry_(json) {
+  if (!json) {
+    return null;
+  }
+
+  try {
+    return JSON.parse(json);
+  } catch (e) {
+    return null;
+  }
+}
+
+function utils_putCacheServiceEntry_(storageKey, entry, now) {
+  const json = JSON.stringify(entry);
+  if (json.length > SPAPI_CACHE_CONFIG.MAX_CACHE_VALUE_LENGTH) {
+    return;
+  }
+
+  const ttl = Math.min(SPAPI_CACHE_CONFIG.MAX_CACHE_SERVICE_TTL_SECONDS, entry.e - now);
+  if (ttl > 0) {
+    CacheService.getScriptCache().put(storageKey, json, ttl);
+  }
+}
+
+function utils_removeSpApiCacheEntry_(namespace, key) {
+  const storageKey = utils_buildSpApiCacheKey_(namespace, key);
+  SPAPI_CACHE_STATE.memory.delete(storageKey);
+  CacheService.getScriptCache().remove(storageKey);
+  if (utils_getSpApiCacheNamespace_(namespace).persist) {
+    PropertiesService.getScriptProperties().deleteProperty(storageKey);
+  }
+}
+
+function utils_getSpApiCacheIndex_(namespace) {
+  if (!SPAPI_CACHE_STATE.indexes[namespace]) {
+    const json = PropertiesService.getScriptProperties().getProperty(SPAPI_CACHE_CONFIG.KEY_PREFIX + namespace + "__index");
+    SPAPI_CACHE_STATE.indexes[namespace] = utils_parseSpApiCacheEntry_(json) || {};
+  }
+  return SPAPI_CACHE_STATE.indexes[namespace];
+}
+
+function utils_saveSpApiCacheIndex_(namespace, index) {
+  const props = PropertiesService.getScriptProperties();
+  const indexKey = SPAPI_CACHE_CONFIG.KEY_PREFIX + namespace + "__index";
+
+  if (Object.keys(index).length === 0) {
+    props.deleteProperty(indexKey);
+  } else {
+    props.setProperty(indexKey, JSON.stringify(index));
+  }
+}
+
+/**
+ * 参照したエントリの最終使用時刻を更新する（書き込み回数を抑えるため一定間隔ごと）
+ */
+function utils_touchSpApiCacheIndex_(namespace, key, now) {
+  const index = utils_getSpApiCacheIndex_(namespace);
+  if (index[key] && now - index[key] < SPAPI_CACHE_CONFIG.TOUCH_INTERVAL_SECONDS) {
+    return;
+  }
+
+  index[key] = now;
+  utils_saveSpApiCacheIndex_(namespace, index);
+}
+
+function utils_evictSpApiCacheEntries_(namespace, index, maxEntries) {
+  const keys = Object.keys(index);
+  if (keys.length <= maxEntries) {
+    return;
+  }
+
+  keys.sort((a, b) => index[a] - index[b]);
+  const evicted = keys.slice(0, keys.length - maxEntries);
+
+  evicted.forEach(key => {
+    utils_removeSpApiCacheEntry_(namespace, key);
+    delete index[key];
+  });
+
+  utils_getSpApiCacheCounter_(namespace).evictions += evicted.length;
+}
+
+function utils_readSpApiCacheTotals_() {
+  const json = PropertiesService.getScriptProperties().getProperty(SPAPI_CACHE_CONFIG.STATS_PROPERTY);
+  return utils_parseSpApiCacheEntry_(json) || {};
+}
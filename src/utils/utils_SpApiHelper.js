@@ -9,6 +9,13 @@ function utils_getSpApiAccessToken() {
     throw new Error("LWA認証情報がScript Propertiesに設定されていません。\nLWA_CLIENT_ID, LWA_CLIENT_SECRET, LWA_REFRESH_TOKENを確認してください。");
   }
 
+  // 有効期限内のトークンがあれば再利用する
+  const cacheKey = utils_buildLwaTokenCacheKey(tokenEndpoint, clientId, refreshToken);
+  const cachedToken = utils_cacheGet("lwaToken", cacheKey);
+  if (cachedToken) {
+    return cachedToken;
+  }
+
   const payload = {
     grant_type: "refresh_token",
     refresh_token: refreshToken,
@@ -39,6 +46,8 @@ function utils_getSpApiAccessToken() {
     throw new Error("アクセストークンがレスポンスに含まれていません");
   }
 
+  utils_cachePut("lwaToken", cacheKey, tokenData.access_token, utils_getLwaTokenTtl(tokenData.expires_in));
+
   console.log("アクセストークンを取得しました");
   return tokenData.access_token;
 }
@@ -98,36 +107,28 @@ function utils_makeSpApiRequest(url, method, body, accessToken, options) {
   }
 
   const response = UrlFetchApp.fetch(url, fetchOptions);
-  const responseCode = response.getResponseCode();
-  const responseBody = response.getContentText();
-
-  return {
-    code: responseCode,
-    body: responseBody,
-    json: function() {
-      try {
-        return JSON.parse(responseBody);
-      } catch (e) {
-        return null;
-      }
-    }
-  };
+  return utils_wrapSpApiResponse_(response);
 }
 
 function utils_makeSpApiRequestWithRetry(url, method, body, accessToken, options) {
   options = options || {};
   const maxRetries = options.maxRetries || 3;
-  const retryDelay = options.retryDelay || 5000;
 
   for (let attempt = 1; attempt <= maxRetries; attempt++) {
     const response = utils_makeSpApiRequest(url, method, body, accessToken, options);
 
-    if (response.code === 429) {
-      console.log("レート制限に達しました。" + (retryDelay / 1000) + "秒待機します... (試行 " + attempt + "/" + maxRetries + ")");
-      if (attempt < maxRetries) {
-        Utilities.sleep(retryDelay);
-        continue;
-      }
+    if (SPAPI_RETRY_CONFIG.RETRYABLE_CODES.indexOf(response.code) !== -1 && attempt < maxRetries) {
+      // x-amzn-RateLimit-Limit を考慮した指数バックオフ（retryDelay は初回の待機時間）
+      const rateLimit = utils_getHeaderValue_(response.headers, SPAPI_RETRY_CONFIG.RATE_LIMIT_HEADER);
+      const delay = utils_calculateSpApiBackoff(attempt, rateLimit, { baseDelay: options.retryDelay });
+      console.log("HTTP " + response.code + " のため" + (delay / 1000) + "秒待機します... (試行 " + attempt + "/" + maxRetries + ")");
+      Utilities.sleep(delay);
+      continue;
+    }
+
+    // 失効したトークンをキャッシュから使い続けないよう、認証エラーでは破棄する
+    if (response.code === 401 || response.code === 403) {
+      utils_invalidateSpApiCache("lwaToken");
     }
 
     return response;
@@ -136,6 +137,24 @@ function utils_makeSpApiRequestWithRetry(url, method, body, accessToken, options
   throw new Error("最大リトライ回数を超えました");
 }
 
+function utils_wrapSpApiResponse_(response) {
+  const responseCode = response.getResponseCode();
+  const responseBody = response.getContentText();
+
+  return {
+    code: responseCode,
+    body: responseBody,
+    headers: response.getHeaders ? response.getHeaders() : {},
+    json: function() {
+      try {
+        return JSON.parse(responseBody);
+      } catch (e) {
+        return null;
+      }
+    }
+  };
+}
+
 function utils_handleSpApiError(response, operationName) {
   const code = response.code;
   const body = response.body;
@@ -0,0 +1,340 @@
+/**
+ * SP-APIリクエストスケジューラー
+ * オペレーションごとのトークンバケットでレート制限を守りながら、送信可能なリクエストを
+ * UrlFetchApp.fetchAll でまとめて並列送信する
+ * 429・5xxは x-amzn-RateLimit-Limit を考慮した指数バックオフ（ジッター付き）で再送する
+ * 401・403はLWAトークンのキャッシュを破棄して取得し直し、新しいトークンで1回だけ再送する
+ * コールバックで例外が発生しても同じバッチの残りの処理は続け、例外は onError（未指定の場合は実行の最後に送出）に渡す
+ */
+
+const SPAPI_RATE_LIMITS = {
+  // オペレーション名: { rate: 1秒あたりの回復数, burst: バケット容量 }
+  getListingsItem: { rate: 5, burst: 10 },
+  putListingsItem: { rate: 5, burst: 10 },
+  patchListingsItem: { rate: 5, burst: 10 },
+  getCatalogItem: { rate: 2, burst: 2 },
+  getDefinitionsProductType: { rate: 5, burst: 10 },
+  listFinancialEvents: { rate: 0.5, burst: 30 },
+  DEFAULT: { rate: 1, burst: 1 }
+};
+
+const SPAPI_RETRY_CONFIG = {
+  MAX_RETRIES: 5,
+  BASE_DELAY_MS: 1000,
+  MAX_DELAY_MS: 30000,
+  MAX_BATCH_SIZE: 20,                        // fetchAll 1回あたりの最大リクエスト数
+  RETRYABLE_CODES: [429, 500, 502, 503, 504],
+  AUTH_ERROR_CODES: [401, 403],              // トークンを取得し直して1回だけ再送する
+  RATE_LIMIT_HEADER: "x-amzn-RateLimit-Limit",
+  ACCESS_TOKEN_HEADER: "x-amz-access-token"
+};
+
+/**
+ * スケジューラーを作成する
+ * fetchAll・sleep・now・random・refreshAccessToken を差し替えると、ローカルの疑似APIに対して動作確認できる
+ * @param {Object} options - { fetchAll, sleep, now, random, refreshAccessToken, limits, maxRetries, baseDelay, maxDelay, maxBatchSize }
+ * @returns {Object} スケジューラー
+ */
+function utils_createSpApiScheduler(options) {
+  options = options || {};
+
+  return {
+    fetchAll: options.fetchAll || (requests => UrlFetchApp.fetchAll(requests)),
+    sleep: options.sleep || (ms => Utilities.sleep(ms)),
+    now: options.now || (() => Date.now()),
+    random: options.random || Math.random,
+    refreshAccessToken: options.refreshAccessToken || utils_refreshSpApiAccessToken_,
+    limits: options.limits || SPAPI_RATE_LIMITS,
+    maxRetries: options.maxRetries !== undefined ? options.maxRetries : SPAPI_RETRY_CONFIG.MAX_RETRIES,
+    baseDelay: options.baseDelay || SPAPI_RETRY_CONFIG.BASE_DELAY_MS,
+    maxDelay: options.maxDelay || SPAPI_RETRY_CONFIG.MAX_DELAY_MS,
+    maxBatchSize: options.maxBatchSize || SPAPI_RETRY_CONFIG.MAX_BATCH_SIZE,
+    buckets: {},
+    queue: [],
+    errors: [],
+    // 認証エラーで取得し直したトークンと、それ以前のトークン（予約済みのリクエストは送信前に差し替える）
+    accessToken: null,
+    staleTokens: new Set(),
+    tokenRefreshFailed: false,
+    stats: { requests: 0, batches: 0, retries: 0, throttled: 0, waitedMs: 0, callbackErrors: 0, tokenRefreshes: 0 }
+  };
+}
+
+/**
+ * リクエストを予約する
+ * コールバック内で次の段階のリクエストを予約すると、行ごとの処理をパイプライン化できる
+ * @param {Object} scheduler - スケジューラー
+ * @param {string} operation - オペレーション名（SPAPI_RATE_LIMITS のキー）
+ * @param {Object} request - UrlFetchApp.fetchAll に渡すリクエスト（url を含む）
+ * @param {Function} onResponse - レスポンス（{ code, body, headers, json }）を受け取るコールバック
+ * @param {Function} onError - onResponse で発生した例外を受け取るコールバック（省略可）
+ */
+function utils_scheduleSpApiRequest(scheduler, operation, request, onResponse, onError) {
+  scheduler.queue.push({
+    operation: operation,
+    request: request,
+    onResponse: onResponse,
+    onError: onError || null,
+    attempt: 0,
+    notBefore: 0
+  });
+}
+
+/**
+ * 予約済みのリクエストがなくなるまで送信する
+ * onError のないコールバックで例外が発生した場合は、すべてのリクエストの送信後に最初の例外を送出する
+ * @param {Object} scheduler - スケジューラー
+ * @returns {Object} 統計（リクエスト数・fetchAll回数・再送回数・429回数・待機時間・コールバックの例外数・トークンの再取得回数）
+ */
+function utils_runSpApiScheduler(scheduler) {
+  while (scheduler.queue.length > 0) {
+    const now = scheduler.now();
+    const batch = [];
+    const waiting = [];
+    let nextReadyAt = Infinity;
+
+    scheduler.queue.forEach(task => {
+      if (batch.length >= scheduler.maxBatchSize) {
+        waiting.push(task);
+        return;
+      }
+
+      if (task.notBefore > now) {
+        nextReadyAt = Math.min(nextReadyAt, task.notBefore);
+        waiting.push(task);
+        return;
+      }
+
+      const bucket = utils_getRateLimitBucket_(scheduler, task.operation, now);
+      if (bucket.tokens >= 1) {
+        bucket.tokens -= 1;
+        batch.push(task);
+      } else {
+        nextReadyAt = Math.min(nextReadyAt, now + Math.ceil((1 - bucket.tokens) / bucket.rate * 1000));
+        waiting.push(task);
+      }
+    });
+
+    // コールバック内で予約されたリクエストは新しいキューに追加される
+    scheduler.queue = waiting;
+
+    if (batch.length === 0) {
+      const waitMs = Math.max(1, nextReadyAt - now);
+      scheduler.sleep(waitMs);
+      scheduler.stats.waitedMs += waitMs;
+      continue;
+    }
+
+    utils_sendSpApiBatch_(scheduler, batch);
+  }
+
+  if (scheduler.errors.length > 0) {
+    const error = scheduler.errors[0];
+    scheduler.errors = [];
+    throw error;
+  }
+
+  return scheduler.stats;
+}
+
+/**
+ * 再送までの待機時間を計算する（指数バックオフ＋ジッター）
+ * x-amzn-RateLimit-Limit が返っている場合は、そのレートで1件分回復する時間より短くしない
+ * @param {number} attempt - 再送回数（1始まり）
+ * @param {string|number} rateLimit - x-amzn-RateLimit-Limit の値
+ * @param {Object} options - { baseDelay, maxDelay, random }
+ * @returns {number} 待機時間（ミリ秒）
+ */
+function utils_calculateSpApiBackoff(attempt, rateLimit, options) {
+  options = options || {};
+  const baseDelay = options.baseDelay || SPAPI_RETRY_CONFIG.BASE_DELAY_MS;
+  const maxDelay = options.maxDelay || SPAPI_RETRY_CONFIG.MAX_DELAY_MS;
+  const random = options.random || Math.random;
+
+  const exponential = Math.min(maxDelay, baseDelay * Math.pow(2, attempt - 1));
+  // 半分は固定、残り半分をランダムにして同時再送の集中を避ける
+  let delay = exponential / 2 + random() * exponential / 2;
+
+  const rate = parseFloat(rateLimit);
+  if (rate > 0) {
+    delay = Math.max(delay, 1000 / rate);
+  }
+
+  return Math.ceil(delay);
+}
+
+function utils_sendSpApiBatch_(scheduler, batch) {
+  // 取得し直す前のトークンで予約されたリクエストは、新しいトークンに差し替えて送信する
+  if (scheduler.accessToken) {
+    batch.forEach(task => {
+      if (scheduler.staleTokens.has(utils_getHeaderValue_(task.request.headers, SPAPI_RETRY_CONFIG.ACCESS_TOKEN_HEADER))) {
+        utils_setSpApiAccessToken_(task, scheduler.accessToken);
+      }
+    });
+  }
+
+  let responses;
+  try {
+    responses = scheduler.fetchAll(batch.map(task => task.request));
+  } catch (e) {
+    // 通信エラーはバッチ全体が失敗するため、全件を再送対象にする
+    console.log("fetchAll エラー: " + e.message);
+    responses = batch.map(() => null);
+  }
+
+  scheduler.stats.batches++;
+  scheduler.stats.requests += batch.length;
+  const now = scheduler.now();
+
+  batch.forEach((task, index) => {
+    const response = responses[index]
+      ? utils_wrapSpApiResponse_(responses[index])
+      : { code: 0, body: "", headers: {}, json: () => null };
+    const rateLimit = utils_getHeaderValue_(response.headers, SPAPI_RETRY_CONFIG.RATE_LIMIT_HEADER);
+    const bucket = utils_getRateLimitBucket_(scheduler, task.operation, now);
+
+    // セラーごとに実際に適用されているレートに合わせる
+    if (parseFloat(rateLimit) > 0) {
+      utils_applyRateLimitHeader_(scheduler, task.operation, bucket, parseFloat(rateLimit));
+    }
+
+    const retryable = response.code === 0 || SPAPI_RETRY_CONFIG.RETRYABLE_CODES.indexOf(response.code) !== -1;
+    if (retryable && task.attempt < scheduler.maxRetries) {
+      task.attempt++;
+      if (response.code === 429) {
+        bucket.tokens = 0;
+        scheduler.stats.throttled++;
+      }
+      const delay = utils_calculateSpApiBackoff(task.attempt, rateLimit, scheduler);
+      task.notBefore = now + delay;
+      scheduler.stats.retries++;
+      console.log(`${task.operation}: HTTP ${response.code} のため ${delay}ms 後に再送します (試行 ${task.attempt}/${scheduler.maxRetries})`);
+      scheduler.queue.push(task);
+      return;
+    }
+
+    if (SPAPI_RETRY_CONFIG.AUTH_ERROR_CODES.indexOf(response.code) !== -1 && utils_retryWithFreshToken_(scheduler, task)) {
+      console.log(`${task.operation}: HTTP ${response.code} のためアクセストークンを取得し直して再送します`);
+      return;
+    }
+
+    utils_deliverSpApiResponse_(scheduler, task, response);
+  });
+}
+
+/**
+ * 認証エラーのリクエストを新しいトークンで再送キューに戻す（リクエストごとに1回まで）
+ * トークンは失敗したトークンが最新の場合だけ取得し直すため、同じバッチで複数件が失敗しても取得は1回になる
+ * @returns {boolean} 再送する場合は true
+ */
+function utils_retryWithFreshToken_(scheduler, task) {
+  const sentToken = utils_getHeaderValue_(task.request.headers, SPAPI_RETRY_CONFIG.ACCESS_TOKEN_HEADER);
+  if (task.authRetried || !sentToken || sentToken === scheduler.accessToken || scheduler.tokenRefreshFailed) {
+    return false;
+  }
+
+  if (!scheduler.staleTokens.has(sentToken)) {
+    let token;
+    try {
+      token = scheduler.refreshAccessToken();
+    } catch (error) {
+      console.log(`${task.operation}: アクセストークンを取得し直せませんでした: ${error.message}`);
+      scheduler.tokenRefreshFailed = true;
+      return false;
+    }
+    if (scheduler.accessToken) {
+      scheduler.staleTokens.add(scheduler.accessToken);
+    }
+    scheduler.staleTokens.add(sentToken);
+    scheduler.accessToken = token;
+    scheduler.stats.tokenRefreshes++;
+  }
+
+  task.authRetried = true;
+  utils_setSpApiAccessToken_(task, scheduler.accessToken);
+  scheduler.stats.retries++;
+  scheduler.queue.push(task);
+  return true;
+}
+
+/**
+ * キャッシュのLWAトークンを破棄して取得し直す（スケジューラーの既定の refreshAccessToken）
+ */
+function utils_refreshSpApiAccessToken_() {
+  utils_invalidateSpApiCache("lwaToken");
+  return utils_getSpApiAccessToken();
+}
+
+function utils_setSpApiAccessToken_(task, token) {
+  const headers = Object.assign({}, task.request.headers);
+  headers[SPAPI_RETRY_CONFIG.ACCESS_TOKEN_HEADER] = token;
+  task.request = Object.assign({}, task.request, { headers: headers });
+}
+
+/**
+ * レスポンスをコールバックに渡す（例外はリクエストごとに記録し、同じバッチの残りの処理を続ける）
+ */
+function utils_deliverSpApiResponse_(scheduler, task, response) {
+  try {
+    task.onResponse(response);
+  } catch (error) {
+    scheduler.stats.callbackErrors++;
+    console.log(`${task.operation}: レスポンス処理でエラーが発生しました: ${error.message}`);
+
+    if (!task.onError) {
+      scheduler.errors.push(error);
+      return;
+    }
+
+    try {
+      task.onError(error);
+    } catch (handlerError) {
+      scheduler.errors.push(handlerError);
+    }
+  }
+}
+
+/**
+ * x-amzn-RateLimit-Limit のレートをバケットに反映する
+ * 既定より低いレートが適用されている場合は、バースト（バケット容量）も max(1, ceil(rate)) に抑える
+ */
+function utils_applyRateLimitHeader_(scheduler, operation, bucket, rate) {
+  const limit = scheduler.limits[operation] || scheduler.limits.DEFAULT || SPAPI_RATE_LIMITS.DEFAULT;
+
+  bucket.rate = rate;
+  bucket.burst = rate < limit.rate ? Math.min(limit.burst, Math.max(1, Math.ceil(rate))) : limit.burst;
+  bucket.tokens = Math.min(bucket.tokens, bucket.burst);
+}
+
+function utils_getRateLimitBucket_(scheduler, operation, now) {
+  let bucket = scheduler.buckets[operation];
+
+  if (!bucket) {
+    const limit = scheduler.limits[operation] || scheduler.limits.DEFAULT || SPAPI_RATE_LIMITS.DEFAULT;
+    bucket = { rate: limit.rate, burst: limit.burst, tokens: limit.burst, updatedAt: now };
+    scheduler.buckets[operation] = bucket;
+    return bucket;
+  }
+
+  if (now > bucket.updatedAt) {
+    bucket.tokens = Math.min(bucket.burst, bucket.tokens + (now - bucket.updatedAt) / 1000 * bucket.rate);
+    bucket.updatedAt = now;
+  }
+
+  return bucket;
+}
+
+function utils_getHeaderValue_(headers, name) {
+  if (!headers) {
+    return null;
+  }
+
+  const lowerName = name.toLowerCase();
+  for (const key in headers) {
+    if (key.toLowerCase() === lowerName) {
+      return headers[key];
+    }
+  }
+
+  return null;
+}
@@ -0,0 +1,421 @@
+/**
+ * シート書き込みバッファ
+ * セル単位の書き込み（値・数式・クリア・書式）をシートごとに蓄積し、
+ * 連続する矩形範囲にまとめて最小回数の setValues / setNumberFormats / setBackgrounds で反映する
+ * 作成時に fillColumns を指定した場合だけ、連続する行で書き込む列が飛び飛びのときに間の列の現在の内容を読み取って補完し
+ * 1つの矩形で反映する（表示形式は、書き込む行が飛び飛びの場合も間の行の現在の表示形式で補完する）
+ * 補完は値をそのまま書き戻すため、ARRAYFORMULA の展開先・リッチテキストのリンク・読み取りから書き込みまでの間の編集を
+ * 失わないよう、fillColumns には呼び出し側が値だけを書き込む列を指定する
+ */
+
+// 書き込みレイヤーと反映に使用するRangeメソッドの対応
+// readers: 隙間のセルを補完するときに現在の内容を読み取るメソッド（先頭から順に空でない値を使う。空の場合は補完しない）
+// guardedReader: このメソッドで読み取った値に、書き戻すと数値・日付などに変換され得る文字列がある場合は補完しない
+// fillRows: 書き込む行の間の行（MAX_GAP_ROWS まで）も補完する（書き戻しても変わらないレイヤーのみ）
+const WRITE_BUFFER_LAYERS = {
+  values: { setter: "setValues", readers: ["getFormulas", "getValues"], guardedReader: "getValues", fillRows: false },
+  numberFormats: { setter: "setNumberFormats", readers: ["getNumberFormats"], guardedReader: null, fillRows: true },
+  backgrounds: { setter: "setBackgrounds", readers: [], guardedReader: null, fillRows: false }
+};
+
+// 隙間の補完の設定
+const WRITE_BUFFER_CONFIG = {
+  MAX_GAP_COLUMNS: 3,      // 補完する隙間の最大列数（これより離れた列は別の矩形にする）
+  MAX_GAP_ROWS: 50,        // fillRows のレイヤーで補完する隙間の最大行数
+  MAX_READ_CELLS: 100000   // 補完のために1回で読み取る範囲の最大セル数
+};
+
+/**
+ * 書き込みバッファを作成する
+ * @param {Sheet} sheet - 書き込み先シート
+ * @param {Object} options - { fillColumns: 隙間の補完に使ってよい列番号の配列（省略時は補完せず、書き込むセルだけの矩形で反映） }
+ * @returns {Object} 書き込みバッファ
+ */
+function utils_createWriteBuffer(sheet, options) {
+  options = options || {};
+  const layers = {};
+  Object.keys(WRITE_BUFFER_LAYERS).forEach(name => {
+    layers[name] = new Map();
+  });
+
+  return {
+    sheet: sheet,
+    layers: layers,
+    fillColumns: new Set(options.fillColumns || []),
+    stats: { operations: 0, flushes: 0, apiCalls: 0, reads: 0 }
+  };
+}
+
+/**
+ * セルへの値書き込みを予約する
+ */
+function utils_bufferSetValue(buffer, row, column, value) {
+  utils_bufferPut_(buffer, "values", row, column, value);
+}
+
+/**
+ * セルへの数式書き込みを予約する（setValuesで数式として反映される）
+ */
+function utils_bufferSetFormula(buffer, row, column, formula) {
+  utils_bufferPut_(buffer, "values", row, column, formula);
+}
+
+/**
+ * セルの内容クリアを予約する（書式は保持される）
+ */
+function utils_bufferClearContent(buffer, row, column) {
+  utils_bufferPut_(buffer, "values", row, column, "");
+}
+
+/**
+ * セルの表示形式設定を予約する
+ */
+function utils_bufferSetNumberFormat(buffer, row, column, format) {
+  utils_bufferPut_(buffer, "numberFormats", row, column, format);
+}
+
+/**
+ * 行範囲の背景色設定を予約する
+ */
+function utils_bufferSetBackground(buffer, row, column, numColumns, color) {
+  for (let i = 0; i < numColumns; i++) {
+    utils_bufferPut_(buffer, "backgrounds", row, column + i, color);
+  }
+}
+
+/**
+ * 予約済みの書き込み件数を取得する
+ */
+function utils_getBufferedCount(buffer) {
+  let count = 0;
+  Object.keys(buffer.layers).forEach(name => {
+    buffer.layers[name].forEach(rows => {
+      count += rows.size;
+    });
+  });
+  return count;
+}
+
+/**
+ * 予約済みの書き込みをシートに反映する
+ * @param {Object} buffer - 書き込みバッファ
+ * @returns {number} 実行したRange書き込み呼び出し回数
+ */
+function utils_flushWriteBuffer(buffer) {
+  let apiCalls = 0;
+  const readsBefore = buffer.stats.reads;
+
+  // 値を先に反映し、その後に書式を反映する
+  Object.keys(WRITE_BUFFER_LAYERS).forEach(name => {
+    const layer = buffer.layers[name];
+    if (layer.size === 0) {
+      return;
+    }
+
+    const config = WRITE_BUFFER_LAYERS[name];
+    const blocks = config.readers.length > 0 && buffer.fillColumns.size > 0
+      ? utils_buildFilledWriteBlocks_(buffer, layer, config)
+      : utils_buildWriteBlocks_(layer);
+
+    blocks.forEach(block => {
+      buffer.sheet.getRange(block.row, block.column, block.numRows, block.numColumns)[config.setter](block.values);
+      apiCalls++;
+    });
+
+    layer.clear();
+  });
+
+  buffer.stats.flushes++;
+  buffer.stats.apiCalls += apiCalls;
+
+  if (apiCalls > 0) {
+    const reads = buffer.stats.reads - readsBefore;
+    const readNote = reads > 0 ? `、隙間の補完のための読み取り ${reads}回` : "";
+    console.log(`書き込みバッファ反映: ${buffer.sheet.getName()} ${apiCalls}回の書き込み（累計予約 ${buffer.stats.operations}件${readNote}）`);
+  }
+
+  return apiCalls;
+}
+
+/**
+ * 複数の書き込みバッファをまとめて反映する
+ */
+function utils_flushWriteBuffers(buffers) {
+  return buffers.reduce((total, buffer) => total + utils_flushWriteBuffer(buffer), 0);
+}
+
+function utils_bufferPut_(buffer, layerName, row, column, value) {
+  const layer = buffer.layers[layerName];
+  let rows = layer.get(column);
+  if (!rows) {
+    rows = new Map();
+    layer.set(column, rows);
+  }
+  // 同じセルへの書き込みは後勝ち
+  rows.set(row, value);
+  buffer.stats.operations++;
+}
+
+/**
+ * レイヤー内のセルを矩形ブロックに分割する
+ * 1. 列ごとに連続する行を縦の区間にまとめる
+ * 2. 同じ行区間を持つ隣接列を横に結合する
+ * @param {Map} layer - 列番号 → (行番号 → 値) のMap
+ * @returns {Object[]} {row, column, numRows, numColumns, values} の配列
+ */
+function utils_buildWriteBlocks_(layer) {
+  const runsByKey = new Map();
+
+  layer.forEach((rows, column) => {
+    const sortedRows = Array.from(rows.keys()).sort((a, b) => a - b);
+    let start = 0;
+
+    for (let i = 1; i <= sortedRows.length; i++) {
+      if (i < sortedRows.length && sortedRows[i] === sortedRows[i - 1] + 1) {
+        continue;
+      }
+
+      const runRows = sortedRows.slice(start, i);
+      const key = runRows[0] + ":" + runRows.length;
+      if (!runsByKey.has(key)) {
+        runsByKey.set(key, { row: runRows[0], numRows: runRows.length, columns: [] });
+      }
+      runsByKey.get(key).columns.push({
+        column: column,
+        values: runRows.map(r => rows.get(r))
+      });
+      start = i;
+    }
+  });
+
+  const blocks = [];
+
+  runsByKey.forEach(run => {
+    run.columns.sort((a, b) => a.column - b.column);
+    let group = [run.columns[0]];
+
+    for (let i = 1; i <= run.columns.length; i++) {
+      const current = run.columns[i];
+      if (current && current.column === group[group.length - 1].column + 1) {
+        group.push(current);
+        continue;
+      }
+
+      const values = [];
+      for (let r = 0; r < run.numRows; r++) {
+        values.push(group.map(col => col.values[r]));
+      }
+      blocks.push({
+        row: run.row,
+        column: group[0].column,
+        numRows: run.numRows,
+        numColumns: group.length,
+        values: values
+      });
+
+      group = current ? [current] : [];
+    }
+  });
+
+  return blocks;
+}
+
+/**
+ * 連続する行ごとに、飛び飛びの列を補完して1つの矩形ブロックにまとめる
+ * 1. 書き込みのある行を連続する行区間（fillRows のレイヤーは MAX_GAP_ROWS 以下の隙間を含む）に分け、
+ *    区間内で書き込む列の範囲を求める（MAX_GAP_COLUMNS を超える隙間では分ける）
+ * 2. 書き込みのないセルを含む範囲は、範囲の列がすべて buffer.fillColumns に含まれる場合だけ、現在の内容をまとめて読み取って補完する
+ * 3. 読み取りの回数が減らす書き込みの回数以上になる場合や、書き戻すと値が変わり得るセルを含む場合は補完せず
+ *    utils_buildWriteBlocks_ と同じ矩形に分けて反映する
+ * @param {Object} buffer - 書き込みバッファ
+ * @param {Map} layer - 列番号 → (行番号 → 値) のMap
+ * @param {Object} config - WRITE_BUFFER_LAYERS の設定
+ * @returns {Object[]} {row, column, numRows, numColumns, values} の配列
+ */
+function utils_buildFilledWriteBlocks_(buffer, layer, config) {
+  const segments = utils_buildWriteSegments_(layer, config.fillRows ? WRITE_BUFFER_CONFIG.MAX_GAP_ROWS : 0);
+  const blocks = [];
+
+  // 補完が必要な範囲を、読み取り範囲が上限を超えない単位にまとめる
+  const groups = [];
+  let group = null;
+  segments.forEach(segment => {
+    if (segment.blocks.length === 1 || !utils_isFillableSegment_(buffer, segment)) {
+      blocks.push(...segment.blocks);
+      return;
+    }
+
+    if (group) {
+      const row = Math.min(group.row, segment.row);
+      const column = Math.min(group.column, segment.column);
+      const lastRow = Math.max(group.row + group.numRows, segment.row + segment.numRows);
+      const lastColumn = Math.max(group.column + group.numColumns, segment.column + segment.numColumns);
+      if ((lastRow - row) * (lastColumn - column) <= WRITE_BUFFER_CONFIG.MAX_READ_CELLS) {
+        Object.assign(group, { row: row, column: column, numRows: lastRow - row, numColumns: lastColumn - column });
+        group.segments.push(segment);
+        return;
+      }
+    }
+
+    group = { row: segment.row, column: segment.column, numRows: segment.numRows, numColumns: segment.numColumns, segments: [segment] };
+    groups.push(group);
+  });
+
+  groups.forEach(target => {
+    const savedCalls = target.segments.reduce((total, segment) => total + segment.blocks.length - 1, 0);
+    if (savedCalls <= config.readers.length) {
+      target.segments.forEach(segment => blocks.push(...segment.blocks));
+      return;
+    }
+
+    const range = buffer.sheet.getRange(target.row, target.column, target.numRows, target.numColumns);
+    const contents = config.readers.map(reader => range[reader]());
+    buffer.stats.reads += config.readers.length;
+
+    target.segments.forEach(segment => {
+      const values = utils_fillWriteSegment_(segment, target, contents, config);
+      if (values) {
+        blocks.push({ row: segment.row, column: segment.column, numRows: segment.numRows, numColumns: segment.numColumns, values: values });
+      } else {
+        blocks.push(...segment.blocks);
+      }
+    });
+  });
+
+  return blocks;
+}
+
+/**
+ * 書き込みのある行を行区間（maxGapRows 以下の隙間は同じ区間）に分け、区間ごとに書き込む列の範囲（セグメント）を求める
+ * 各セグメントには補完しない場合の矩形ブロック（utils_buildWriteBlocks_ の結果）を持たせる
+ */
+function utils_buildWriteSegments_(layer, maxGapRows) {
+  // 行番号 → (列番号 → 値)
+  const cellsByRow = new Map();
+  layer.forEach((rows, column) => {
+    rows.forEach((value, row) => {
+      let columns = cellsByRow.get(row);
+      if (!columns) {
+        columns = new Map();
+        cellsByRow.set(row, columns);
+      }
+      columns.set(column, value);
+    });
+  });
+
+  const sortedRows = Array.from(cellsByRow.keys()).sort((a, b) => a - b);
+  const segments = [];
+  let start = 0;
+
+  for (let i = 1; i <= sortedRows.length; i++) {
+    if (i < sortedRows.length && sortedRows[i] - sortedRows[i - 1] - 1 <= maxGapRows) {
+      continue;
+    }
+
+    const runRows = sortedRows.slice(start, i);
+    const columnSet = new Set();
+    runRows.forEach(row => cellsByRow.get(row).forEach((value, column) => columnSet.add(column)));
+    const columns = Array.from(columnSet).sort((a, b) => a - b);
+
+    let first = 0;
+    for (let j = 1; j <= columns.length; j++) {
+      if (j < columns.length && columns[j] - columns[j - 1] - 1 <= WRITE_BUFFER_CONFIG.MAX_GAP_COLUMNS) {
+        continue;
+      }
+
+      // セグメント内のセルだけを持つレイヤー（列番号 → (行番号 → 値)）
+      const cells = new Map();
+      columns.slice(first, j).forEach(column => {
+        const rows = new Map();
+        runRows.forEach(row => {
+          const rowCells = cellsByRow.get(row);
+          if (rowCells.has(column)) {
+            rows.set(row, rowCells.get(column));
+          }
+        });
+        cells.set(column, rows);
+      });
+
+      segments.push({
+        row: runRows[0],
+        numRows: runRows[runRows.length - 1] - runRows[0] + 1,
+        column: columns[first],
+        numColumns: columns[j - 1] - columns[first] + 1,
+        cells: cells,
+        blocks: utils_buildWriteBlocks_(cells)
+      });
+      first = j;
+    }
+    start = i;
+  }
+
+  return segments;
+}
+
+/**
+ * セグメントの列がすべて補完してよい列か判定する
+ */
+function utils_isFillableSegment_(buffer, segment) {
+  for (let column = segment.column; column < segment.column + segment.numColumns; column++) {
+    if (!buffer.fillColumns.has(column)) {
+      return false;
+    }
+  }
+  return true;
+}
+
+/**
+ * セグメントの書き込みのないセルを読み取った内容で補完した2次元配列を返す
+ * 書き戻すと値が変わり得るセルがある場合は null を返す
+ */
+function utils_fillWriteSegment_(segment, target, contents, config) {
+  const values = [];
+
+  for (let i = 0; i < segment.numRows; i++) {
+    const row = segment.row + i;
+    const rowValues = [];
+
+    for (let j = 0; j < segment.numColumns; j++) {
+      const column = segment.column + j;
+      const rows = segment.cells.get(column);
+      if (rows && rows.has(row)) {
+        rowValues.push(rows.get(row));
+        continue;
+      }
+
+      const current = utils_pickCurrentContent_(contents, row - target.row, column - target.column);
+      if (config.readers[current.reader] === config.guardedReader && !utils_isRewritableValue_(current.value)) {
+        return null;
+      }
+      rowValues.push(current.value);
+    }
+
+    values.push(rowValues);
+  }
+
+  return values;
+}
+
+/**
+ * 読み取った内容のうち、先頭のメソッドから順に空でない値を返す（{value, reader: メソッドの位置}）
+ */
+function utils_pickCurrentContent_(contents, rowIndex, columnIndex) {
+  for (let k = 0; k < contents.length; k++) {
+    const value = contents[k][rowIndex][columnIndex];
+    if (value !== "" && value !== null && value !== undefined) {
+      return { value: value, reader: k };
+    }
+  }
+  return { value: "", reader: -1 };
+}
+
+/**
+ * getValues で読み取った値をそのまま書き戻しても内容が変わらないか判定する
+ * 文字列のうち、再入力で数値・日付・真偽値・数式として解釈され得るもの（"001"・"2024/01/01"・"TRUE"など）は書き戻さない
+ */
+function utils_isRewritableValue_(value) {
+  if (typeof value !== "string" || value === "") {
+    return true;
+  }
+  return !/^[\s'=+\-.(¥$\d]|^(true|false)$/i.test(value);
+}